@@ -1,7 +1,4 @@
 # top-of-file path hack to ensure imports resolve when streamlit starts the script
-from src.keyword_analysis import get_hashtag_counts, get_keyword_counts
-import plotly.express as px
-import io
 import sys, os
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
@@ -11,18 +8,22 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from textblob import TextBlob
-import matplotlib.pyplot as plt
 import streamlit.components.v1 as components
 
 # local helpers
-from src.data_extraction import get_comments
-from src.data_tweetclaw import load_tweetclaw_export
-from src.utils_visuals import (
-    plot_sentiment_bar, plot_sentiment_pie, plot_likes_vs_sentiment,
-    make_wordcloud_figure, format_comment_card, timeseries_sentiment
-)
-from src.db_utils import create_comments_table, insert_comments
+from src.data_extraction import iter_comment_pages
+from src.http_utils import http_cache_stats, prefetch
+from src.fetch_orchestrator import fetch_many, parse_url_list
+from src.data_tweetclaw import iter_tweetclaw_export
+from src.incremental import advance_to_newest, fill_missing_scores, incremental_fetch, merge_history
+from src.parallel_scoring import score_texts
+from src.score_cache import score_cache_stats
+from src.utils_visuals import format_comment_card, render_wordcloud
+from src.artifacts import artifact_cache_stats, frame_fingerprint, get_artifact_cache
+from src.exports import EXPORT_FORMATS, export_bytes
+from src.db_utils import ensure_schema, insert_comments, page_comments, pool_stats, token_daily_counts, top_tokens
+from src.config import TERM_COUNTS_APPROX_ROWS, TERM_COUNTS_CAPACITY, WORDCLOUD_MAX_WORDS
+from src.lazy import resource
 
 # Page config
 st.set_page_config(page_title="Cyber Analytics - YouTube Sentiment", layout="wide")
@@ -55,13 +56,15 @@ st.markdown("""
 # layout: left sidebar for controls, main area for visuals
 platform = st.sidebar.selectbox(
     "Platform",
-    ["YouTube", "Reddit", "TweetClaw Export"],
+    ["YouTube", "Reddit", "Multiple URLs", "TweetClaw Export"],
     index=0
 )
 if platform == "YouTube":
     input_label = "Paste YouTube Video URL"
 elif platform == "Reddit":
     input_label = "Paste Reddit Post URL"
+elif platform == "Multiple URLs":
+    input_label = "Paste YouTube / Reddit / Twitter / Instagram URLs, one per line"
 else:
     input_label = ""
 
@@ -70,17 +73,29 @@ with st.sidebar:
     tweetclaw_file = None
     if platform == "TweetClaw Export":
         tweetclaw_file = st.file_uploader(
-            "Upload TweetClaw CSV, JSON, JSONL, or NDJSON",
-            type=["csv", "json", "jsonl", "ndjson"]
+            "Upload TweetClaw CSV, JSON, JSONL, NDJSON, Parquet, or Arrow",
+            type=["csv", "json", "jsonl", "ndjson", "parquet", "arrow", "feather", "ipc"]
         )
         input_url = ""
+    elif platform == "Multiple URLs":
+        input_url = st.text_area(input_label, value="", height=150)
     else:
         input_url = st.text_input(input_label, value="")
     max_comments = st.slider("Max comments to fetch", min_value=50, max_value=1000, value=300, step=50)
+    incremental = False
+    if platform in ("YouTube", "Reddit", "TweetClaw Export"):
+        incremental = st.checkbox(
+            "Only fetch new comments",
+            value=False,
+            help="Fetches only comments newer than the last saved run and merges the stored history "
+                 "(with its stored scores) back in, so only the new rows are scored. New rows are stored "
+                 "when you click Save. Reddit has no way to ask for new replies only, so the whole thread "
+                 "is still fetched and filtered."
+        )
     fetch_btn = st.button("Fetch & Analyze")
     st.markdown("---")
     st.markdown("Display")
-    n_display = st.slider("How many comment cards to show", min_value=5, max_value=50, value=10, step=5)
+    n_display = st.slider("Comment cards per page", min_value=5, max_value=50, value=10, step=5)
     sort_opt = st.selectbox("Sort comments by", options=["Most liked","Most recent","Most positive","Most negative"])
     st.markdown("---")
     save_to_db = st.button("Save results to DB")
@@ -93,19 +108,6 @@ status = st.empty()
 top_stats = st.columns([1,1,1])
 viz_col1, viz_col2 = st.columns([2,1])
 
-# helper: local sentiment using TextBlob
-def analyze_textblob(text):
-    blob = TextBlob(text or "")
-    polarity = round(blob.sentiment.polarity, 4)
-    subjectivity = round(blob.sentiment.subjectivity, 4)
-    if polarity > 0.1:
-        sentiment = "positive"
-    elif polarity < -0.1:
-        sentiment = "negative"
-    else:
-        sentiment = "neutral"
-    return polarity, subjectivity, sentiment
-
 # state holder
 if "last_df" not in st.session_state:
     st.session_state.last_df = pd.DataFrame()
@@ -121,11 +123,13 @@ def prepare_df_for_display(raw_df):
     for c in ['comment_id','video_id','author','text','published_at','like_count']:
         if c not in df.columns:
             df[c] = None
-    # analyze sentiment locally (TextBlob baseline)
-    pols, subs, sents = zip(*df['text'].fillna("").astype(str).map(analyze_textblob))
-    df['sentiment_score'] = pols
-    df['subjectivity'] = subs
-    df['sentiment'] = sents
+    # analyze sentiment locally (TextBlob baseline); stored history rows keep their scores
+    todo = df['sentiment_score'].isna() if 'sentiment_score' in df.columns else pd.Series(True, index=df.index)
+    if todo.any():
+        pols, subs, sents = zip(*score_texts(df.loc[todo, 'text'].fillna("").astype(str).tolist(), "textblob"))
+        df.loc[todo, 'sentiment_score'] = pols
+        df.loc[todo, 'subjectivity'] = subs
+        df.loc[todo, 'sentiment'] = sents
     # normalize published date display
     try:
         df['published_at'] = pd.to_datetime(df['published_at'], errors='coerce')
@@ -133,6 +137,22 @@ def prepare_df_for_display(raw_df):
         pass
     return df
 
+def run_incremental(source_platform, **kwargs):
+    result = incremental_fetch(source_platform, max_comments=max_comments, **kwargs)
+    # nothing is stored yet: Save inserts the new rows and then moves the watermark
+    st.session_state.pending_incremental = result
+    with st.sidebar.expander("Incremental fetch", expanded=True):
+        st.json({
+            "source": result["source"],
+            "watermark": str(result["watermark"]["published_at"]) if result["watermark"] else None,
+            "new_rows": len(result["new"]),
+            "stored_history": len(result["history"]),
+            "whole_thread_fetched": result["full_walk"],
+        })
+        st.caption("New rows are not stored until you click Save results to DB; "
+                   "until then the next incremental fetch returns them again.")
+    return merge_history(result["new"], result["history"])
+
 # import VADER helper safely
 try:
     from src.data_cleaning_vader import add_vader_to_df
@@ -143,6 +163,7 @@ except Exception:
 # Fetch & analyze flow
 # ---------------------------
 if fetch_btn:
+    st.session_state.pending_incremental = None
 
     # -----------------------
     # TWEETCLAW EXPORT BRANCH
@@ -153,8 +174,20 @@ if fetch_btn:
             st.stop()
         try:
             status.info("Loading TweetClaw export...")
-            raw = load_tweetclaw_export(tweetclaw_file, tweetclaw_file.name)
-            df = prepare_df_for_display(raw)
+            if incremental:
+                # chunks are filtered against the watermark as they are read
+                chunks = iter_tweetclaw_export(tweetclaw_file, tweetclaw_file.name)
+                raw = run_incremental("tweetclaw", frame=chunks, name=tweetclaw_file.name)
+                df = prepare_df_for_display(raw)
+            else:
+                # score chunk by chunk so only one raw chunk is held at a time
+                chunks = []
+                for chunk in iter_tweetclaw_export(tweetclaw_file, tweetclaw_file.name):
+                    chunks.append(prepare_df_for_display(chunk))
+                    status.info(f"Loading TweetClaw export... {sum(len(c) for c in chunks)} rows so far")
+                if not chunks:
+                    raise ValueError("No tweet text rows found in the TweetClaw export.")
+                df = pd.concat(chunks, ignore_index=True)
             st.session_state.last_df = df
             status.success(f"Loaded {len(df)} TweetClaw rows.")
         except Exception as e:
@@ -173,7 +206,10 @@ if fetch_btn:
 
         status.info("Fetching Reddit comments...")
         try:
-            raw = fetch_reddit_comments(input_url)
+            if incremental:
+                raw = run_incremental("reddit", url=input_url)
+            else:
+                raw = fetch_reddit_comments(input_url)
             if raw is None or raw.empty:
                 status.warning("No Reddit comments found.")
                 st.stop()
@@ -183,6 +219,23 @@ if fetch_btn:
         except Exception as e:
             status.error(f"Error fetching Reddit comments: {e}")
             st.stop()
+
+    # -----------------------
+    # MULTI-URL BRANCH
+    # -----------------------
+    elif platform == "Multiple URLs":
+        urls = parse_url_list(input_url)
+        if not urls:
+            status.error("Paste at least one URL")
+            st.stop()
+        status.info(f"Fetching {len(urls)} sources concurrently...")
+        raw, fetch_report = fetch_many(urls, max_comments=max_comments)
+        with st.sidebar.expander("Source status", expanded=True):
+            st.dataframe(fetch_report, use_container_width=True)
+        if raw.empty:
+            status.warning("No comments returned from any source.")
+            st.stop()
+        df = prepare_df_for_display(raw)
 
     # -----------------------
     # YOUTUBE BRANCH
@@ -193,12 +246,22 @@ if fetch_btn:
             st.stop()
         try:
             status.info("Fetching comments from YouTube...")
-            raw = get_comments(input_url, max_results=max_comments)
-
-            if raw is None or raw.empty:
+            pages = []
+            if incremental:
+                # new comments only; stored history comes back from the DB
+                raw = run_incremental("youtube", url=input_url)
+                if not raw.empty:
+                    pages.append(prepare_df_for_display(raw))
+            else:
+                # score each page while the next one is still downloading
+                for page in prefetch(iter_comment_pages(input_url, max_results=max_comments)):
+                    pages.append(prepare_df_for_display(pd.DataFrame(page)))
+                    status.info(f"Fetching comments from YouTube... {sum(len(p) for p in pages)} so far")
+
+            if not pages:
                 status.warning("No comments returned from API")
                 st.stop()
-            df = prepare_df_for_display(raw)
+            df = pd.concat(pages, ignore_index=True)
             # continue to sentiment/emotion below
         except Exception as e:
             status.error(f"Error fetching comments: {e}")
@@ -210,7 +273,7 @@ if fetch_btn:
     # -----------------------
     try:
         if model_choice == "VADER" and add_vader_to_df is not None:
-            df = add_vader_to_df(df)
+            df = fill_missing_scores(df, "vader_compound", add_vader_to_df)
             try:
                 st.sidebar.write("VADER avg compound:", round(df["vader_compound"].mean(), 4))
             except Exception:
@@ -237,9 +300,8 @@ if fetch_btn:
         if model_choice in ["TextBlob (default)", "VADER"]:
             try:
                 from src.emotion_analysis import add_emotion_columns
-                # only add if not present
-                if not set(nrc_cols).intersection(df.columns):
-                    df = add_emotion_columns(df)
+                # rows with stored emotions (incremental history) are not scored again
+                df = fill_missing_scores(df, "joy", add_emotion_columns)
                 emo_added = bool(set(nrc_cols).intersection(df.columns))
                 if emo_added:
                     status.info("NRC emotions added.")
@@ -258,10 +320,9 @@ if fetch_btn:
         # emotions disabled by user -> create placeholder columns so charts don't break
         nrc_cols = ["anger","anticipation","disgust","fear","joy","sadness","surprise","trust"]
         for col in nrc_cols:
-            if col not in df.columns:
-                df[col] = 0.0
-        if "dominant_emotion" not in df.columns:
-            df["dominant_emotion"] = "none"
+            # new rows next to stored history have no emotion values
+            df[col] = df[col].fillna(0.0) if col in df.columns else 0.0
+        df["dominant_emotion"] = df["dominant_emotion"].fillna("none") if "dominant_emotion" in df.columns else "none"
         status.info("Emotion analysis disabled - placeholder emotion columns added.")
 
     # Optional: compare TextBlob vs VADER if both available
@@ -275,12 +336,27 @@ if fetch_btn:
     # save and signal complete
     st.session_state.last_df = df
     status.success(f"Fetched {len(df)} comments and analyzed sentiments.")
+    with st.sidebar.expander("Score cache"):
+        st.json(score_cache_stats())
+    with st.sidebar.expander("HTTP cache"):
+        st.json(http_cache_stats())
 
 # -----------------------
 # Show analytics if we have a df
 # -----------------------
 df = st.session_state.last_df
 if not df.empty:
+    # derived artifacts are memoized by frame fingerprint + options, so a rerun
+    # from a widget only rebuilds what depends on that widget
+    if st.session_state.get("last_fp", (None, None))[0] is not df:
+        st.session_state.last_fp = (df, frame_fingerprint(df))
+    fp = st.session_state.last_fp[1]
+    artifacts = get_artifact_cache()
+
+    # one pass for hashtags, keywords and bigrams; very large frames use bounded-memory top-k
+    approx = len(df) > TERM_COUNTS_APPROX_ROWS
+    terms = artifacts.get("term_counts", df, fp, approx_capacity=TERM_COUNTS_CAPACITY if approx else None)
+
     # top stats
     with top_stats[0]:
         st.metric("Comments", f"{len(df)}")
@@ -292,38 +368,60 @@ if not df.empty:
 
     # visuals
     with viz_col1:
+        sentiment_figs = artifacts.get("sentiment_figures", df, fp)
         st.subheader("Sentiment Overview")
-        st.plotly_chart(plot_sentiment_bar(df), use_container_width=True)
-        st.plotly_chart(plot_sentiment_pie(df), use_container_width=True)
+        st.plotly_chart(sentiment_figs["bar"], use_container_width=True)
+        st.plotly_chart(sentiment_figs["pie"], use_container_width=True)
 
         # timeseries (if available)
-        ts_fig = timeseries_sentiment(df)
+        ts_fig = sentiment_figs["timeseries"]
         if ts_fig is not None:
             st.subheader("Sentiment Over Time")
             st.plotly_chart(ts_fig, use_container_width=True)
 
     with viz_col2:
         st.subheader("Likes vs Sentiment")
-        st.plotly_chart(plot_likes_vs_sentiment(df), use_container_width=True)
+        st.plotly_chart(sentiment_figs["likes"], use_container_width=True)
 
         st.subheader("Word Cloud")
-        text = " ".join(df['text'].dropna().astype(str))
-        wc_fig = make_wordcloud_figure(text, width=600, height=300)
-        st.pyplot(wc_fig)
+        # laid out from the keyword counts above, not by re-tokenizing the corpus
+        wc_png = render_wordcloud(terms.most_common("keyword", WORDCLOUD_MAX_WORDS), width=600, height=300)
+        if wc_png is not None:
+            st.image(wc_png, use_column_width=True)
+        else:
+            st.info("No text to generate wordcloud")
 
     st.markdown("### Comments")
 
-    # sorting
-    if sort_opt == "Most liked":
-        df = df.sort_values(by='like_count', ascending=False)
-    elif sort_opt == "Most recent" and 'published_at' in df.columns:
-        df = df.sort_values(by='published_at', ascending=False)
-    elif sort_opt == "Most positive":
-        df = df.sort_values(by='sentiment_score', ascending=False)
-    elif sort_opt == "Most negative":
-        df = df.sort_values(by='sentiment_score', ascending=True)
-
-    show_df = df.head(n_display)
+    # keyset pages over a cached sort permutation, or indexed queries for stored history
+    browse_source = st.radio("Browse", ["This analysis", "Stored history"], horizontal=True, key="browse_source")
+    browse_video = str(df["video_id"].dropna().iloc[0]) if df["video_id"].notna().any() else None
+    browse_key = (fp, browse_source, sort_opt, n_display)
+    if st.session_state.get("browse_key") != browse_key:
+        st.session_state.browse_key = browse_key
+        # cursor that starts each visited page; the last one is the current page
+        st.session_state.browse_cursors = [None]
+    cursors = st.session_state.browse_cursors
+
+    if browse_source == "Stored history" and browse_video:
+        try:
+            show_df, next_cursor = page_comments(browse_video, sort_opt, after=cursors[-1], limit=n_display)
+        except Exception as e:
+            st.info(f"Stored history unavailable: {e}")
+            show_df, next_cursor = df.iloc[0:0], None
+    else:
+        view = artifacts.get("sorted_view", df, fp, sort_by=sort_opt)
+        positions, next_cursor = view.page(after=cursors[-1], limit=n_display)
+        show_df = df.iloc[positions]
+
+    nav_prev, nav_page, nav_next = st.columns([1, 2, 1])
+    if nav_prev.button("Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if nav_next.button("Next", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
+    nav_page.caption(f"Page {len(cursors)}")
 
     import html
 
@@ -365,10 +463,9 @@ if not df.empty:
         """
 
     # -------- B. build scrollable container --------
-    cards = '<div class="scroll-area">'
-    for _, row in show_df.iterrows():
-        cards += safe_format_comment_card(row)
-    cards += '</div>'
+    cards = '<div class="scroll-area">' + "".join(
+        safe_format_comment_card(row) for row in show_df.to_dict("records")
+    ) + '</div>'
 
     # -------- C. full HTML for iframe --------
     full_html = f"""
@@ -472,11 +569,18 @@ if not df.empty:
     # --- Hashtag & Keyword Analysis ---
     st.markdown("### Hashtag & Keyword Insights")
 
+    # plotly is only imported once there are results to chart
+    px = resource("plotly_express")
+
+    if approx:
+        with st.expander("Approximate term counts"):
+            st.caption("Counts may be overestimated by at most max_error.")
+            st.json(terms.error_bounds())
+
     # HASHTAGS
-    hashtags = get_hashtag_counts(df)
+    top_tags = terms.most_common("hashtag", 20)
 
-    if len(hashtags) > 0:
-        top_tags = hashtags.most_common(20)
+    if len(top_tags) > 0:
         tags_df = pd.DataFrame(top_tags, columns=["hashtag","count"])
 
         st.subheader("Top Hashtags")
@@ -488,7 +592,7 @@ if not df.empty:
         st.info("No hashtags found in comments.")
 
     # KEYWORDS
-    keywords = get_keyword_counts(df, top_n=20)
+    keywords = terms.most_common("keyword", 20)
 
     if len(keywords) > 0:
         kw_df = pd.DataFrame(keywords, columns=["keyword","count"])
@@ -500,15 +604,49 @@ if not df.empty:
         st.plotly_chart(fig_kw, use_container_width=True)
     else:
         st.info("No meaningful keywords found.")
-
+
+    # BIGRAMS
+    bigrams = terms.most_common("bigram", 20)
+
+    if len(bigrams) > 0:
+        bg_df = pd.DataFrame(bigrams, columns=["bigram","count"])
+
+        st.subheader("Top Bigrams")
+        fig_bg = px.bar(bg_df, x="bigram", y="count",
+                        title="Most Frequent Keyword Pairs",
+                        template="plotly_dark")
+        st.plotly_chart(fig_bg, use_container_width=True)
+
+    # STORED TOKEN INDEX (aggregated in Postgres as comments are saved)
+    with st.expander("Keyword index across stored comments"):
+        idx_kind = st.selectbox("Token kind", ["keyword", "bigram", "hashtag"], key="idx_kind")
+        idx_scope = st.radio("Scope", ["This video/post", "All stored comments"], horizontal=True, key="idx_scope")
+        idx_days = st.slider("Published in the last N days", min_value=1, max_value=3650, value=365, key="idx_days")
+        idx_video = None
+        if idx_scope == "This video/post" and df["video_id"].notna().any():
+            idx_video = str(df["video_id"].dropna().iloc[0])
+        since = (pd.Timestamp.utcnow() - pd.Timedelta(days=idx_days)).date()
+        try:
+            idx_top = top_tokens(idx_kind, n=20, video_id=idx_video, since=since)
+            if idx_top.empty:
+                st.info("No indexed tokens yet. Save results to DB to build the index.")
+            else:
+                st.plotly_chart(px.bar(idx_top, x="token", y="count", template="plotly_dark",
+                                       title="Most frequent stored tokens"), use_container_width=True)
+                idx_trend = token_daily_counts(idx_top["token"].head(5), idx_kind, video_id=idx_video, since=since)
+                st.plotly_chart(px.line(idx_trend, x="day", y="count", color="token", template="plotly_dark",
+                                        title="Daily counts of the top 5"), use_container_width=True)
+        except Exception as e:
+            st.info(f"Keyword index unavailable: {e}")
+
     # -------------------------------
     #  EMOTION ANALYSIS (AGGREGATES)
     # -------------------------------
     st.markdown("## 😃 Emotion Analysis")
 
-    emotion_cols = [
+    emotion_cols = (
         "anger","disgust","fear","joy","sadness","surprise","trust","anticipation"
-    ]
+    )
 
     # Only use columns that actually exist (NRC or transformer emotions will be present as appropriate)
     available_emotions = [c for c in emotion_cols if c in df.columns]
@@ -516,8 +654,7 @@ if not df.empty:
     if len(available_emotions) == 0:
         st.info("No emotion data available for the selected model.")
     else:
-        emotion_sums = df[available_emotions].sum().sort_values(ascending=False)
-        emo_df = pd.DataFrame({"emotion": emotion_sums.index, "score": emotion_sums.values})
+        emo_df, dominant_counts = artifacts.get("emotion_summary", df, fp, columns=emotion_cols)
 
         fig_emo = px.bar(
             emo_df,
@@ -530,8 +667,7 @@ if not df.empty:
         st.plotly_chart(fig_emo, use_container_width=True)
 
         # dominant emotion pie chart (only if column exists)
-        if "dominant_emotion" in df.columns:
-            dominant_counts = df["dominant_emotion"].value_counts()
+        if dominant_counts is not None:
             fig_dom = px.pie(
                 values=dominant_counts.values,
                 names=dominant_counts.index,
@@ -557,32 +693,29 @@ if not df.empty:
                 if c not in df_to_save.columns:
                     df_to_save[c] = None
 
-            create_comments_table()
-            insert_comments(df_to_save)
+            ensure_schema()
+            insert_report = insert_comments(df_to_save)
+            if insert_report["failed"]:
+                st.warning(f"{insert_report['failed']} rows could not be saved and were skipped (see the server log).")
+            pending = st.session_state.get("pending_incremental")
+            if pending is not None:
+                # the new rows of the last incremental fetch are stored now
+                advance_to_newest(pending, insert_report["inserted"])
+                st.session_state.pending_incremental = None
             # ---  Update VADER columns if they exist ---
             if "vader_label" in df_to_save.columns:
-                from src.db_utils import get_connection
-                conn = get_connection()
-                cur = conn.cursor()
-                for _, r in df_to_save.iterrows():
-                    cur.execute("""
-                        UPDATE youtube_comments
-                        SET vader_compound=%s, vader_positive=%s, vader_neutral=%s, vader_negative=%s, vader_label=%s
-                        WHERE comment_id=%s
-                    """, (
-                        r.get("vader_compound"),
-                        r.get("vader_positive"),
-                        r.get("vader_neutral"),
-                        r.get("vader_negative"),
-                        r.get("vader_label"),
-                        r.get("comment_id"),
-                    ))
-                conn.commit()
-                cur.close()
-                conn.close()
+                from src.db_utils import connection, frame_rows, update_comment_columns
+                from src.data_cleaning_vader import VADER_COLUMNS, VADER_CASTS
+                rows = frame_rows(df_to_save, ["comment_id"] + VADER_COLUMNS)
+                with connection() as conn, conn.cursor() as cur:
+                    update_comment_columns(cur, VADER_COLUMNS, rows, casts=VADER_CASTS)
                 status.info("VADER results saved to DB.")
 
             status.success("Saved analysis to DB ")
+            with st.sidebar.expander("DB pool stats"):
+                st.json(pool_stats())
+            with st.sidebar.expander("Artifact cache"):
+                st.json(artifact_cache_stats())
         except Exception as e:
             status.error(f"DB Save failed: {e}")
 
@@ -597,32 +730,36 @@ st.subheader("Export Analyzed Data")
 
 # Use session_state df if available
 if "last_df" in st.session_state and not st.session_state.last_df.empty:
-    df_export = st.session_state.last_df.copy()
-
-    # Convert timezone-aware datetime columns to naive (Excel-safe)
-    for col in df_export.select_dtypes(include=["datetimetz"]).columns:
-        df_export[col] = df_export[col].dt.tz_localize(None)
-
-    # Prepare files in memory
-    csv = df_export.to_csv(index=False).encode('utf-8')
-    excel_buffer = io.BytesIO()
-    df_export.to_excel(excel_buffer, index=False, engine='xlsxwriter')
+    df_export = st.session_state.last_df
+    if st.session_state.get("last_fp", (None, None))[0] is not df_export:
+        st.session_state.last_fp = (df_export, frame_fingerprint(df_export))
+    export_fp = st.session_state.last_fp[1]
 
+    # files are only serialized when asked for; a session keeps just its latest one
+    export_labels = {"CSV": "csv", "CSV (gzip)": "csv.gz", "Excel": "xlsx", "Parquet": "parquet"}
     col1, col2 = st.columns(2)
     with col1:
-        st.download_button(
-            label="Download as CSV",
-            data=csv,
-            file_name="youtube_comments_sentiment.csv",
-            mime="text/csv"
-        )
+        export_label = st.selectbox("Format", list(export_labels), key="export_format")
+        export_fmt = export_labels[export_label]
+        if st.button("Prepare download"):
+            st.session_state.prepared_export = None  # let the old bytes go before building
+            try:
+                with st.spinner(f"Building {export_label} export..."):
+                    st.session_state.prepared_export = (
+                        export_fp, export_fmt, export_bytes(df_export, export_fmt)
+                    )
+            except Exception as e:
+                st.error(f"Export failed: {e}")
 
     with col2:
-        st.download_button(
-            label="Download as Excel",
-            data=excel_buffer.getvalue(),
-            file_name="youtube_comments_sentiment.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+        prepared = st.session_state.get("prepared_export")
+        if prepared is not None and prepared[:2] == (export_fp, export_fmt):
+            suffix, mime = EXPORT_FORMATS[export_fmt]
+            st.download_button(
+                label=f"Download as {export_label}",
+                data=prepared[2],
+                file_name="youtube_comments_sentiment" + suffix,
+                mime=mime
+            )
 else:
     st.info("No data available to export yet.")
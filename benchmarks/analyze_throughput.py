@@ -0,0 +1,109 @@
+"""
+Throughput of POST /analyze against a real uvicorn server.
+
+    python benchmarks/analyze_throughput.py                       # vader, 1000 texts/request
+    python benchmarks/analyze_throughput.py --scorers vader nrc --batch 5000 --clients 4
+
+The score cache is disabled in the server so every request is scored, and
+every request carries distinct texts.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORDS = ("good bad great awful love hate happy sad angry calm video song funny boring "
+         "amazing terrible nice worst best okay fine wow really very not so the this is").split()
+
+
+def make_texts(n, seed):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 30))) + f" #{seed}-{i}" for i in range(n)]
+
+
+def start_server(port, workers):
+    env = dict(os.environ, SCORE_CACHE_ENABLED="0", SCORING_WORKERS=str(workers))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.scraper_api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scorers", nargs="+", default=["vader"])
+    parser.add_argument("--batch", type=int, default=1000, help="texts per request")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=2, help="concurrent client threads")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="server SCORING_WORKERS")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--no-gzip", action="store_true")
+    args = parser.parse_args(argv)
+
+    bodies = [json.dumps({"texts": make_texts(args.batch, i), "scorers": args.scorers}).encode()
+              for i in range(args.requests + 1)]
+    headers = {"content-type": "application/json"}
+    if not args.no_gzip:
+        bodies = [gzip.compress(b) for b in bodies]
+        headers.update({"content-encoding": "gzip", "accept-encoding": "gzip"})
+
+    proc = start_server(args.port, args.workers)
+    try:
+        url = f"http://127.0.0.1:{args.port}/analyze"
+        with httpx.Client(timeout=600) as client:
+            client.post(url, content=bodies[-1], headers=headers).raise_for_status()  # warm the pool
+
+        pending = list(bodies[:-1])
+        lock = threading.Lock()
+        latencies = []
+
+        def worker():
+            with httpx.Client(timeout=600) as client:
+                while True:
+                    with lock:
+                        if not pending:
+                            return
+                        body = pending.pop()
+                    started = time.perf_counter()
+                    client.post(url, content=body, headers=headers).raise_for_status()
+                    with lock:
+                        latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(args.clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    latencies.sort()
+    print(f"cores={os.cpu_count()} workers={args.workers} scorers={','.join(args.scorers)} "
+          f"batch={args.batch} clients={args.clients} gzip={not args.no_gzip}")
+    print(f"{args.requests / elapsed:.2f} requests/s, {args.requests * args.batch / elapsed:,.0f} texts/s, "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
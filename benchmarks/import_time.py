@@ -0,0 +1,85 @@
+"""
+Import-time breakdown for the app and its src modules.
+
+    python benchmarks/import_time.py                  # summary for every module
+    python benchmarks/import_time.py src.db_utils -n 15
+
+Each module is imported in a fresh interpreter with `python -X importtime`
+(best of --repeat runs). The summary lists the total import time, which
+heavy packages got loaded and the slowest direct imports. Results are recorded in
+benchmarks/import_time.md; rerun after adding imports to spot regressions.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "src.config",
+    "src.data_tweetclaw",
+    "src.data_extraction",
+    "src.keyword_analysis",
+    "src.data_cleaning",
+    "src.data_cleaning_vader",
+    "src.emotion_analysis",
+    "src.utils_visuals",
+    "src.parallel_scoring",
+    "src.db_utils",
+    "app",
+]
+
+# heavy packages that should only load on first use
+HEAVY = ("streamlit", "plotly", "matplotlib", "wordcloud", "textblob", "vaderSentiment", "nltk", "nrclex")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(module):
+    """Return (total_us, [(cumulative_us, name)] of the module's direct imports, all module names)."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    code = f"import {module}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            entries.append((int(m.group(2)), len(m.group(3)) // 2, m.group(4)))
+    if proc.returncode != 0:
+        error = [line for line in proc.stderr.splitlines() if "Error" in line]
+        raise RuntimeError(error[-1] if error else "import failed")
+    # interpreter startup (site, encodings) is reported at depth 0 too; skip it
+    total = sum(cum for cum, depth, name in entries if depth == 0 and name.split(".")[0] in (module.split(".")[0], module))
+    direct = sorted(((cum, name) for cum, depth, name in entries if depth == 1), reverse=True)
+    return total, direct, [name for _, _, name in entries]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("-n", "--top", type=int, default=5, help="dependencies to list per module")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("| module | import ms | heavy packages loaded | slowest direct imports (ms) |")
+    print("| --- | ---: | --- | --- |")
+    for module in args.modules:
+        try:
+            runs = [measure(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"| {module} | failed | | {e} |")
+            continue
+        total, direct, names = min(runs, key=lambda r: r[0])
+        heavy = sorted({n.split(".")[0] for n in names if n.split(".")[0] in HEAVY})
+        slowest = ", ".join(f"{name} {cum / 1000:.0f}" for cum, name in direct[:args.top])
+        print(f"| {module} | {total / 1000:.0f} | {', '.join(heavy) or '-'} | {slowest} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# keep the score cache out of the working tree during tests
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="sma-test-cache-"))
+# fetcher tests use fake sessions; HTTPCache is tested directly
+os.environ.setdefault("HTTP_CACHE_ENABLED", "0")
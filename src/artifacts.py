@@ -0,0 +1,191 @@
+# src/artifacts.py
+
+import hashlib
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.cache_utils import LRUCache
+from src.config import ARTIFACT_CACHE_ITEMS, ARTIFACT_CACHE_MAX_MB
+
+# kind -> builder(df, **options); every builder is a pure function of its inputs
+_builders = {}
+# kind -> sizeof(value, df), the bytes an artifact holds
+_sizers = {}
+
+
+def estimate_size(value, _seen=None):
+    """
+    Rough bytes held by a value: frames, arrays and bytes exactly, and
+    containers and plain objects by walking what they hold (each object
+    counted once).
+    """
+    _seen = set() if _seen is None else _seen
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v, _seen) for v in value)
+    if hasattr(value, "__dict__") and not isinstance(value, type):
+        return sys.getsizeof(value) + estimate_size(vars(value), _seen)
+    return sys.getsizeof(value)
+
+
+def artifact(kind, sizeof=None):
+    """
+    Decorator registering a derived dashboard artifact under `kind`.
+    sizeof(value, df) gives the bytes it holds when estimate_size cannot.
+    """
+    def decorator(builder):
+        _builders[kind] = builder
+        _sizers[kind] = sizeof or (lambda value, df: estimate_size(value))
+        return builder
+    return decorator
+
+
+def frame_fingerprint(df):
+    """
+    Content hash of a frame: shape, column names and dtypes, the index and
+    every cell. Equal frames share a fingerprint across reruns and sessions;
+    any edit, added column or reorder changes it.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((df.shape, [str(c) for c in df.columns], [str(t) for t in df.dtypes])).encode())
+    h.update(pd.util.hash_pandas_object(df.index).values.tobytes())
+    for col in df.columns:
+        values = df[col]
+        try:
+            hashed = pd.util.hash_pandas_object(values, index=False)
+        except TypeError:
+            # unhashable cells (lists, dicts from nested exports)
+            hashed = pd.util.hash_pandas_object(values.astype(str), index=False)
+        h.update(hashed.values.tobytes())
+    return h.hexdigest()
+
+
+class ArtifactCache:
+    """
+    Memoizes artifacts by (kind, frame fingerprint, options), so a rerun only
+    rebuilds what depends on the control that changed. Values are shared,
+    not copied: callers must treat them as read-only. The cache is bounded
+    by entries and by the estimated bytes of what it holds, evicting least
+    recently used artifacts first.
+    """
+
+    def __init__(self, max_items=ARTIFACT_CACHE_ITEMS, max_bytes=ARTIFACT_CACHE_MAX_MB * 1024 * 1024):
+        self._memory = LRUCache(max_items, max_bytes=max_bytes)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _key_lock(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, kind, df, fingerprint=None, **options):
+        if kind not in _builders:
+            raise KeyError(f"Unknown artifact '{kind}'. Registered: {', '.join(sorted(_builders))}")
+        fingerprint = fingerprint or frame_fingerprint(df)
+        key = (kind, fingerprint, tuple(sorted(options.items())))
+        missing = object()
+        value = self._memory.get(key, missing)
+        if value is not missing:
+            self._count(hit=True)
+            return value
+        # one build per key even when several sessions rerun at once
+        with self._key_lock(key):
+            value = self._memory.get(key, missing)
+            if value is missing:
+                self._count(hit=False)
+                value = _builders[kind](df, **options)
+                self._memory.set(key, value, size=_sizers[kind](value, df))
+            else:
+                self._count(hit=True)
+        with self._locks_guard:
+            self._locks.pop(key, None)
+        return value
+
+    def clear(self):
+        self._memory.clear()
+
+    def stats(self):
+        with self._stats_lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._memory),
+                    "bytes": self._memory.size_bytes}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_artifact_cache():
+    """Process-wide cache shared by every session of the app."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ArtifactCache()
+        return _cache
+
+
+def artifact_cache_stats():
+    return _cache.stats() if _cache is not None else {}
+
+
+# the figures embed the plotted columns (and hover text) of every row
+@artifact("sentiment_figures", sizeof=lambda figures, df: estimate_size(df))
+def _sentiment_figures(df):
+    from src.utils_visuals import (
+        plot_likes_vs_sentiment, plot_sentiment_bar, plot_sentiment_pie, timeseries_sentiment
+    )
+    return {
+        "bar": plot_sentiment_bar(df),
+        "pie": plot_sentiment_pie(df),
+        "timeseries": timeseries_sentiment(df),
+        "likes": plot_likes_vs_sentiment(df),
+    }
+
+
+@artifact("term_counts")
+def _term_counts(df, approx_capacity=None):
+    from src.keyword_analysis import count_terms
+    return count_terms(df["text"].dropna(), approx_capacity=approx_capacity)
+
+
+@artifact("emotion_summary")
+def _emotion_summary(df, columns=()):
+    """Summed emotion scores (descending) and the dominant emotion counts."""
+    available = [c for c in columns if c in df.columns]
+    sums = df[available].sum().sort_values(ascending=False)
+    emo_df = pd.DataFrame({"emotion": sums.index, "score": sums.values})
+    dominant = df["dominant_emotion"].value_counts() if "dominant_emotion" in df.columns else None
+    return emo_df, dominant
+
+
+@artifact("sorted_view")
+def _sorted_view(df, sort_by="Most liked"):
+    """Precomputed permutation of df for one comment sort mode."""
+    from src.comment_browser import SortedView
+    return SortedView(df, sort_by)
@@ -0,0 +1,200 @@
+# src/cache_utils.py
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Small thread-safe in-memory LRU keyed by any hashable.
+    With max_bytes, set() takes each value's size and the least recently
+    used entries are evicted until the total fits; a value larger than
+    max_bytes on its own is not kept.
+    """
+
+    def __init__(self, max_items=10000, max_bytes=None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._sizes = {}
+        self.size_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value, size=0):
+        with self._lock:
+            self.size_bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while self._data and (
+                len(self._data) > self.max_items
+                or (self.max_bytes is not None and self.size_bytes > self.max_bytes)
+            ):
+                evicted, _ = self._data.popitem(last=False)
+                self.size_bytes -= self._sizes.pop(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.size_bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteLRU:
+    """
+    Persistent key -> bytes store in a single SQLite file.
+    Keeps the total value size under max_bytes by evicting the least
+    recently used entries down to 90% of the cap whenever it is exceeded.
+    The file is shared by several processes (app, API, workers), so the
+    in-memory size is only this process's estimate: it decides when to
+    check, and the check itself sums the table inside the eviction
+    transaction. The estimate is also resynced every sync_seconds, so
+    writes from other processes are noticed.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, sync_seconds=10.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.sync_seconds = sync_seconds
+        self.evictions = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self._size = self._stored_size()
+        self._synced_at = time.monotonic()
+
+    def _stored_size(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _select(self, sql, keys):
+        # stay well under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            marks = ",".join("?" * len(part))
+            yield from self._conn.execute(sql.format(marks=marks), part).fetchall()
+
+    def get_many(self, keys):
+        """Return {key: (value, stored_at)} for the keys present, marking them used."""
+        keys = list(keys)
+        with self._lock:
+            found = {
+                key: (value, stored_at)
+                for key, value, stored_at in self._select(
+                    "SELECT key, value, stored_at FROM entries WHERE key IN ({marks})", keys
+                )
+            }
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE entries SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+        return found
+
+    def get(self, key):
+        """Return (value, stored_at), or (None, None) on a miss."""
+        return self.get_many([key]).get(key, (None, None))
+
+    def set_many(self, items):
+        """items: iterable of (key, bytes)."""
+        now = time.time()
+        rows = [(key, value, len(value), now, now) for key, value in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            # entries we overwrite no longer count towards the size
+            replaced = sum(size for (size,) in self._select(
+                "SELECT size FROM entries WHERE key IN ({marks})", [r[0] for r in rows]
+            ))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, size, stored_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute("COMMIT")
+            self._size += sum(r[2] for r in rows) - replaced
+            if self._size > self.max_bytes or time.monotonic() - self._synced_at > self.sync_seconds:
+                self._evict()
+
+    def set(self, key, value):
+        self.set_many([(key, value)])
+
+    def touch(self, key):
+        """Mark an entry as freshly stored, e.g. after an HTTP 304 revalidation."""
+        with self._lock:
+            now = time.time()
+            self._conn.execute("UPDATE entries SET stored_at = ?, last_used = ? WHERE key = ?", (now, now, key))
+
+    def _evict(self):
+        """Resync the size from the file and, if it is over the cap, evict. Caller holds the lock."""
+        target = int(self.max_bytes * 0.9)
+        # IMMEDIATE takes the write lock first, so no other process changes
+        # the table between the sum and the deletes
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            size = self._stored_size()
+            freed = 0
+            doomed = []
+            if size > self.max_bytes:
+                cur = self._conn.execute("SELECT key, size FROM entries ORDER BY last_used")
+                for key, entry_size in cur:
+                    if size - freed <= target:
+                        break
+                    doomed.append((key,))
+                    freed += entry_size
+                cur.close()
+                self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._size = size - freed
+        self._synced_at = time.monotonic()
+        self.evictions += len(doomed)
+
+    def size_bytes(self):
+        with self._lock:
+            self._size = self._stored_size()
+            self._synced_at = time.monotonic()
+            return self._size
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._size = 0
+            self._synced_at = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
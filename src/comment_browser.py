@@ -0,0 +1,70 @@
+# src/comment_browser.py
+
+import numpy as np
+import pandas as pd
+
+# display mode -> (frame column, descending)
+SORT_MODES = {
+    "Most liked": ("like_count", True),
+    "Most recent": ("published_at", True),
+    "Most positive": ("sentiment_score", True),
+    "Most negative": ("sentiment_score", False),
+}
+
+
+def rank_keys(df, sort_by):
+    """
+    One float per row such that ascending key order is display order.
+    Descending modes are negated and missing values rank last, so every
+    mode can share the same ascending search below.
+    """
+    if sort_by not in SORT_MODES:
+        raise ValueError(f"Unknown sort mode '{sort_by}'. Use one of: {', '.join(SORT_MODES)}")
+    column, descending = SORT_MODES[sort_by]
+    if column not in df.columns:
+        return np.zeros(len(df))
+    values = df[column]
+    if column == "published_at":
+        stamps = pd.to_datetime(values, errors="coerce", utc=True)
+        keys = (stamps - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy(dtype="float64", na_value=np.nan)
+    else:
+        keys = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    if descending:
+        keys = -keys
+    return np.where(np.isnan(keys), np.inf, keys)
+
+
+class SortedView:
+    """
+    A frame's rows in one sort mode: the stable permutation and the keys in
+    that order, computed once (O(n log n)) per frame and mode.
+    Pages are found by keyset: a cursor is (key, row position) of the last
+    row shown, located with two binary searches, so every page costs
+    O(log n + limit) however deep it is.
+    """
+
+    def __init__(self, df, sort_by):
+        keys = rank_keys(df, sort_by)
+        self.sort_by = sort_by
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+
+    def __len__(self):
+        return len(self.order)
+
+    def _start(self, after):
+        if after is None:
+            return 0
+        key, position = after
+        lo = int(np.searchsorted(self.keys, key, side="left"))
+        hi = int(np.searchsorted(self.keys, key, side="right"))
+        # equal keys keep their original row order (stable sort)
+        return lo + int(np.searchsorted(self.order[lo:hi], position, side="right"))
+
+    def page(self, after=None, limit=20):
+        """Row positions of the page after the cursor and the cursor for the next one."""
+        start = self._start(after)
+        positions = self.order[start:start + limit]
+        end = start + len(positions)
+        cursor = (float(self.keys[end - 1]), int(positions[-1])) if len(positions) and end < len(self.order) else None
+        return positions, cursor
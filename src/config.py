@@ -1,12 +1,119 @@
 import os
-from dotenv import load_dotenv
+
+
+def _load_env_file():
+    """
+    Load the nearest .env at or above this package, the one load_dotenv()
+    would find, importing python-dotenv only when there is such a file.
+    The settings below are read once at import, so this cannot wait for
+    first use.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
+
 
 # Load variables from .env file
-load_dotenv()
+_load_env_file()
 
 DB_URI = os.getenv("DB_URI")
 
-if not DB_URI:
-    print("DB_URI not found. Make sure it is set in the .env file.")
-else:
-    print("DB_URI loaded from .env")
+# Connection pool sizing (src/db_utils.get_pool)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Parallel scoring (src/parallel_scoring.score_texts)
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "0")) or (os.cpu_count() or 1)
+SCORING_CHUNK_SIZE = int(os.getenv("SCORING_CHUNK_SIZE", "2000"))
+SCORING_MIN_PARALLEL_ROWS = int(os.getenv("SCORING_MIN_PARALLEL_ROWS", "5000"))
+
+# Local caches live next to the project unless told otherwise
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"))
+
+# Score cache (src/score_cache.py)
+SCORE_CACHE_ENABLED = os.getenv("SCORE_CACHE_ENABLED", "1") not in ("0", "false", "False")
+SCORE_CACHE_PATH = os.getenv("SCORE_CACHE_PATH", os.path.join(CACHE_DIR, "scores.sqlite3"))
+SCORE_CACHE_MAX_MB = int(os.getenv("SCORE_CACHE_MAX_MB", "256"))
+SCORE_CACHE_MEMORY_ITEMS = int(os.getenv("SCORE_CACHE_MEMORY_ITEMS", "100000"))
+
+# HTTP response cache shared by the fetchers (src/http_utils.get_json)
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "1") not in ("0", "false", "False")
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", os.path.join(CACHE_DIR, "http.sqlite3"))
+HTTP_CACHE_MAX_MB = int(os.getenv("HTTP_CACHE_MAX_MB", "128"))
+# seconds a cached response is served without asking the server again
+HTTP_CACHE_TTLS = {
+    platform: int(os.getenv(f"HTTP_CACHE_TTL_{platform.upper()}", default))
+    for platform, default in {
+        "youtube": "900",
+        "reddit": "300",
+        "twitter": "300",
+        "instagram": "3600",
+        "default": "300",
+    }.items()
+}
+
+# TweetClaw streaming import (src/data_tweetclaw.iter_tweetclaw_export)
+TWEETCLAW_CHUNK_ROWS = int(os.getenv("TWEETCLAW_CHUNK_ROWS", "50000"))
+TWEETCLAW_MAX_MEMORY_MB = float(os.getenv("TWEETCLAW_MAX_MEMORY_MB", "256")) or None
+
+# Keyword / bigram / hashtag counts switch to approximate top-k above this many rows
+TERM_COUNTS_APPROX_ROWS = int(os.getenv("TERM_COUNTS_APPROX_ROWS", "200000"))
+TERM_COUNTS_CAPACITY = int(os.getenv("TERM_COUNTS_CAPACITY", "5000"))
+
+# Derived dashboard artifacts (figures, term counts, sorted views) kept in memory across reruns
+ARTIFACT_CACHE_ITEMS = int(os.getenv("ARTIFACT_CACHE_ITEMS", "64"))
+# and the estimated bytes they may hold together
+ARTIFACT_CACHE_MAX_MB = int(os.getenv("ARTIFACT_CACHE_MAX_MB", "512"))
+
+# Rows serialized per chunk when building CSV / Excel exports
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "10000"))
+
+# Word cloud: terms placed per image and rendered images kept in memory
+WORDCLOUD_MAX_WORDS = int(os.getenv("WORDCLOUD_MAX_WORDS", "200"))
+WORDCLOUD_CACHE_ITEMS = int(os.getenv("WORDCLOUD_CACHE_ITEMS", "32"))
+
+# Headless pipeline (src/main_pipeline.py): batches in flight between stages, rows per batch
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+PIPELINE_BATCH_ROWS = int(os.getenv("PIPELINE_BATCH_ROWS", "5000"))
+PIPELINE_FETCH_WORKERS = int(os.getenv("PIPELINE_FETCH_WORKERS", "8"))
+# comment ids remembered for dropping repeats across batches (most recent kept)
+PIPELINE_SEEN_IDS = int(os.getenv("PIPELINE_SEEN_IDS", "1000000"))
+
+# Scoring workers (src/scoring_workers.py): rows per claimed batch, lease and heartbeat limits
+SCORING_WORKER_BATCH = int(os.getenv("SCORING_WORKER_BATCH", "500"))
+SCORING_LEASE_SECONDS = float(os.getenv("SCORING_LEASE_SECONDS", "300"))
+SCORING_WORKER_STALE_SECONDS = float(os.getenv("SCORING_WORKER_STALE_SECONDS", "120"))
+
+# Scraper API (src/scraper_api.py): concurrent crawls, page sizes and streaming limits
+SCRAPER_MAX_WORKERS = int(os.getenv("SCRAPER_MAX_WORKERS", "8"))
+SCRAPER_DEFAULT_LIMIT = int(os.getenv("SCRAPER_DEFAULT_LIMIT", "300"))
+SCRAPER_MAX_LIMIT = int(os.getenv("SCRAPER_MAX_LIMIT", "5000"))
+# deepest position a cursor may ask for, so also the most comments one crawl keeps in memory
+SCRAPER_MAX_COMMENTS = int(os.getenv("SCRAPER_MAX_COMMENTS", str(SCRAPER_MAX_LIMIT * 20)))
+SCRAPER_ACQUIRE_TIMEOUT = float(os.getenv("SCRAPER_ACQUIRE_TIMEOUT", "5"))
+
+# Batch scoring endpoint (POST /analyze in src/scraper_api.py)
+ANALYZE_MAX_TEXTS = int(os.getenv("ANALYZE_MAX_TEXTS", "20000"))
+ANALYZE_MAX_BYTES = int(os.getenv("ANALYZE_MAX_BYTES", str(32 * 1024 * 1024)))
+ANALYZE_MIN_PARALLEL_ROWS = int(os.getenv("ANALYZE_MIN_PARALLEL_ROWS", "1000"))
+API_GZIP_MIN_BYTES = int(os.getenv("API_GZIP_MIN_BYTES", "1000"))
+
+# Scraper clients and per-post crawl cache (src/scraper_cache.py)
+SCRAPER_CLIENT_POOL_SIZE = int(os.getenv("SCRAPER_CLIENT_POOL_SIZE", "2"))
+SCRAPER_CACHE_TTL = float(os.getenv("SCRAPER_CACHE_TTL", "300"))
+SCRAPER_CACHE_ITEMS = int(os.getenv("SCRAPER_CACHE_ITEMS", "256"))
+SCRAPER_CRAWL_IDLE_SECONDS = float(os.getenv("SCRAPER_CRAWL_IDLE_SECONDS", "15"))
+# paused crawls keep their pooled client; past this many, a crawl with no demand stops at once
+SCRAPER_MAX_PAUSED_CRAWLS = int(os.getenv("SCRAPER_MAX_PAUSED_CRAWLS", str(max(SCRAPER_CLIENT_POOL_SIZE - 1, 0))))
+# optional: reuse a saved Instaloader login (instaloader --login USER writes the file)
+INSTAGRAM_SESSION_USER = os.getenv("INSTAGRAM_SESSION_USER")
+INSTAGRAM_SESSION_FILE = os.getenv("INSTAGRAM_SESSION_FILE")
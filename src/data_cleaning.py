@@ -1,6 +1,6 @@
 import pandas as pd
-from textblob import TextBlob
-from src.db_utils import get_connection
+from src.db_utils import connection, update_comment_columns
+from src.lazy import resource
 
 def clean_text(text):
     if not isinstance(text, str):
@@ -9,7 +9,7 @@ def clean_text(text):
     return text
 
 def analyze_sentiment(text):
-    blob = TextBlob(text)
+    blob = resource("textblob")(text)
     polarity = blob.sentiment.polarity
     subjectivity = blob.sentiment.subjectivity
     sentiment = (
@@ -19,40 +19,64 @@ def analyze_sentiment(text):
     )
     return sentiment, polarity, subjectivity
 
-def update_sentiment_in_db():
-    conn = get_connection()
-    cur = conn.cursor()
+def analyze_textblob(text):
+    """Rounded (polarity, subjectivity, label) used by the dashboard."""
+    blob = resource("textblob")(text or "")
+    polarity = round(blob.sentiment.polarity, 4)
+    subjectivity = round(blob.sentiment.subjectivity, 4)
+    if polarity > 0.1:
+        sentiment = "positive"
+    elif polarity < -0.1:
+        sentiment = "negative"
+    else:
+        sentiment = "neutral"
+    return polarity, subjectivity, sentiment
 
-    print("📌 Loading comments without sentiment from DB...")
-    cur.execute("""
-        SELECT comment_id, text 
-        FROM youtube_comments
-        WHERE sentiment IS NULL
-    """)
-    rows = cur.fetchall()
+SENTIMENT_COLUMNS = ["sentiment", "polarity", "subjectivity"]
+SENTIMENT_CASTS = {"sentiment": "text", "polarity": "real", "subjectivity": "real"}
 
-    if not rows:
-        print("✅ All comments already have sentiment values.")
-        cur.close()
-        conn.close()
-        return
-
-    print(f"🔄 Updating sentiment values for {len(rows)} comments...")
-    for comment_id, text in rows:
-        text = clean_text(text)
-        sentiment, polarity, subjectivity = analyze_sentiment(text)
-
-        cur.execute("""
-            UPDATE youtube_comments
-            SET sentiment = %s, polarity = %s, subjectivity = %s
-            WHERE comment_id = %s
-        """, (sentiment, polarity, subjectivity, comment_id))
+def _stream_sentiment(batch_size):
+    """Score the backlog in this process, batch_size rows at a time through a server-side cursor."""
+    processed = 0
+    with connection() as conn:
+        # WITH HOLD keeps the server-side cursor open across the per-batch commits
+        reader = conn.cursor(name="sentiment_backlog", withhold=True)
+        reader.itersize = batch_size
+        writer = conn.cursor()
+        try:
+            reader.execute("SELECT comment_id, text FROM youtube_comments WHERE sentiment IS NULL")
+            while True:
+                batch = reader.fetchmany(batch_size)
+                if not batch:
+                    break
+                rows = [(comment_id,) + analyze_sentiment(clean_text(text)) for comment_id, text in batch]
+                update_comment_columns(writer, SENTIMENT_COLUMNS, rows, casts=SENTIMENT_CASTS)
+                conn.commit()
+                processed += len(batch)
+        finally:
+            reader.close()
+            writer.close()
+    return processed
 
-    conn.commit()
-    cur.close()
-    conn.close()
-
-    print(f"🎉 Sentiment analysis completed & stored for {len(rows)} new comments!")
+def update_sentiment_in_db(batch_size=500):
+    """
+    TextBlob sentiment for stored comments without one. Once
+    `python -m src.scoring_workers setup` has run, batches are claimed with
+    SKIP LOCKED (see src/scoring_workers.py), so running several copies at
+    once splits the backlog instead of scoring rows twice; before that the
+    backlog is streamed through in this process.
+    """
+    from src.scoring_workers import missing_setup, run_worker
+    print("📌 Scoring comments without sentiment from DB...")
+    if missing_setup():
+        processed = _stream_sentiment(batch_size)
+    else:
+        processed = run_worker("textblob", batch_size=batch_size, drain=True)
+    if not processed:
+        print("✅ All comments already have sentiment values.")
+        return 0
+    print(f"🎉 Sentiment analysis completed & stored for {processed} new comments!")
+    return processed
 
 if __name__ == "__main__":
     update_sentiment_in_db()
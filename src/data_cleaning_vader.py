@@ -1,14 +1,13 @@
 # src/data_cleaning_vader.py
 
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from src.db_utils import get_connection
-
-analyzer = SentimentIntensityAnalyzer()
+from src.db_utils import connection, update_comment_columns
+from src.lazy import resource
+from src.parallel_scoring import score_texts
 
 def vader_score(text):
     if not isinstance(text, str) or text.strip() == "":
         return {"compound": 0.0, "pos": 0.0, "neu": 0.0, "neg": 0.0}
-    return analyzer.polarity_scores(text)
+    return resource("vader").polarity_scores(text)
 
 def vader_label_from_compound(compound):
     # standard VADER thresholds
@@ -34,8 +33,7 @@ def add_vader_to_df(df, text_col="text"):
     neg_scores = []
     labels = []
 
-    for txt in df[text_col]:
-        s = vader_score(txt)
+    for s in score_texts(df[text_col].tolist(), "vader"):
         compounds.append(s["compound"])
         pos_scores.append(s["pos"])
         neu_scores.append(s["neu"])
@@ -50,49 +48,65 @@ def add_vader_to_df(df, text_col="text"):
 
     return df
 
+VADER_COLUMNS = ["vader_compound", "vader_positive", "vader_neutral", "vader_negative", "vader_label"]
+VADER_CASTS = {
+    "vader_compound": "real", "vader_positive": "real",
+    "vader_neutral": "real", "vader_negative": "real", "vader_label": "text",
+}
+
 def update_vader_in_db(only_null=True, batch_size=500):
     """
     Compute VADER on rows in DB and write results back.
-    If only_null=True, it will update only rows where vader_label IS NULL.
-    Processes in batches to avoid huge queries.
+    If only_null=True, it will update only rows where vader_label IS NULL;
+    once `python -m src.scoring_workers setup` has run they are claimed batch
+    by batch with SKIP LOCKED (see src/scoring_workers.py), so several copies
+    can run side by side. Otherwise, and for a full rescore, rows are streamed
+    through a named server-side cursor, batch_size at a time, and each batch
+    is written back with one set-based UPDATE, so client memory stays flat
+    however large the backlog is.
+    Returns the number of rows processed.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-
-    if only_null:
-        cur.execute("SELECT comment_id, text FROM youtube_comments WHERE vader_label IS NULL")
-    else:
-        cur.execute("SELECT comment_id, text FROM youtube_comments")
-
-    rows = cur.fetchall()
-    if not rows:
+    if only_null:
+        from src.scoring_workers import missing_setup, run_worker
+        if not missing_setup():
+            processed = run_worker("vader", batch_size=batch_size, drain=True)
+            if not processed:
+                print("No rows to update for VADER.")
+            return processed
+
+    processed = 0
+    with connection() as conn:
+        # WITH HOLD keeps the server-side cursor open across the per-batch commits
+        reader = conn.cursor(name="vader_rescore", withhold=True)
+        reader.itersize = batch_size
+        writer = conn.cursor()
+        try:
+            if only_null:
+                reader.execute("SELECT comment_id, text FROM youtube_comments WHERE vader_label IS NULL")
+            else:
+                reader.execute("SELECT comment_id, text FROM youtube_comments")
+
+            while True:
+                batch = reader.fetchmany(batch_size)
+                if not batch:
+                    break
+
+                updates = []
+                for comment_id, text in batch:
+                    s = vader_score(text or "")
+                    label = vader_label_from_compound(s["compound"])
+                    updates.append((comment_id, s["compound"], s["pos"], s["neu"], s["neg"], label))
+
+                update_comment_columns(writer, VADER_COLUMNS, updates, casts=VADER_CASTS)
+                conn.commit()
+                processed += len(batch)
+                print(f"Processed {processed} rows")
+        finally:
+            reader.close()
+            writer.close()
+
+    if not processed:
         print("No rows to update for VADER.")
-        cur.close(); conn.close(); return
-
-    print(f"Found {len(rows)} rows to analyze with VADER.")
-
-    # process in batches
-    i = 0
-    while i < len(rows):
-        batch = rows[i:i+batch_size]
-        updates = []
-        for comment_id, text in batch:
-            s = vader_score(text or "")
-            label = vader_label_from_compound(s["compound"])
-            updates.append((s["compound"], s["pos"], s["neu"], s["neg"], label, comment_id))
-
-        # We'll just run individual updates to keep it simple and safe
-        for comp, p, neu, neg, lab, cid in updates:
-            cur.execute("""
-                UPDATE youtube_comments
-                SET vader_compound=%s, vader_positive=%s, vader_neutral=%s, vader_negative=%s, vader_label=%s
-                WHERE comment_id = %s
-            """, (comp, p, neu, neg, lab, cid))
-        conn.commit()
-        i += batch_size
-        print(f"Processed {i if i < len(rows) else len(rows)} / {len(rows)}")
-
-    cur.close()
-    conn.close()
-    print("VADER update complete.")
-
+    else:
+        print("VADER update complete.")
+    return processed
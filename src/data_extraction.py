@@ -1,23 +1,22 @@
 import os
 import re
-import requests
 import pandas as pd
-import streamlit as st
-from dotenv import load_dotenv
-from pathlib import Path
+
+from src import config  # noqa: F401  loads .env, see src.config._load_env_file
+from src.http_utils import get_json
 
 # ----------------------------------------------------
 # LOAD API KEY (Streamlit Cloud → st.secrets)
-# Local development → .env file
+# Local development → .env file, loaded by src.config
 # ----------------------------------------------------
-env_path = Path(__file__).resolve().parent.parent / ".env"
-load_dotenv(env_path)
 
 def get_youtube_api_key():
     api_key = os.getenv("YOUTUBE_API_KEY")
     if api_key:
         return api_key
 
+    # streamlit is only needed (and imported) when the env var is missing
+    import streamlit as st
     try:
         api_key = st.secrets.get("YOUTUBE_API_KEY")
     except FileNotFoundError:
@@ -42,37 +41,67 @@ def extract_video_id(url):
 # ----------------------------------------------------
 # Fetch Comments
 # ----------------------------------------------------
-def get_comments(video_url, max_results=200):
+COMMENT_THREADS_URL = "https://www.googleapis.com/youtube/v3/commentThreads"
+# only the snippet fields we map below
+COMMENT_FIELDS = (
+    "nextPageToken,"
+    "items(id,snippet/topLevelComment/snippet(authorDisplayName,textDisplay,likeCount,publishedAt))"
+)
+
+
+def _reached_watermark(record, watermark):
+    if record["comment_id"] == watermark.get("comment_id"):
+        return True
+    published = pd.to_datetime(record["published_at"], errors="coerce", utc=True)
+    mark = pd.Timestamp(watermark["published_at"])
+    mark = mark.tz_localize("UTC") if mark.tzinfo is None else mark
+    # equal timestamps are kept; the insert and merge drop any repeats
+    return pd.notna(published) and published < mark
+
+
+def iter_comment_pages(video_url, max_results=200, order=None, session=None, watermark=None):
+    """
+    Yield lists of comment records, one list per API page, as they arrive.
+    Lets callers start scoring the first page while later pages download.
+    With a watermark ({"published_at", "comment_id"} of the newest stored
+    comment) pages are requested newest first and paging stops at it.
+    """
+    if watermark is not None:
+        order = "time"
     video_id = extract_video_id(video_url)
     if not video_id:
         raise ValueError("Invalid YouTube video URL")
     youtube_api_key = get_youtube_api_key()
 
-    comments = []
+    fetched = 0
     next_page_token = None
 
-    while len(comments) < max_results:
-        api_url = "https://www.googleapis.com/youtube/v3/commentThreads"
+    while fetched < max_results:
         params = {
             "part": "snippet",
             "videoId": video_id,
             "key": youtube_api_key,
-            "maxResults": 100,
+            "maxResults": min(100, max_results - fetched),
             "pageToken": next_page_token,
-            "textFormat": "plainText"
+            "textFormat": "plainText",
+            "fields": COMMENT_FIELDS,
         }
+        if order:
+            params["order"] = order
 
-        response = requests.get(api_url, params=params)
-        data = response.json()
+        # a poll must see new comments, so revalidate instead of trusting the TTL
+        data = get_json(COMMENT_THREADS_URL, params=params, platform="youtube", session=session,
+                        max_age=0 if watermark is not None else None)
 
         if "error" in data:
             # More helpful error
             message = data["error"]["message"]
             raise Exception(f"❌ YouTube API Error: {message}")
 
+        page = []
         for item in data.get("items", []):
             snippet = item["snippet"]["topLevelComment"]["snippet"]
-            comments.append({
+            page.append({
                 "comment_id": item["id"],
                 "author": snippet.get("authorDisplayName"),
                 "comment": snippet.get("textDisplay"),
@@ -82,17 +111,33 @@ def get_comments(video_url, max_results=200):
                 "platform": "youtube"
             })
 
+        page = page[:max_results - fetched]
+        caught_up = False
+        if watermark is not None:
+            for i, record in enumerate(page):
+                if _reached_watermark(record, watermark):
+                    page, caught_up = page[:i], True
+                    break
+        fetched += len(page)
+        if page:
+            yield page
+
         next_page_token = data.get("nextPageToken")
-        if not next_page_token:
+        if caught_up or not next_page_token:
             break
 
-    return pd.DataFrame(comments[:max_results])
+
+def get_comments(video_url, max_results=200):
+    comments = []
+    for page in iter_comment_pages(video_url, max_results=max_results):
+        comments.extend(page)
+    return pd.DataFrame(comments)
 
 
 # ----------------------------------------------------
 # Optional: DB utilities
 # ----------------------------------------------------
-from src.db_utils import create_comments_table, insert_comments
+from src.db_utils import ensure_schema, insert_comments
 
 if __name__ == "__main__":
     print("\nFetching comments...")
@@ -103,7 +148,7 @@ if __name__ == "__main__":
         "likes": "like_count"
     })
 
-    create_comments_table()
+    ensure_schema()
     insert_comments(df)
 
     print("✅ Comments inserted into PostgreSQL!\n")
@@ -1,7 +1,8 @@
-import requests
 import pandas as pd
 from datetime import datetime
 
+from src.http_utils import get_json
+
 def extract_shortcode(url):
     for part in url.split("/"):
         if len(part) == 11:
@@ -20,8 +21,7 @@ def fetch_instagram_comments(post_url: str):
     }
 
     try:
-        res = requests.get(api_url, headers=headers, timeout=10)
-        data = res.json()
+        data = get_json(api_url, platform="instagram", headers=headers, timeout=10)
     except:
         return pd.DataFrame()
 
@@ -1,7 +1,18 @@
-import requests
+import math
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 from datetime import datetime
 
+from src.http_utils import get_json
+
+MORECHILDREN_URL = "https://www.reddit.com/api/morechildren.json"
+MORECHILDREN_BATCH = 100  # ids per morechildren call (API maximum)
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (SocialAnalyticsTool)"
+}
+
 def extract_post_id_from_url(url: str):
     """
     Converts a Reddit post URL into the .json API URL.
@@ -12,57 +23,188 @@ def extract_post_id_from_url(url: str):
         url = url + ".json"
     return url
 
-def fetch_reddit_comments(post_url: str):
+def _get_json(url, params=None, session=None):
+    return get_json(url, params=params, platform="reddit", headers=HEADERS, session=session)
+
+def _comment_row(data, depth):
+    created_utc = data.get("created_utc", None)
+    if created_utc:
+        published = datetime.utcfromtimestamp(created_utc)
+    else:
+        published = None
+
+    return {
+        "comment_id": data.get("id", ""),
+        "author": data.get("author", ""),
+        "text": data.get("body", ""),
+        "published_at": published,
+        "like_count": data.get("ups", 0),
+        "platform": "reddit",
+        "post_id": data.get("link_id", ""),
+        "parent_id": data.get("parent_id", ""),
+        "depth": depth,
+    }
+
+
+class _TreeWalk:
     """
-    Fetches Reddit comments via the public JSON endpoint.
-    Returns a normalized pandas DataFrame.
-    No API keys required.
+    State for one thread walk: collected rows plus the "more" stubs still
+    to resolve. Stubs with child ids go into batched morechildren calls;
+    "continue this thread" stubs (no ids) are fetched by permalink.
     """
 
+    def __init__(self, max_depth, max_comments):
+        self.max_depth = max_depth
+        self.max_comments = max_comments
+        self.rows = []
+        self.seen = set()
+        self.pending = []        # (comment id, depth) from "more" stubs
+        self.continuations = []  # (parent comment id, depth of its children)
+        self.stats = {
+            "api_calls": 1,
+            "more_stubs": 0,
+            "morechildren_calls": 0,
+            "unbatched_calls": 0,
+            "continuation_calls": 0,
+            "truncated_by_depth": 0,
+        }
+
+    def full(self):
+        return len(self.rows) >= self.max_comments
+
+    def visit(self, things, depth, offset=0):
+        """
+        Walk a list of things starting at `depth`. Reddit's own depth field
+        wins when present; `offset` converts the relative depths of a
+        continuation response into depths in the full thread.
+        """
+        # iterative pre-order walk keeps output order stable and avoids recursion limits
+        stack = [(thing, depth) for thing in reversed(things)]
+        while stack:
+            thing, d = stack.pop()
+            data = thing.get("data", {})
+            if "depth" in data:
+                d = data["depth"] + offset
+            if d > self.max_depth:
+                self.stats["truncated_by_depth"] += 1
+                continue
+
+            if thing.get("kind") == "more":
+                self.stats["more_stubs"] += 1
+                children = data.get("children") or []
+                if children:
+                    # resolving this stub on its own would take this many calls
+                    self.stats["unbatched_calls"] += math.ceil(len(children) / MORECHILDREN_BATCH)
+                    self.pending.extend((cid, d) for cid in children if cid not in self.seen)
+                else:
+                    parent = data.get("parent_id", "")
+                    if parent.startswith("t1_"):
+                        self.continuations.append((parent[3:], d))
+                continue
+
+            if thing.get("kind") != "t1":  # t1 = comment
+                continue
+            cid = data.get("id", "")
+            if cid in self.seen or self.full():
+                continue
+            self.seen.add(cid)
+            self.rows.append(_comment_row(data, d))
+
+            replies = data.get("replies")
+            if isinstance(replies, dict):
+                children = replies.get("data", {}).get("children", [])
+                stack.extend((child, d + 1) for child in reversed(children))
+
+
+def walk_comment_tree(post_url, max_depth=10, max_comments=5000, max_calls=50,
+                      max_workers=4, session=None, sort=None):
+    """
+    Fetch every comment of a Reddit thread, not just the first level.
+    Nested replies are walked in order. Ids from "more" stubs are resolved
+    in batches of up to 100 per morechildren call, with at most max_workers
+    calls in flight. max_depth, max_comments and max_calls bound the work.
+    Returns (rows, stats); stats["calls_saved"] counts the morechildren calls
+    avoided by batching ids from different stubs together.
+    sort is passed to Reddit as-is (e.g. "new" for newest first).
+    """
     json_url = extract_post_id_from_url(post_url)
+    params = {"limit": 500, "raw_json": 1}
+    if sort:
+        params["sort"] = sort
+    data = _get_json(json_url, params=params, session=session)
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (SocialAnalyticsTool)"
-    }
+    # Comments are in data[1]['data']['children']
+    link_id = data[0]["data"]["children"][0]["data"]["name"]
+    walk = _TreeWalk(max_depth, max_comments)
+    walk.visit(data[1]["data"]["children"], 0)
+
+    permalink_base = json_url[:-len(".json")]
+
+    def fetch_batch(batch):
+        response = _get_json(MORECHILDREN_URL, params={
+            "api_type": "json",
+            "link_id": link_id,
+            "children": ",".join(cid for cid, _ in batch),
+            "limit_children": "false",
+            "raw_json": 1,
+        }, session=session)
+        return response.get("json", {}).get("data", {}).get("things", [])
+
+    def fetch_continuation(item):
+        parent_id, _ = item
+        response = _get_json(f"{permalink_base}/{parent_id}.json", params={"raw_json": 1}, session=session)
+        parents = response[1]["data"]["children"]
+        # the parent comment comes back as the root at depth 0; we only want its replies
+        replies = parents[0]["data"].get("replies") if parents else None
+        return replies.get("data", {}).get("children", []) if isinstance(replies, dict) else []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while (walk.pending or walk.continuations) and not walk.full():
+            budget = max_calls - walk.stats["api_calls"]
+            if budget <= 0:
+                break
+
+            pending, walk.pending = walk.pending, []
+            batches = [pending[i:i + MORECHILDREN_BATCH] for i in range(0, len(pending), MORECHILDREN_BATCH)]
+            batches, leftover = batches[:budget], batches[budget:]
+            walk.pending = [item for batch in leftover for item in batch]
+            continuations = walk.continuations[:budget - len(batches)]
+            walk.continuations = walk.continuations[len(continuations):]
+
+            # pool.map returns results in submission order, so output is deterministic
+            for batch, things in zip(batches, pool.map(fetch_batch, batches)):
+                walk.stats["api_calls"] += 1
+                walk.stats["morechildren_calls"] += 1
+                walk.visit(things, batch[0][1])
+            for item, things in zip(continuations, pool.map(fetch_continuation, continuations)):
+                walk.stats["api_calls"] += 1
+                walk.stats["continuation_calls"] += 1
+                walk.visit(things, item[1], offset=item[1] - 1)
 
+    stats = dict(walk.stats)
+    stats["comments"] = len(walk.rows)
+    stats["calls_saved"] = max(0, stats["unbatched_calls"] - stats["morechildren_calls"])
+    stats["unresolved_ids"] = len(walk.pending)
+    stats["unresolved_continuations"] = len(walk.continuations)
+    return walk.rows, stats
+
+def fetch_reddit_comments(post_url: str, max_comments=5000, max_depth=10, max_calls=50, sort=None):
+    """
+    Fetches Reddit comments via the public JSON endpoints.
+    Returns a normalized pandas DataFrame including nested replies, with
+    parent_id and depth per comment. Walk statistics are in df.attrs["walk_stats"].
+    No API keys required.
+    """
     try:
-        res = requests.get(json_url, headers=headers, timeout=10)
-        data = res.json()
+        rows, stats = walk_comment_tree(
+            post_url, max_depth=max_depth, max_comments=max_comments, max_calls=max_calls, sort=sort
+        )
     except Exception as e:
         print("Reddit fetch error:", e)
         return pd.DataFrame()
 
-    # Comments are in data[1]['data']['children']
-    try:
-        comments_raw = data[1]['data']['children']
-    except:
-        return pd.DataFrame()
-
-    rows = []
-    for c in comments_raw:
-        if c["kind"] != "t1":  # t1 = comment
-            continue
-
-        body = c["data"].get("body", "")
-        comment_id = c["data"].get("id", "")
-        author = c["data"].get("author", "")
-        ups = c["data"].get("ups", 0)
-        created_utc = c["data"].get("created_utc", None)
-
-        if created_utc:
-            published = datetime.utcfromtimestamp(created_utc)
-        else:
-            published = None
-
-        rows.append({
-            "comment_id": comment_id,
-            "author": author,
-            "text": body,
-            "published_at": published,
-            "like_count": ups,
-            "platform": "reddit",
-            "post_id": c["data"].get("link_id", "")
-        })
-
+    print(f"Reddit: {stats['comments']} comments in {stats['api_calls']} API calls "
+          f"({stats['calls_saved']} saved by batching)")
     df = pd.DataFrame(rows)
+    df.attrs["walk_stats"] = stats
     return df
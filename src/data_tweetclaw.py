@@ -1,15 +1,23 @@
 import io
 import json
-from typing import Any
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, TextIO
 
+import numpy as np
 import pandas as pd
 
+from src.config import TWEETCLAW_CHUNK_ROWS, TWEETCLAW_MAX_MEMORY_MB
+
 
 TEXT_FIELDS = ("text", "full_text", "tweet_text", "tweet", "content", "body", "message")
 TIME_FIELDS = ("created_at", "createdAt", "timestamp", "date", "time", "published_at")
 ID_FIELDS = ("id", "tweet_id", "tweetId", "status_id", "post_id")
 AUTHOR_FIELDS = ("author", "username", "screen_name", "author_username", "authorUsername", "user")
 LIKE_FIELDS = ("like_count", "likes", "favorite_count", "favoriteCount")
+ROW_KEYS = ("data", "items", "results", "tweets", "posts", "replies", "records")
+KNOWN_FIELDS = set(TEXT_FIELDS + TIME_FIELDS + ID_FIELDS + AUTHOR_FIELDS + LIKE_FIELDS)
+
+ARROW_SUFFIXES = {"parquet", "arrow", "feather", "ipc"}
+SUPPORTED_SUFFIXES = {"csv", "json", "jsonl", "ndjson"} | ARROW_SUFFIXES
 
 
 def _first(row: dict[str, Any], fields: tuple[str, ...]) -> str:
@@ -31,7 +39,7 @@ def _first(row: dict[str, Any], fields: tuple[str, ...]) -> str:
 def _int_value(value: str) -> int:
     try:
         return int(float(value))
-    except (TypeError, ValueError):
+    except (TypeError, ValueError, OverflowError):
         return 0
 
 
@@ -40,37 +48,260 @@ def _extract_rows(value: Any) -> list[dict[str, Any]]:
         return [item for item in value if isinstance(item, dict)]
     if not isinstance(value, dict):
         return []
-    for key in ("data", "items", "results", "tweets", "posts", "replies", "records"):
+    for key in ROW_KEYS:
         rows = _extract_rows(value.get(key))
         if rows:
             return rows
     return [value]
 
 
-def _read_uploaded_file(uploaded_file, filename: str) -> list[dict[str, Any]]:
+# raw rows, their dicts and the normalized frame are alive together while a
+# chunk is processed; the ceiling is checked against this multiple
+_MEMORY_OVERHEAD = 4
+# pessimistic in-memory size of one row, used to size the first chunk
+_PROBE_ROW_BYTES = 32 * 1024
+_CHUNK_GROWTH = 4
+_JSON_BLOCK = 1 << 16
+_DECODER = json.JSONDecoder()
+
+
+def _open_binary(uploaded_file) -> BinaryIO:
+    """Readable binary stream for a Streamlit upload, an open file or anything with getvalue()."""
+    if hasattr(uploaded_file, "read"):
+        if hasattr(uploaded_file, "seek"):
+            uploaded_file.seek(0)
+        return uploaded_file
+    return io.BytesIO(uploaded_file.getvalue())
+
+
+class _ChunkPlanner:
+    """Chooses rows per chunk so one chunk stays under the memory ceiling."""
+
+    def __init__(self, chunk_rows: int, max_memory_mb: Optional[float]):
+        self.max_rows = max(1, chunk_rows)
+        self.budget = max_memory_mb * 1024 * 1024 if max_memory_mb else None
+        if self.budget:
+            # with a ceiling, probe with a chunk small enough for very wide rows, then grow
+            self.rows = int(max(1, min(self.max_rows, self.budget // _PROBE_ROW_BYTES)))
+        else:
+            self.rows = self.max_rows
+
+    def observe(self, frame: pd.DataFrame) -> None:
+        if self.budget is None or frame.empty:
+            return
+        per_row = frame.memory_usage(deep=True).sum() / len(frame) * _MEMORY_OVERHEAD
+        fit = self.budget // max(per_row, 1)
+        # grow a few times over at most, in case the rows so far were unusually narrow
+        self.rows = int(max(1, min(self.max_rows, self.rows * _CHUNK_GROWTH, fit)))
+
+    def rows_for(self, bytes_per_row: float) -> int:
+        """Rows per chunk for rows of an estimated size, e.g. from Parquet metadata."""
+        if self.budget is None or bytes_per_row <= 0:
+            return self.max_rows
+        return int(max(1, min(self.max_rows, self.budget // (bytes_per_row * _MEMORY_OVERHEAD))))
+
+
+def _parquet_batches(parquet: Any, columns: list[str], planner: _ChunkPlanner) -> Iterator[Any]:
+    """
+    Arrow batches one row group at a time, each group's batch size bounded by
+    its uncompressed bytes per row (read columns only) and by the planner's
+    current chunk size. The metadata undercounts dictionary-encoded repeats,
+    which the planner's measured size still catches.
+    """
+    metadata = parquet.metadata
+    for i in range(metadata.num_row_groups):
+        group = metadata.row_group(i)
+        if not group.num_rows:
+            continue
+        size = sum(
+            group.column(j).total_uncompressed_size
+            for j in range(group.num_columns)
+            if group.column(j).path_in_schema.split(".")[0] in columns
+        )
+        batch_rows = min(planner.rows, planner.rows_for(size / group.num_rows))
+        yield from parquet.iter_batches(batch_size=batch_rows, row_groups=[i], columns=columns)
+
+
+class _JSONStream:
+    """Pull JSON values off a text stream one at a time."""
+
+    def __init__(self, text: TextIO):
+        self.text = text
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        block = self.text.read(_JSON_BLOCK)
+        if not block:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + block
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Malformed JSON: expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number that ends the buffer may continue in the next block
+            if end == len(self.buf) and not self.eof and isinstance(value, (int, float)):
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def array(self) -> Iterator[Any]:
+        self.take("[")
+        if self.peek() == "]":
+            self.take("]")
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.take(",")
+            else:
+                self.take("]")
+                return
+
+
+def _iter_json_rows(text: TextIO) -> Iterator[dict[str, Any]]:
+    """
+    Stream the records of a JSON export without loading the document.
+    Handles a top-level array and an object whose record array sits under
+    one of ROW_KEYS (the first such array in the file wins). Anything else
+    is parsed whole and handed to _extract_rows.
+    """
+    stream = _JSONStream(text)
+    first = stream.peek()
+    if first == "[":
+        yield from (item for item in stream.array() if isinstance(item, dict))
+        return
+    if first != "{":
+        yield from _extract_rows(stream.value())
+        return
+
+    stream.take("{")
+    rest: dict[str, Any] = {}
+    while stream.peek() != "}":
+        key = stream.value()
+        stream.take(":")
+        if key in ROW_KEYS and stream.peek() == "[":
+            found = False
+            for item in stream.array():
+                if isinstance(item, dict):
+                    found = True
+                    yield item
+            if found:
+                return
+        else:
+            rest[key] = stream.value()
+        if stream.peek() == ",":
+            stream.take(",")
+    stream.take("}")
+    yield from _extract_rows(rest)
+
+
+def _batched(rows: Iterable[dict[str, Any]], planner: _ChunkPlanner) -> Iterator[list[dict[str, Any]]]:
+    batch: list[dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= planner.rows:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _iter_jsonl_rows(text: TextIO) -> Iterator[dict[str, Any]]:
+    for line in text:
+        line = line.strip()
+        if line:
+            parsed = json.loads(line)
+            if isinstance(parsed, dict):
+                yield parsed
+
+
+def _arrow_frames(batches: Iterable[Any], planner: _ChunkPlanner) -> Iterator[pd.DataFrame]:
+    for batch in batches:
+        columns = [name for name in batch.schema.names if name in KNOWN_FIELDS]
+        batch = batch.select(columns)
+        offset = 0
+        while offset < batch.num_rows:
+            part = batch.slice(offset, planner.rows)
+            offset += part.num_rows
+            # nullable ints stay ints instead of turning into "1.0"
+            yield part.to_pandas(integer_object_nulls=True)
+
+
+def _iter_raw_chunks(uploaded_file, filename: str, planner: _ChunkPlanner) -> Iterator[pd.DataFrame]:
     suffix = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
-    content = uploaded_file.getvalue()
+    if suffix not in SUPPORTED_SUFFIXES:
+        raise ValueError("Upload a TweetClaw CSV, JSON, JSONL, NDJSON, Parquet, or Arrow file.")
+
+    binary = _open_binary(uploaded_file)
     if suffix == "csv":
-        return pd.read_csv(io.BytesIO(content)).to_dict(orient="records")
-    text = content.decode("utf-8")
-    if suffix in {"jsonl", "ndjson"}:
-        rows: list[dict[str, Any]] = []
-        for line in text.splitlines():
-            line = line.strip()
-            if line:
-                parsed = json.loads(line)
-                if isinstance(parsed, dict):
-                    rows.append(parsed)
-        return rows
-    if suffix == "json":
-        return _extract_rows(json.loads(text))
-    raise ValueError("Upload a TweetClaw CSV, JSON, JSONL, or NDJSON file.")
-
-
-def load_tweetclaw_export(uploaded_file, filename: str) -> pd.DataFrame:
-    rows = _read_uploaded_file(uploaded_file, filename)
+        # strings throughout: dtypes inferred per chunk could disagree between chunks
+        with pd.read_csv(binary, dtype=str, iterator=True) as reader:
+            while True:
+                try:
+                    yield reader.get_chunk(planner.rows)
+                except StopIteration:
+                    return
+
+    if suffix in ARROW_SUFFIXES:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ValueError("Reading Parquet or Arrow exports requires pyarrow.") from e
+        if suffix == "parquet":
+            parquet = pq.ParquetFile(binary)
+            columns = [name for name in parquet.schema_arrow.names if name in KNOWN_FIELDS]
+            batches = _parquet_batches(parquet, columns, planner)
+        else:
+            try:
+                reader = pa.ipc.open_file(binary)
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                # not the file format, so try the streaming format
+                binary.seek(0)
+                batches = pa.ipc.open_stream(binary)
+        yield from _arrow_frames(batches, planner)
+        return
+
+    text = io.TextIOWrapper(binary, encoding="utf-8-sig")
+    try:
+        rows = _iter_jsonl_rows(text) if suffix in {"jsonl", "ndjson"} else _iter_json_rows(text)
+        for batch in _batched(rows, planner):
+            yield pd.DataFrame(batch, dtype=object)
+    finally:
+        # leave the caller's file open
+        text.detach()
+
+
+def _normalize_rows(rows: list[dict[str, Any]], start: int) -> pd.DataFrame:
     normalized: list[dict[str, Any]] = []
-    for index, row in enumerate(rows, start=1):
+    for index, row in enumerate(rows, start=start):
         text = _first(row, TEXT_FIELDS)
         if not text:
             continue
@@ -87,6 +318,85 @@ def load_tweetclaw_export(uploaded_file, filename: str) -> pd.DataFrame:
                 "post_id": tweet_id,
             }
         )
-    if not normalized:
-        raise ValueError("No tweet text rows found in the TweetClaw export.")
     return pd.DataFrame(normalized)
+
+
+def _as_text(values: pd.Series) -> pd.Series:
+    """Column-wise version of _first's per-value rule: str(), strip, blanks are missing."""
+    text = values.astype(str).str.strip()
+    return text.where(values.notna() & text.ne(""))
+
+
+def _coalesce(frame: pd.DataFrame, fields: tuple[str, ...]) -> pd.Series:
+    """First non-blank value across the columns in `fields`, per row."""
+    result = pd.Series(None, index=frame.index, dtype=object)
+    for field in fields:
+        if field in frame.columns:
+            result = result.fillna(_as_text(frame[field]))
+    return result
+
+
+def _is_nested(frame: pd.DataFrame) -> bool:
+    # dicts/lists (e.g. {"author": {"username": ...}}) infer as "mixed"
+    return any(
+        frame[c].dtype == object and pd.api.types.infer_dtype(frame[c], skipna=True) == "mixed"
+        for c in frame.columns if c in KNOWN_FIELDS
+    )
+
+
+def _normalize_frame(frame: pd.DataFrame, start: int) -> pd.DataFrame:
+    """
+    Normalize a chunk column by column. The field mapping is resolved once
+    per chunk; only chunks with nested values go through _normalize_rows.
+    """
+    if _is_nested(frame):
+        return _normalize_rows(frame.to_dict(orient="records"), start)
+
+    text = _coalesce(frame, TEXT_FIELDS)
+    ids = _coalesce(frame, ID_FIELDS)
+    fallback_ids = pd.Series([f"tweetclaw-{i}" for i in range(start, start + len(frame))], index=frame.index)
+    likes = pd.to_numeric(_coalesce(frame, LIKE_FIELDS), errors="coerce")
+    likes = likes.where(np.isfinite(likes), 0)
+
+    comment_id = ids.fillna(fallback_ids)
+    out = pd.DataFrame({
+        "comment_id": comment_id,
+        "video_id": ids.fillna(""),
+        "author": _coalesce(frame, AUTHOR_FIELDS).fillna(""),
+        "text": text,
+        "published_at": _coalesce(frame, TIME_FIELDS).fillna(""),
+        "like_count": np.trunc(likes).astype(np.int64),
+        "platform": "tweetclaw",
+        "post_id": comment_id,
+    })
+    return out[text.notna()].reset_index(drop=True)
+
+
+def iter_tweetclaw_export(
+    uploaded_file,
+    filename: str,
+    chunk_rows: int = TWEETCLAW_CHUNK_ROWS,
+    max_memory_mb: Optional[float] = TWEETCLAW_MAX_MEMORY_MB,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield normalized frames chunk by chunk without reading the whole export.
+    CSV is read in chunks, JSONL line by line, JSON arrays element by
+    element and Parquet/Arrow by record batch (only the mapped columns).
+    Chunks hold at most chunk_rows rows and are shrunk further so that one
+    chunk stays under max_memory_mb (None disables the ceiling).
+    """
+    planner = _ChunkPlanner(chunk_rows, max_memory_mb)
+    start = 1
+    for raw in _iter_raw_chunks(uploaded_file, filename, planner):
+        frame = _normalize_frame(raw, start)
+        start += len(raw)
+        planner.observe(frame)
+        if not frame.empty:
+            yield frame
+
+
+def load_tweetclaw_export(uploaded_file, filename: str, **kwargs: Any) -> pd.DataFrame:
+    frames = list(iter_tweetclaw_export(uploaded_file, filename, **kwargs))
+    if not frames:
+        raise ValueError("No tweet text rows found in the TweetClaw export.")
+    return pd.concat(frames, ignore_index=True)
@@ -1,7 +1,8 @@
-import requests
 import pandas as pd
 from datetime import datetime
 
+from src.http_utils import get_json
+
 def fetch_twitter_comments(tweet_url: str):
     # Extract tweet ID
     tweet_id = tweet_url.split("/")[-1]
@@ -13,8 +14,7 @@ def fetch_twitter_comments(tweet_url: str):
     }
 
     try:
-        res = requests.get(api_url, headers=headers, timeout=10)
-        data = res.json()
+        data = get_json(api_url, platform="twitter", headers=headers, timeout=10)
     except:
         return pd.DataFrame()
 
@@ -1,7 +1,39 @@
+import argparse
+import datetime
+import io
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
 import psycopg2
-from src.config import DB_URI
+from psycopg2 import extensions
+from psycopg2.extras import execute_values
+from src.config import DB_URI, DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT
+
+COMMENT_COLUMNS = ["comment_id", "video_id", "author", "text", "published_at", "like_count"]
+
+BROWSE_INDEXES = {
+    "youtube_comments_browse_likes": "like_count",
+    "youtube_comments_browse_published": "published_at",
+    "youtube_comments_browse_vader": "vader_compound",
+}
+
+# comment browser sort mode -> (column, descending); stored rows are scored by VADER
+BROWSE_SORTS = {
+    "Most liked": ("like_count", True),
+    "Most recent": ("published_at", True),
+    "Most positive": ("vader_compound", True),
+    "Most negative": ("vader_compound", False),
+}
 
 def get_connection():
+    """
+    Open a dedicated, unpooled connection.
+    Prefer connection() so the TCP/TLS/auth setup is paid once per process.
+    """
     try:
         conn = psycopg2.connect(DB_URI)
         return conn
@@ -10,74 +42,759 @@ def get_connection():
         raise e
 
 
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe, blocking connection pool.
+    Keeps at least `minconn` connections open and never more than `maxconn`.
+    Callers wait up to `timeout` seconds for a free connection instead of
+    failing straight away like psycopg2.pool does.
+    Connections idle longer than `check_after` seconds are pinged before
+    being handed out; dead ones are discarded and replaced.
+    """
+
+    def __init__(self, dsn=None, minconn=1, maxconn=10, timeout=30.0, check_after=30.0, connect=None):
+        if maxconn < 1 or minconn > maxconn:
+            raise ValueError("Pool needs 0 <= minconn <= maxconn and maxconn >= 1")
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.check_after = check_after
+        self._connect = connect or (lambda: psycopg2.connect(self.dsn))
+        self._cond = threading.Condition()
+        self._idle = []          # (conn, returned_at)
+        self._in_use = set()
+        self._opening = 0
+        self._waiting = 0
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "discarded": 0,
+            "created": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "peak_in_use": 0,
+        }
+        for _ in range(minconn):
+            self._idle.append((self._new_connection(), time.monotonic()))
+
+    def _new_connection(self):
+        conn = self._connect()
+        self._stats["created"] += 1
+        return conn
+
+    def _healthy(self, conn, idle_for):
+        if conn.closed:
+            return False
+        if idle_for < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        self._stats["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def getconn(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._cond:
+            if self._closed:
+                raise PoolTimeout("Connection pool is closed")
+            self._waiting += 1
+            try:
+                while True:
+                    # _opening reserves the slot until the connection is in _in_use
+                    if self._idle:
+                        conn, returned_at = self._idle.pop()
+                        self._opening += 1
+                        break
+                    if len(self._in_use) + self._opening < self.maxconn:
+                        conn, returned_at = None, None
+                        self._opening += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"No database connection free after {self.timeout}s")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+        # connect / ping outside the lock so other threads are not blocked on I/O
+        try:
+            if conn is not None and not self._healthy(conn, time.monotonic() - returned_at):
+                with self._cond:
+                    self._discard(conn)
+                conn = None
+            if conn is None:
+                conn = self._new_connection()
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._opening -= 1
+            self._in_use.add(conn)
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], len(self._in_use))
+        return conn
+
+    def putconn(self, conn, discard=False):
+        # the rollback is a round trip, so it runs before taking the lock;
+        # the connection still counts as in use until then
+        if not discard and not conn.closed:
+            status = conn.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+        with self._cond:
+            self._in_use.discard(conn)
+            if discard or conn.closed or self._closed:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection; commit on success, roll back on error."""
+        conn = self.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            self.putconn(conn)
+
+    def stats(self):
+        with self._cond:
+            out = dict(self._stats)
+            out.update({
+                "min": self.minconn,
+                "max": self.maxconn,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "saturation": round(len(self._in_use) / self.maxconn, 3),
+                "avg_wait_ms": round(1000 * out["wait_seconds_total"] / out["checkouts"], 3) if out["checkouts"] else 0.0,
+            })
+        return out
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._discard(conn)
+            self._idle = []
+            self._cond.notify_all()
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Process-wide pool, created on first use.
+    A forked child gets its own pool instead of sharing the parent's sockets.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            if not DB_URI:
+                print("DB_URI not found. Make sure it is set in the .env file.")
+            _pool = ConnectionPool(
+                DB_URI, minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX, timeout=DB_POOL_TIMEOUT
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+@contextmanager
+def connection():
+    with get_pool().connection() as conn:
+        yield conn
+
+
+def pool_stats():
+    return get_pool().stats() if _pool is not None else {}
+
+
 def create_comments_table():
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS youtube_comments (
-            comment_id TEXT PRIMARY KEY,
-            video_id TEXT,
-            author TEXT,
-            text TEXT,
-            published_at TIMESTAMP,
-            like_count INT,
-
-            -- VADER
-            vader_compound REAL,
-            vader_positive REAL,
-            vader_neutral REAL,
-            vader_negative REAL,
-            vader_label TEXT,
-
-            -- TRANSFORMERS (sentiment)
-            transformer_sentiment TEXT,
-            t_positive REAL,
-            t_negative REAL,
-            t_neutral REAL,
-
-            -- TRANSFORMERS (emotions)
-            joy REAL,
-            anger REAL,
-            fear REAL,
-            sadness REAL,
-            disgust REAL,
-            surprise REAL,
-            trust REAL,
-            anticipation REAL
-        );
+    """
+    youtube_comments with the columns and indexes added since. The ALTER takes
+    an ACCESS EXCLUSIVE lock and every CREATE INDEX a SHARE lock, so this runs
+    from `setup` (see create_schema), not on Save or a fetch.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS youtube_comments (
+                comment_id TEXT PRIMARY KEY,
+                video_id TEXT,
+                author TEXT,
+                text TEXT,
+                published_at TIMESTAMP,
+                like_count INT,
 
-    """)
+                -- VADER
+                vader_compound REAL,
+                vader_positive REAL,
+                vader_neutral REAL,
+                vader_negative REAL,
+                vader_label TEXT,
+
+                -- TRANSFORMERS (sentiment)
+                transformer_sentiment TEXT,
+                t_positive REAL,
+                t_negative REAL,
+                t_neutral REAL,
+
+                -- TRANSFORMERS (emotions)
+                joy REAL,
+                anger REAL,
+                fear REAL,
+                sadness REAL,
+                disgust REAL,
+                surprise REAL,
+                trust REAL,
+                anticipation REAL
+            );
+
+        """)
+        # TextBlob results written by data_cleaning / the scoring workers
+        cur.execute("""
+            ALTER TABLE youtube_comments
+                ADD COLUMN IF NOT EXISTS sentiment TEXT,
+                ADD COLUMN IF NOT EXISTS polarity REAL,
+                ADD COLUMN IF NOT EXISTS subjectivity REAL;
+        """)
+        # per-source history lookups (incremental fetches, comment browser)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS youtube_comments_video_published
+            ON youtube_comments (video_id, published_at DESC);
+        """)
+        # keyset pagination of the comment browser, one per sort mode
+        # (scanned backwards for the ascending modes)
+        for name, column in BROWSE_INDEXES.items():
+            cur.execute(f"""
+                CREATE INDEX IF NOT EXISTS {name}
+                ON youtube_comments (video_id, {column} DESC, comment_id DESC);
+            """)
 
-    conn.commit()
-    cur.close()
-    conn.close()
+
+def create_schema():
+    """One-time setup (`python -m src.db_utils setup`): every table, column and index."""
+    create_comments_table()
+    create_watermarks_table()
+    create_token_counts_table()
     print("Comments table ready in PostgreSQL")
 
 
-def insert_comments(df):
-    conn = get_connection()
-    cur = conn.cursor()
-    #df = df.rename(columns={"comment": "text"})
+# what create_schema leaves behind, checked by ensure_schema
+SCHEMA_RELATIONS = [
+    "youtube_comments", "youtube_comments_video_published", *BROWSE_INDEXES,
+    "fetch_watermarks", "comment_token_counts", "comment_token_counts_kind_day",
+]
+SCHEMA_COLUMNS = ["sentiment", "polarity", "subjectivity"]
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def missing_schema():
+    """Relations and youtube_comments columns create_schema would add; catalog lookups only, so no table locks."""
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT name FROM unnest(%s::text[]) AS name WHERE to_regclass(name) IS NULL
+            UNION ALL
+            SELECT 'youtube_comments.' || name FROM unnest(%s::text[]) AS name
+            WHERE NOT EXISTS (
+                SELECT 1 FROM pg_attribute
+                WHERE attrelid = to_regclass('youtube_comments') AND attname = name AND NOT attisdropped
+            )
+        """, (SCHEMA_RELATIONS, SCHEMA_COLUMNS))
+        return [row[0] for row in cur.fetchall()]
+
+
+def ensure_schema():
+    """
+    Check before writing comments (Save, incremental fetches, the pipeline),
+    once per process. A database without youtube_comments is new, so nothing
+    can queue behind its locks and it gets the whole schema; one that is only
+    partly set up raises instead of altering a table that is in use.
+    """
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        missing = missing_schema()
+        if "youtube_comments" in missing:
+            create_schema()
+        elif missing:
+            raise RuntimeError(
+                f"Database schema is missing {', '.join(missing)}; run `python -m src.db_utils setup` once"
+            )
+        _schema_ready = True
+
+
+def create_watermarks_table():
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS fetch_watermarks (
+                source TEXT PRIMARY KEY,
+                platform TEXT,
+                last_published_at TIMESTAMP,
+                last_comment_id TEXT,
+                rows_stored BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP NOT NULL DEFAULT now()
+            );
+        """)
+
+
+def get_watermark(source):
+    """Newest stored comment for a source as a dict, or None if never fetched."""
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT last_published_at, last_comment_id, rows_stored, updated_at
+            FROM fetch_watermarks WHERE source = %s
+        """, (source,))
+        row = cur.fetchone()
+    if row is None:
+        return None
+    return dict(zip(["published_at", "comment_id", "rows_stored", "updated_at"], row))
+
+
+def advance_watermark(source, platform, published_at, comment_id, rows):
+    """
+    Record that `rows` more comments up to (published_at, comment_id) are stored.
+    The watermark only moves forward, so an out-of-order write cannot rewind it.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO fetch_watermarks (source, platform, last_published_at, last_comment_id, rows_stored)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (source) DO UPDATE SET
+                last_comment_id = CASE
+                    WHEN fetch_watermarks.last_published_at IS NULL
+                      OR EXCLUDED.last_published_at >= fetch_watermarks.last_published_at
+                    THEN EXCLUDED.last_comment_id
+                    ELSE fetch_watermarks.last_comment_id
+                END,
+                last_published_at = GREATEST(fetch_watermarks.last_published_at, EXCLUDED.last_published_at),
+                rows_stored = fetch_watermarks.rows_stored + EXCLUDED.rows_stored,
+                updated_at = now();
+        """, (source, platform, published_at, comment_id, rows))
 
-    for _, row in df.iterrows():
+
+def load_source_comments(video_id=None, columns=None, comment_ids=None):
+    """Stored comments for one video/post (or with the given comment ids), newest first."""
+    columns = columns or COMMENT_COLUMNS
+    where, param = ("comment_id = ANY(%s)", list(comment_ids)) if comment_ids is not None else ("video_id = %s", video_id)
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"SELECT {', '.join(columns)} FROM youtube_comments "
+            f"WHERE {where} ORDER BY published_at DESC",
+            (param,)
+        )
+        rows = cur.fetchall()
+    return pd.DataFrame(rows, columns=columns)
+
+
+def iter_stored_comments(video_ids=None, only_unscored=False, batch_size=5000, columns=None):
+    """
+    Yield stored comments as frames of up to batch_size rows, in comment_id
+    order. Each batch is its own keyset query (comment_id > last seen), so
+    no transaction or server-side cursor stays open between batches.
+    only_unscored limits the selection to rows without a VADER label.
+    """
+    columns = list(columns or COMMENT_COLUMNS)
+    select = columns + (["comment_id"] if "comment_id" not in columns else [])
+    clauses, params = [], []
+    if video_ids:
+        clauses.append("video_id = ANY(%s)")
+        params.append(list(video_ids))
+    if only_unscored:
+        clauses.append("vader_label IS NULL")
+    last = None
+    while True:
+        where = clauses + (["comment_id > %s"] if last is not None else [])
+        with connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                f"SELECT {', '.join(select)} FROM youtube_comments "
+                f"{'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY comment_id LIMIT %s",
+                params + ([last] if last is not None else []) + [batch_size]
+            )
+            rows = cur.fetchall()
+        if not rows:
+            return
+        frame = pd.DataFrame(rows, columns=select)
+        last = frame["comment_id"].iloc[-1]
+        yield frame[columns]
+        if len(rows) < batch_size:
+            return
+
+
+def page_comments(video_id, sort_by="Most liked", after=None, limit=20, columns=None):
+    """
+    One page of stored comments for a video/post with keyset pagination.
+    `after` is the (sort value, comment_id) of the last row of the previous
+    page; the query seeks straight to it in the matching browse index, so a
+    deep page costs the same as the first. Rows without a sort value are
+    left out of that mode. Returns (frame, cursor of the next page or None).
+    """
+    column, descending = BROWSE_SORTS[sort_by]
+    columns = list(columns or COMMENT_COLUMNS + ["vader_compound"])
+    select = columns + [c for c in (column, "comment_id") if c not in columns]
+    direction, op = ("DESC", "<") if descending else ("ASC", ">")
+    clauses, params = ["video_id = %s", f"{column} IS NOT NULL"], [video_id]
+    if after is not None:
+        clauses.append(f"({column}, comment_id) {op} (%s, %s)")
+        params.extend(after)
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"SELECT {', '.join(select)} FROM youtube_comments WHERE {' AND '.join(clauses)} "
+            f"ORDER BY {column} {direction}, comment_id {direction} LIMIT %s",
+            params + [limit + 1]
+        )
+        rows = cur.fetchall()
+    page = pd.DataFrame(rows[:limit], columns=select)
+    cursor = None
+    if len(rows) > limit:
+        last = dict(zip(select, rows[limit - 1]))
+        cursor = (last[column], last["comment_id"])
+    return page[columns], cursor
+
+
+def _copy_frame(cur, df, table, columns):
+    """
+    Stream the given DataFrame columns into `table` with COPY.
+    NULLs are written as \\N so empty strings survive as empty strings.
+    """
+    buf = io.StringIO()
+    df[columns].to_csv(buf, index=False, header=False, na_rep="\\N")
+    buf.seek(0)
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        buf
+    )
+
+
+def _prepare_comment_frame(df):
+    out = df.copy()
+    for c in COMMENT_COLUMNS:
+        if c not in out.columns:
+            out[c] = None
+    out = out[COMMENT_COLUMNS]
+    out = out[out["comment_id"].notna()]
+    out["comment_id"] = out["comment_id"].astype(str)
+    # COPY rejects "4.0" for an INT column, so keep counts as nullable ints
+    out["like_count"] = pd.to_numeric(out["like_count"], errors="coerce").round().astype("Int64")
+    out["published_at"] = pd.to_datetime(out["published_at"], errors="coerce", utc=True, format="mixed").dt.tz_localize(None)
+    return out
+
+
+def create_token_counts_table():
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS comment_token_counts (
+                token TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                platform TEXT NOT NULL DEFAULT '',
+                video_id TEXT NOT NULL DEFAULT '',
+                day DATE NOT NULL,
+                count BIGINT NOT NULL,
+                PRIMARY KEY (kind, platform, video_id, day, token)
+            );
+        """)
+        # top-N over a date range without a video/platform filter
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS comment_token_counts_kind_day
+            ON comment_token_counts (kind, day);
+        """)
+
+
+def _stop_words():
+    from src.keyword_analysis import get_stop_words
+    return get_stop_words()
+
+
+def token_count_rows(frame, platforms=None, stop_words=None):
+    """
+    Aggregate keyword / bigram / hashtag counts of a comment frame into
+    (token, kind, platform, video_id, day) rows. day is the comment's
+    publish date, or today when it has none.
+    """
+    from src.term_counts import KINDS, TermCounter
+
+    days = pd.to_datetime(frame["published_at"], errors="coerce").dt.date
+    keys = pd.DataFrame({
+        "platform": platforms if platforms is not None else "",
+        "video_id": frame["video_id"],
+        "day": days,
+    }, index=frame.index)
+    keys["platform"] = keys["platform"].fillna("").astype(str)
+    keys["video_id"] = keys["video_id"].fillna("").astype(str)
+    keys["day"] = keys["day"].fillna(datetime.date.today())
+
+    if stop_words is None:
+        stop_words = _stop_words()
+    rows = []
+    for (platform, video_id, day), index in keys.groupby(["platform", "video_id", "day"]).groups.items():
+        counter = TermCounter(stop_words).update_many(frame.loc[index, "text"])
+        for kind in KINDS:
+            rows.extend((token, kind, platform, video_id, day, count)
+                        for token, count in counter.most_common(kind))
+    # key order, so concurrent writers lock rows in the same order
+    rows.sort(key=lambda r: (r[1], r[2], r[3], r[4], r[0]))
+    return rows
+
+
+def _upsert_token_counts(cur, rows, page_size=1000):
+    if not rows:
+        return
+    execute_values(
+        cur,
+        """
+        INSERT INTO comment_token_counts (token, kind, platform, video_id, day, count)
+        VALUES %s
+        ON CONFLICT (kind, platform, video_id, day, token)
+        DO UPDATE SET count = comment_token_counts.count + EXCLUDED.count
+        """,
+        rows,
+        page_size=page_size
+    )
+
+
+def _merge_batch(cur, batch):
+    """COPY a batch into staging and merge it; returns the ids actually inserted."""
+    _copy_frame(cur, batch, "youtube_comments_staging", COMMENT_COLUMNS)
+    cur.execute("""
+        INSERT INTO youtube_comments (comment_id, video_id, author, text, published_at, like_count)
+        SELECT DISTINCT ON (comment_id) comment_id, video_id, author, text, published_at, like_count
+        FROM youtube_comments_staging
+        ORDER BY comment_id
+        ON CONFLICT (comment_id) DO NOTHING
+        RETURNING comment_id;
+    """)
+    return {row[0] for row in cur.fetchall()}
+
+
+def _insert_rows(cur, batch):
+    """
+    Row-by-row fallback for a batch the bulk merge rejected: each row gets
+    its own savepoint, so a bad row is reported and skipped like before
+    instead of failing the rest. Returns (inserted ids, failed rows).
+    """
+    inserted_ids, failed = set(), 0
+    for row in frame_rows(batch, COMMENT_COLUMNS):
+        cur.execute("SAVEPOINT insert_row")
         try:
             cur.execute("""
                 INSERT INTO youtube_comments (comment_id, video_id, author, text, published_at, like_count)
                 VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (comment_id) DO NOTHING;
-            """, (
-                row["comment_id"],
-                row["video_id"],
-                row["author"],
-                row["text"],
-                row["published_at"],
-                row["like_count"]
-            ))
+                ON CONFLICT (comment_id) DO NOTHING
+                RETURNING comment_id;
+            """, row)
+            inserted_ids.update(r[0] for r in cur.fetchall())
         except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT insert_row")
+            failed += 1
             print("Insert error:", e)
+        cur.execute("RELEASE SAVEPOINT insert_row")
+    return inserted_ids, failed
+
+
+def insert_comments(df, batch_size=5000, index_tokens=True):
+    """
+    Bulk insert comments into youtube_comments.
+    Each batch is COPY'd into a temp staging table and merged with one
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING, so a batch costs a couple of
+    round trips instead of one per row. A batch the database rejects is
+    retried row by row; rows that still fail are reported and skipped.
+    With index_tokens, the token counts of the rows actually inserted are
+    added to comment_token_counts in the same transaction; when the NLTK
+    stopwords cannot be loaded the comments are still saved, unindexed.
+    Returns a dict with inserted / skipped / failed counts and per-batch timings.
+    """
+    frame = _prepare_comment_frame(df)
+    platforms = df.loc[frame.index, "platform"] if "platform" in df.columns else None
+    report = {"rows": len(df), "inserted": 0, "skipped": len(df) - len(frame), "failed": 0, "batches": []}
+
+    stop_words = None
+    if index_tokens:
+        try:
+            stop_words = _stop_words()
+        except LookupError as e:
+            print(f"Warning: NLTK stopwords unavailable ({e}); saving without token counts")
+            index_tokens = False
+
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS youtube_comments_staging (
+                comment_id TEXT,
+                video_id TEXT,
+                author TEXT,
+                text TEXT,
+                published_at TIMESTAMP,
+                like_count INT
+            ) ON COMMIT DELETE ROWS;
+        """)
+
+        for start in range(0, len(frame), batch_size):
+            batch = frame.iloc[start:start + batch_size]
+            t0 = time.perf_counter()
+
+            failed = 0
+            cur.execute("SAVEPOINT insert_batch")
+            try:
+                inserted_ids = _merge_batch(cur, batch)
+            except Exception as e:
+                cur.execute("ROLLBACK TO SAVEPOINT insert_batch")
+                print(f"Batch {len(report['batches']) + 1} rejected ({e}); inserting its rows one by one")
+                inserted_ids, failed = _insert_rows(cur, batch)
+            cur.execute("RELEASE SAVEPOINT insert_batch")
+            inserted = len(inserted_ids)
+            if index_tokens and inserted:
+                # rows skipped as duplicates were counted when first inserted
+                fresh = batch[batch["comment_id"].isin(inserted_ids)].drop_duplicates("comment_id")
+                _upsert_token_counts(cur, token_count_rows(
+                    fresh, platforms.loc[fresh.index] if platforms is not None else None, stop_words
+                ))
+            conn.commit()
+
+            stats = {
+                "rows": len(batch),
+                "inserted": inserted,
+                "skipped": len(batch) - inserted,
+                "failed": failed,
+                "seconds": round(time.perf_counter() - t0, 4),
+            }
+            report["batches"].append(stats)
+            report["inserted"] += inserted
+            report["skipped"] += stats["skipped"]
+            report["failed"] += failed
+            print(f"Batch {len(report['batches'])}: {stats['inserted']} inserted, "
+                  f"{stats['skipped']} skipped ({failed} failed) in {stats['seconds']}s")
+
+    print(f"Insert complete: {report['inserted']} inserted, {report['skipped']} skipped, "
+          f"{report['failed']} failed")
+    return report
+
+
+def frame_rows(df, columns):
+    """DataFrame columns -> list of tuples with NaN/NaT turned into None."""
+    sub = df[columns].astype(object)
+    return list(sub.where(sub.notna(), None).itertuples(index=False, name=None))
+
+
+def update_comment_columns(cur, columns, rows, casts=None):
+    """
+    Set-based write-back: one UPDATE ... FROM (VALUES ...) for the whole batch.
+    rows are tuples of (comment_id, *values) in the order of `columns`.
+    casts optionally maps a column to a SQL type for the VALUES list.
+    """
+    if not rows:
+        return 0
+    casts = casts or {}
+    template = "(%s, " + ", ".join(
+        f"%s::{casts[c]}" if c in casts else "%s" for c in columns
+    ) + ")"
+    assignments = ", ".join(f"{c} = v.{c}" for c in columns)
+    execute_values(
+        cur,
+        f"""
+        UPDATE youtube_comments AS c
+        SET {assignments}
+        FROM (VALUES %s) AS v(comment_id, {', '.join(columns)})
+        WHERE c.comment_id = v.comment_id
+        """,
+        rows,
+        template=template,
+        page_size=len(rows)
+    )
+    return cur.rowcount
+
+
+def _token_filters(kind, platform=None, video_id=None, since=None, until=None):
+    clauses, params = ["kind = %s"], [kind]
+    for clause, value in (("platform = %s", platform), ("video_id = %s", video_id),
+                          ("day >= %s", since), ("day <= %s", until)):
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    return " AND ".join(clauses), params
+
+
+def top_tokens(kind="keyword", n=20, platform=None, video_id=None, since=None, until=None):
+    """Top-n tokens of a kind from comment_token_counts, optionally filtered."""
+    where, params = _token_filters(kind, platform, video_id, since, until)
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"SELECT token, SUM(count) AS count FROM comment_token_counts WHERE {where} "
+            "GROUP BY token ORDER BY count DESC, token LIMIT %s",
+            params + [n]
+        )
+        rows = cur.fetchall()
+    return pd.DataFrame(rows, columns=["token", "count"])
+
+
+def token_daily_counts(tokens, kind="keyword", platform=None, video_id=None, since=None, until=None):
+    """Per-day counts for the given tokens, for trend charts."""
+    where, params = _token_filters(kind, platform, video_id, since, until)
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"SELECT day, token, SUM(count) AS count FROM comment_token_counts "
+            f"WHERE {where} AND token = ANY(%s) GROUP BY day, token ORDER BY day",
+            params + [list(tokens)]
+        )
+        rows = cur.fetchall()
+    return pd.DataFrame(rows, columns=["day", "token", "count"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Database schema for stored comments.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("setup", help="create or update tables, columns and indexes (takes table locks)")
+    commands.add_parser("check", help="list what setup would still create")
+    args = parser.parse_args(argv)
+
+    if args.command == "setup":
+        create_schema()
+        return 0
+
+    missing = missing_schema()
+    print("Schema is up to date." if not missing else f"Missing: {', '.join(missing)}")
+    return 1 if missing else 0
+
 
-    conn.commit()
-    cur.close()
-    conn.close()
-    print("Insert complete")
+if __name__ == "__main__":
+    sys.exit(main())
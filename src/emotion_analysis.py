@@ -1,30 +1,106 @@
-from nrclex import NRCLex
+import re
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 
+from src.lazy import resource
+
+EMOTION_NAMES = [
+    "anger", "anticipation", "disgust", "fear",
+    "joy", "sadness", "surprise", "trust"
+]
+# NRC also tags words positive/negative; raw_emotion_scores reports those too
+AFFECT_NAMES = EMOTION_NAMES + ["negative", "positive"]
+
+# Bump when tokenization changes so cached NRC scores are recomputed
+ENGINE_VERSION = "1"
+
+# NRCLex tokenizes with TextBlob/NLTK, which splits these before lexicon lookup
+_CONTRACTIONS = re.compile(
+    r"(?i)\b(can)(not)\b|\b(gim)(me)\b|\b(gon)(na)\b|\b(got)(ta)\b|\b(lem)(me)\b|\b(wan)(na)(?![\w-])"
+)
+# the Treebank tokenizer does not split on these when they sit between two
+# word characters, so neither do we
+_TOKEN = re.compile(r"\w+(?:(?:[-.]|[/'+=~^|\\…]+|[:,](?=\d))\w+)*")
+# ...which then splits clitics off the end of the word
+_CLITIC = re.compile(r"(?i)(?:n't|'s|'m|'d|'ll|'re|'ve)$")
+
+
+def _split_contractions(match):
+    return " ".join(part for part in match.groups() if part)
+
+
+def tokenize(text):
+    """Word tokens as NRCLex sees them (case is kept; the lexicon is lowercase)."""
+    text = _CONTRACTIONS.sub(_split_contractions, text)
+    return [_CLITIC.sub("", token) for token in _TOKEN.findall(text)]
+
+
+class NRCEmotionEngine:
+    """
+    NRC lexicon compiled into a token -> affect-count table.
+    Scoring a column tokenizes every text once, maps tokens to table rows
+    and sums them per text with bincount, which is the same as multiplying
+    a sparse text x token matrix by the table.
+    """
+
+    def __init__(self, lexicon=None):
+        lexicon = lexicon if lexicon is not None else resource("nrc_lexicon")
+        self.vocab = {word: i for i, word in enumerate(lexicon)}
+        self.table = np.zeros((len(self.vocab), len(AFFECT_NAMES)), dtype=np.int32)
+        column = {name: j for j, name in enumerate(AFFECT_NAMES)}
+        for word, affects in lexicon.items():
+            for affect in affects:
+                self.table[self.vocab[word], column[affect]] += 1
+
+    def score_many(self, texts):
+        """Return an (n_texts, len(AFFECT_NAMES)) array of raw affect counts."""
+        texts = pd.Series(list(texts), dtype=object)
+        counts = np.zeros((len(texts), len(AFFECT_NAMES)), dtype=np.int64)
+        if texts.empty:
+            return counts
+
+        tokens = texts.map(lambda t: tokenize(t) if isinstance(t, str) else []).explode()
+        hits = tokens.map(self.vocab).dropna()
+        if hits.empty:
+            return counts
+
+        rows = hits.index.to_numpy()
+        matched = self.table[hits.to_numpy(dtype=np.int64)]
+        for j in range(len(AFFECT_NAMES)):
+            counts[:, j] = np.bincount(rows, weights=matched[:, j], minlength=len(texts))
+        return counts
+
+    def raw_emotion_scores(self, text):
+        # one text: plain lookups, without score_many's per-call pandas overhead
+        rows = [self.vocab[token] for token in tokenize(text) if token in self.vocab]
+        if not rows:
+            return {}
+        counts = self.table[rows].sum(axis=0)
+        return {name: int(c) for name, c in zip(AFFECT_NAMES, counts) if c}
+
+
+@lru_cache(maxsize=1)
+def get_engine():
+    return NRCEmotionEngine()
+
+
 def get_emotions(text):
     if not isinstance(text, str):
         return {}
 
-    emo = NRCLex(text)
-    return emo.raw_emotion_scores  # dictionary of emotions
+    return get_engine().raw_emotion_scores(text)  # dictionary of emotions
+
 
 def add_emotion_columns(df):
     df = df.copy()
 
-    emotion_names = [
-        "anger", "anticipation", "disgust", "fear",
-        "joy", "sadness", "surprise", "trust"
-    ]
-
-    for col in emotion_names:
-        df[col] = 0
-
-    for idx, text in df["text"].fillna("").items():
-        scores = get_emotions(text)
-        for emotion in emotion_names:
-            df.at[idx, emotion] = scores.get(emotion, 0)
+    counts = get_engine().score_many(df["text"].fillna("").tolist())
+    for j, emotion in enumerate(EMOTION_NAMES):
+        df[emotion] = counts[:, j]
 
     # dominant emotion
-    df["dominant_emotion"] = df[emotion_names].idxmax(axis=1)
+    df["dominant_emotion"] = df[EMOTION_NAMES].idxmax(axis=1)
 
     return df
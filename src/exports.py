@@ -0,0 +1,126 @@
+# src/exports.py
+
+import datetime as dt
+import gzip
+import io
+import math
+
+import pandas as pd
+
+from src.config import EXPORT_CHUNK_ROWS
+
+# format -> (file suffix, mime type)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "csv.gz": (".csv.gz", "application/gzip"),
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _naive(df):
+    """Timezone-aware datetime columns converted to naive UTC (Excel has no timezones)."""
+    tz_columns = df.select_dtypes(include=["datetimetz"]).columns
+    if len(tz_columns) == 0:
+        return df
+    return df.assign(**{col: df[col].dt.tz_localize(None) for col in tz_columns})
+
+
+def iter_csv_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """UTF-8 CSV bytes of df, one piece per chunk_rows rows (header in the first)."""
+    for i, chunk in enumerate(_chunks(df, chunk_rows)):
+        yield chunk.to_csv(index=False, header=i == 0).encode("utf-8")
+    if len(df) == 0:
+        yield df.to_csv(index=False).encode("utf-8")
+
+
+def write_csv(df, fileobj, compress=False, chunk_rows=EXPORT_CHUNK_ROWS):
+    out = gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=6, mtime=0) if compress else fileobj
+    try:
+        for piece in iter_csv_chunks(df, chunk_rows):
+            out.write(piece)
+    finally:
+        if compress:
+            out.close()
+
+
+def _excel_value(value):
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, (str, int, float, bool, dt.datetime, dt.date)):
+        return value
+    if hasattr(value, "item"):
+        # numpy scalars
+        return _excel_value(value.item())
+    return str(value)
+
+
+def write_excel(df, fileobj, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write df as a single-sheet workbook with xlsxwriter's constant_memory mode.
+    Each row is flushed to a temp file as soon as it is written, so memory
+    stays flat no matter how many rows there are.
+    """
+    import xlsxwriter
+
+    df = _naive(df)
+    workbook = xlsxwriter.Workbook(fileobj, {
+        "constant_memory": True,
+        "default_date_format": "yyyy-mm-dd hh:mm:ss",
+        "strings_to_urls": False,
+    })
+    sheet = workbook.add_worksheet()
+    sheet.write_row(0, 0, [str(c) for c in df.columns])
+    row = 1
+    for chunk in _chunks(df, chunk_rows):
+        for values in chunk.itertuples(index=False, name=None):
+            sheet.write_row(row, 0, [_excel_value(v) for v in values])
+            row += 1
+    workbook.close()
+
+
+def _missing(value):
+    return value is None or value is pd.NaT or (isinstance(value, float) and math.isnan(value))
+
+
+def _parquet_safe(df):
+    """Object columns that mix types (lists, dicts, numbers and text) are written as text."""
+    fixes = {}
+    for col in df.columns[df.dtypes == object]:
+        kind = pd.api.types.infer_dtype(df[col], skipna=True)
+        if kind not in ("string", "empty", "bytes"):
+            fixes[col] = df[col].map(lambda v: None if _missing(v) else str(v))
+    return df.assign(**fixes) if fixes else df
+
+
+def write_parquet(df, fileobj):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ValueError("Parquet export requires pyarrow.") from e
+    table = pa.Table.from_pandas(_parquet_safe(df), preserve_index=False)
+    pq.write_table(table, fileobj, compression="zstd")
+
+
+def export_bytes(df, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """The whole export of df in one of EXPORT_FORMATS, as bytes."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+    buffer = io.BytesIO()
+    if fmt in ("csv", "csv.gz"):
+        write_csv(df, buffer, compress=fmt == "csv.gz", chunk_rows=chunk_rows)
+    elif fmt == "xlsx":
+        write_excel(df, buffer, chunk_rows=chunk_rows)
+    else:
+        write_parquet(df, buffer)
+    return buffer.getvalue()
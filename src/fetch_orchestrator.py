@@ -0,0 +1,150 @@
+# src/fetch_orchestrator.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import pandas as pd
+
+# columns every fetcher's output is normalized to
+NORMALIZED_COLUMNS = [
+    "comment_id", "video_id", "author", "text", "published_at",
+    "like_count", "platform", "post_id", "source_url"
+]
+
+# max requests in flight per platform; each maps to a single upstream host
+HOST_LIMITS = {
+    "youtube": 8,
+    "reddit": 2,
+    "twitter": 4,
+    "instagram": 2,
+}
+
+PLATFORM_HOSTS = {
+    "youtube": ("youtube.com", "youtu.be"),
+    "reddit": ("reddit.com", "redd.it"),
+    "twitter": ("twitter.com", "x.com"),
+    "instagram": ("instagram.com",),
+}
+
+
+def detect_platform(url):
+    host = (urlparse(url.strip()).hostname or "").lower()
+    for platform, domains in PLATFORM_HOSTS.items():
+        if any(host == d or host.endswith("." + d) for d in domains):
+            return platform
+    return None
+
+
+def _fetch_youtube(url, max_comments):
+    from src.data_extraction import get_comments
+    return get_comments(url, max_results=max_comments)
+
+
+def _fetch_reddit(url, max_comments):
+    from src.data_reddit import fetch_reddit_comments
+    return fetch_reddit_comments(url, max_comments=max_comments)
+
+
+def _fetch_twitter(url, max_comments):
+    from src.data_twitter import fetch_twitter_comments
+    return fetch_twitter_comments(url).head(max_comments)
+
+
+def _fetch_instagram(url, max_comments):
+    from src.data_instagram import fetch_instagram_comments
+    return fetch_instagram_comments(url).head(max_comments)
+
+
+FETCHERS = {
+    "youtube": _fetch_youtube,
+    "reddit": _fetch_reddit,
+    "twitter": _fetch_twitter,
+    "instagram": _fetch_instagram,
+}
+
+
+def normalize_comments(df, platform=None, source_url=None):
+    """Bring any fetcher's frame onto NORMALIZED_COLUMNS."""
+    df = df.copy()
+    if "comment" in df.columns and "text" not in df.columns:
+        df = df.rename(columns={"comment": "text"})
+    if "likes" in df.columns and "like_count" not in df.columns:
+        df = df.rename(columns={"likes": "like_count"})
+    for c in NORMALIZED_COLUMNS:
+        if c not in df.columns:
+            df[c] = None
+    # non-YouTube fetchers only know the post id
+    df["video_id"] = df["video_id"].fillna(df["post_id"])
+    df["post_id"] = df["post_id"].fillna(df["video_id"])
+    if platform is not None:
+        df["platform"] = df["platform"].fillna(platform)
+    if source_url is not None:
+        df["source_url"] = source_url
+    return df
+
+
+def parse_url_list(text):
+    """One URL per line; blank lines and repeats are dropped, order is kept."""
+    lines = [line.strip() for line in (text or "").splitlines()]
+    return list(dict.fromkeys(line for line in lines if line))
+
+
+def host_semaphores(host_limits=None):
+    """One semaphore per platform capping its requests in flight."""
+    limits = dict(HOST_LIMITS, **(host_limits or {}))
+    return {p: threading.BoundedSemaphore(n) for p, n in limits.items()}
+
+
+def fetch_source(url, max_comments=300, semaphores=None):
+    """
+    Fetch and normalize one URL. Returns (report entry, frame or None);
+    errors are reported in the entry instead of raised.
+    """
+    platform = detect_platform(url)
+    entry = {"url": url, "platform": platform, "status": "ok", "rows": 0, "seconds": 0.0, "error": ""}
+    if platform not in FETCHERS:
+        entry.update(status="unsupported", error="Unrecognized platform URL")
+        return entry, None
+
+    semaphores = semaphores if semaphores is not None else host_semaphores()
+    start = time.perf_counter()
+    try:
+        with semaphores[platform]:
+            raw = FETCHERS[platform](url, max_comments)
+    except Exception as e:
+        entry.update(status="error", error=str(e))
+        raw = None
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+
+    if raw is None or raw.empty:
+        if entry["status"] == "ok":
+            entry["status"] = "empty"
+        return entry, None
+    frame = normalize_comments(raw, platform=platform, source_url=url)
+    entry["rows"] = len(frame)
+    return entry, frame
+
+
+def fetch_many(urls, max_comments=300, max_workers=16, host_limits=None):
+    """
+    Fetch comments for a mixed list of URLs concurrently.
+    Requests run on a bounded thread pool, with at most host_limits[platform]
+    in flight against any one platform. Returns (comments, report): one
+    normalized frame for all sources, and one report row per URL with its
+    status, row count, timing and error.
+    """
+    semaphores = host_semaphores(host_limits)
+
+    urls = list(urls)
+    if not urls:
+        return pd.DataFrame(columns=NORMALIZED_COLUMNS), pd.DataFrame()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as pool:
+        results = list(pool.map(lambda url: fetch_source(url, max_comments, semaphores), urls))
+
+    report = pd.DataFrame([entry for entry, _ in results])
+    frames = [frame for _, frame in results if frame is not None]
+    comments = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=NORMALIZED_COLUMNS)
+    return comments, report
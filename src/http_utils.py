@@ -0,0 +1,204 @@
+# src/http_utils.py
+
+import hashlib
+import json
+import queue
+import threading
+import time
+import zlib
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.cache_utils import SQLiteLRU
+from src.config import HTTP_CACHE_ENABLED, HTTP_CACHE_PATH, HTTP_CACHE_MAX_MB, HTTP_CACHE_TTLS
+
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) seconds
+USER_AGENT = "Mozilla/5.0 (SocialAnalyticsTool) gzip"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Shared keep-alive session for every fetcher.
+    requests already asks for gzip; Google APIs additionally want "gzip"
+    in the User-Agent before they compress responses.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "User-Agent": USER_AGENT,
+                "Accept-Encoding": "gzip, deflate",
+            })
+            _session = session
+        return _session
+
+
+# query parameters that identify the caller rather than the resource
+_UNKEYED_PARAMS = {"key"}
+
+
+def request_key(url, params=None):
+    """Cache key for a GET: the URL plus its sorted params, minus API keys."""
+    items = sorted(
+        (str(k), str(v)) for k, v in (params or {}).items()
+        if v is not None and k not in _UNKEYED_PARAMS
+    )
+    raw = json.dumps([url, items], separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class HTTPCache:
+    """
+    On-disk cache for JSON GET responses, stored zlib-compressed in a
+    size-capped SQLite LRU. Entries younger than their platform's TTL are
+    served without a request; older ones are revalidated with
+    If-None-Match / If-Modified-Since when the server sent validators,
+    so an unchanged page costs a 304 instead of a full body.
+    """
+
+    def __init__(self, path, max_bytes=128 * 1024 * 1024, ttls=None):
+        self.store = SQLiteLRU(path, max_bytes=max_bytes)
+        self.ttls = dict(ttls or {})
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def ttl(self, platform):
+        return self.ttls.get(platform, self.ttls.get("default", 0))
+
+    def get_json(self, url, params=None, platform="default", headers=None,
+                 session=None, timeout=DEFAULT_TIMEOUT, max_age=None):
+        """
+        GET url and return the decoded JSON body, from cache when possible.
+        max_age overrides the platform TTL (0 always revalidates).
+        """
+        session = session or get_session()
+        key = request_key(url, params)
+        blob, stored_at = self.store.get(key)
+        entry = json.loads(zlib.decompress(blob)) if blob is not None else None
+
+        max_age = self.ttl(platform) if max_age is None else max_age
+        if entry is not None and time.time() - stored_at < max_age:
+            self._count("hits")
+            return entry["body"]
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        res = session.get(url, params=params, headers=request_headers, timeout=timeout)
+        status = getattr(res, "status_code", 200)
+        if status == 304 and entry is not None:
+            self.store.touch(key)
+            self._count("revalidated")
+            return entry["body"]
+
+        self._count("misses")
+        body = res.json()
+        response_headers = getattr(res, "headers", None) or {}
+        if status == 200 and "no-store" not in response_headers.get("Cache-Control", ""):
+            entry = {
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+                "body": body,
+            }
+            self.store.set(key, zlib.compress(json.dumps(entry, separators=(",", ":")).encode("utf-8")))
+            self._count("stored")
+        return body
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+        requests_seen = out["hits"] + out["revalidated"] + out["misses"]
+        out["hit_ratio"] = round((out["hits"] + out["revalidated"]) / requests_seen, 4) if requests_seen else 0.0
+        out["disk_bytes"] = self.store.size_bytes()
+        out["disk_evictions"] = self.store.evictions
+        return out
+
+    def clear(self):
+        self.store.clear()
+
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """Process-wide response cache, or None when HTTP_CACHE_ENABLED is off."""
+    global _http_cache
+    if not HTTP_CACHE_ENABLED:
+        return None
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HTTPCache(
+                HTTP_CACHE_PATH, max_bytes=HTTP_CACHE_MAX_MB * 1024 * 1024, ttls=HTTP_CACHE_TTLS
+            )
+        return _http_cache
+
+
+def http_cache_stats():
+    return _http_cache.stats() if _http_cache is not None else {}
+
+
+def get_json(url, params=None, platform="default", headers=None, session=None,
+             timeout=DEFAULT_TIMEOUT, max_age=None):
+    """GET a JSON API through the shared response cache (or straight through when disabled)."""
+    cache = get_http_cache()
+    if cache is not None:
+        return cache.get_json(url, params=params, platform=platform, headers=headers,
+                              session=session, timeout=timeout, max_age=max_age)
+    session = session or get_session()
+    return session.get(url, params=params, headers=headers, timeout=timeout).json()
+
+
+_DONE = object()
+
+
+def prefetch(iterable, depth=2):
+    """
+    Run an iterator in a background thread, keeping up to `depth` items ready.
+    Used to overlap page downloads with scoring of the pages already here.
+    Exceptions from the producer are re-raised in the consumer.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in iterable:
+                if stop.is_set():
+                    return
+                buffer.put((item, None))
+            buffer.put((_DONE, None))
+        except Exception as e:
+            buffer.put((_DONE, e))
+
+    worker = threading.Thread(target=produce, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        # unblock the producer if it is waiting on a full buffer
+        while not buffer.empty():
+            buffer.get_nowait()
@@ -0,0 +1,197 @@
+# src/incremental.py
+
+import re
+
+import pandas as pd
+
+from src import db_utils
+from src.data_extraction import extract_video_id, iter_comment_pages
+
+EMOTION_COLUMNS = ["anger", "anticipation", "disgust", "fear", "joy", "sadness", "surprise", "trust"]
+
+# stored score column -> the app's column, so history rows are not scored again
+HISTORY_SCORES = {
+    "polarity": "sentiment_score",
+    "subjectivity": "subjectivity",
+    "sentiment": "sentiment",
+    "vader_compound": "vader_compound",
+    "vader_positive": "vader_positive",
+    "vader_neutral": "vader_neutral",
+    "vader_negative": "vader_negative",
+    "vader_label": "vader_label",
+    **{e: e for e in EMOTION_COLUMNS},
+}
+
+# comment ids per history lookup, so a large export never becomes one huge ANY(%s) array
+HISTORY_LOOKUP_IDS = 5000
+
+def source_key(platform, source_id):
+    return f"{platform}:{source_id}"
+
+
+def _utc(values):
+    return pd.to_datetime(values, errors="coerce", utc=True, format="mixed")
+
+
+def filter_new(df, watermark):
+    """Rows at or after the watermark, minus the watermark comment itself."""
+    if df.empty or watermark is None or watermark.get("published_at") is None:
+        return df
+    mark = _utc(pd.Series([watermark["published_at"]])).iloc[0]
+    keep = (_utc(df["published_at"]) >= mark) & (df["comment_id"].astype(str) != str(watermark.get("comment_id")))
+    return df[keep].reset_index(drop=True)
+
+
+def newest(df):
+    """(published_at, comment_id) of the newest row, or None."""
+    published = _utc(df["published_at"]) if not df.empty else pd.Series(dtype="datetime64[ns, UTC]")
+    if not published.notna().any():
+        return None
+    i = published.idxmax()
+    return published[i].tz_localize(None).to_pydatetime(), str(df.loc[i, "comment_id"])
+
+
+def fill_missing_scores(df, column, score):
+    """
+    Run score(frame) -> frame on the rows whose `column` is empty only.
+    After an incremental fetch those are the new rows (and any stored row
+    that was never scored); the history keeps the scores loaded with it.
+    """
+    missing = df[column].isna() if column in df.columns else pd.Series(True, index=df.index)
+    if not missing.any():
+        return df
+    if missing.all():
+        return score(df)
+    return pd.concat([df[~missing], score(df[missing])]).loc[df.index]
+
+
+def merge_history(new, history):
+    """New rows first, then stored rows not seen again; newest first overall."""
+    frames = [f for f in (new, history) if f is not None and not f.empty]
+    if not frames:
+        return new if new is not None else pd.DataFrame()
+    merged = pd.concat(frames, ignore_index=True)
+    merged = merged.drop_duplicates("comment_id", keep="first")
+    order = _utc(merged["published_at"]).sort_values(ascending=False, na_position="last").index
+    return merged.loc[order].reset_index(drop=True)
+
+
+def _standardize(df, video_id=None):
+    df = df.rename(columns={"comment": "text", "likes": "like_count"})
+    if video_id is not None:
+        # every fetched row belongs to the one video/post
+        df["video_id"] = video_id
+    return df
+
+
+def _concat(frames):
+    frames = [f for f in frames if not f.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _load_history(video_id=None, comment_ids=None):
+    """Stored rows with their stored scores, renamed to the app's column names."""
+    columns = db_utils.COMMENT_COLUMNS + list(HISTORY_SCORES)
+    if comment_ids is None:
+        history = db_utils.load_source_comments(video_id, columns=columns)
+    else:
+        history = _concat([
+            db_utils.load_source_comments(columns=columns, comment_ids=comment_ids[i:i + HISTORY_LOOKUP_IDS])
+            for i in range(0, len(comment_ids), HISTORY_LOOKUP_IDS)
+        ]).reindex(columns=columns)
+    history = history.rename(columns=HISTORY_SCORES)
+    emotions = history[EMOTION_COLUMNS].astype(float)
+    scored = emotions.notna().all(axis=1)
+    if scored.any():
+        history.loc[scored, "dominant_emotion"] = emotions[scored].idxmax(axis=1)
+    return history
+
+
+def _reddit_post_id(url):
+    match = re.search(r"/comments/([a-z0-9]+)", url, re.IGNORECASE)
+    if not match:
+        raise ValueError("Invalid Reddit post URL")
+    return "t3_" + match.group(1)
+
+
+def incremental_fetch(platform, url=None, frame=None, name=None, max_comments=300):
+    """
+    Fetch only what is newer than the source's watermark.
+    platform is "youtube" or "reddit" (fetched from url) or "tweetclaw"
+    (an export in frame, identified by its file name; frame is a DataFrame
+    or the chunks of iter_tweetclaw_export, filtered one at a time).
+    Returns a dict with the source key, the watermark used, the new rows,
+    the stored history with its stored scores, and whether the whole source
+    had to be fetched again (full_walk). Nothing is written: store the new
+    rows and then call advance_to_newest (store_new_comments does both).
+
+    YouTube pages newest first and stops at the watermark. Reddit cannot:
+    a new reply can sit under any old comment and the API has no "since",
+    so the whole thread is walked and only the storing and scoring are
+    incremental. TweetClaw exports are read chunk by chunk; each chunk is
+    filtered and its history looked up before the next one is read.
+    """
+    db_utils.ensure_schema()
+
+    if platform == "youtube":
+        video_id = extract_video_id(url or "")
+        if not video_id:
+            raise ValueError("Invalid YouTube video URL")
+        source = source_key(platform, video_id)
+    elif platform == "reddit":
+        video_id = _reddit_post_id(url or "")
+        source = source_key(platform, video_id)
+    elif platform == "tweetclaw":
+        # rows keep their own tweet ids; the watermark is kept per export file
+        video_id = None
+        source = source_key("tweetclaw", name or "export")
+    else:
+        raise ValueError(f"Incremental fetching is not supported for {platform}")
+
+    watermark = db_utils.get_watermark(source)
+    if platform != "tweetclaw":
+        history = _load_history(video_id)
+
+    if platform == "youtube":
+        # newest first, paging stops at the first comment we already have
+        records = [r for page in iter_comment_pages(url, max_results=max_comments, watermark=watermark) for r in page]
+        new = pd.DataFrame(records)
+    elif platform == "reddit":
+        from src.data_reddit import fetch_reddit_comments
+        new = filter_new(fetch_reddit_comments(url, max_comments=max_comments, sort="new"), watermark)
+    else:
+        chunks = [frame] if isinstance(frame, pd.DataFrame) else frame
+        new_parts, history_parts = [], []
+        for chunk in chunks:
+            ids = chunk["comment_id"].dropna().astype(str).unique().tolist()
+            history_parts.append(_load_history(comment_ids=ids))
+            new_parts.append(filter_new(chunk, watermark))
+        new, history = _concat(new_parts), _concat(history_parts)
+
+    if not new.empty:
+        new = _standardize(new, video_id)
+    return {
+        "source": source,
+        "platform": platform,
+        "watermark": watermark,
+        "new": new,
+        "history": history,
+        "full_walk": platform == "reddit",
+    }
+
+
+def advance_to_newest(result, rows):
+    """Move the source's watermark to the newest new row, once those rows are stored."""
+    mark = newest(result["new"])
+    if mark is not None:
+        db_utils.advance_watermark(result["source"], result["platform"], *mark, rows)
+
+
+def store_new_comments(result):
+    """Insert the new rows of an incremental_fetch result and advance its watermark."""
+    new = result["new"]
+    if new.empty:
+        return {"rows": 0, "inserted": 0, "skipped": 0, "failed": 0, "batches": []}
+    report = db_utils.insert_comments(new)
+    advance_to_newest(result, report["inserted"])
+    return report
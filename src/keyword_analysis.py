@@ -1,38 +1,31 @@
-import re
-import pandas as pd
 from collections import Counter
-import nltk
 
-# download stopwords once
-try:
-    nltk.data.find('corpora/stopwords')
-except:
-    nltk.download('stopwords')
+from src.lazy import resource
+from src.term_counts import HASHTAG_PATTERN, TermCounter
 
-from nltk.corpus import stopwords
-stop_words = set(stopwords.words("english"))
+def get_stop_words():
+    # NLTK stopwords, downloaded once on first use instead of at import
+    return resource("stopwords")
 
 def extract_hashtags(text):
     if not isinstance(text, str):
         return []
-    return re.findall(r"#\w+", text.lower())
+    return HASHTAG_PATTERN.findall(text.lower())
 
 def extract_keywords(text):
     if not isinstance(text, str):
         return []
-    # remove non letters
-    text = re.sub(r"[^a-zA-Z\s]", " ", text).lower()
-    words = [w for w in text.split() if w not in stop_words and len(w) > 2]
-    return words
+    return TermCounter(get_stop_words()).keywords(text)
+
+def count_terms(texts, bigrams=True, approx_capacity=None):
+    """
+    One pass over texts counting keywords, bigrams and hashtags together.
+    approx_capacity bounds memory per kind (see term_counts.SpaceSaving).
+    """
+    return TermCounter(get_stop_words(), bigrams=bigrams, approx_capacity=approx_capacity).update_many(texts)
 
 def get_hashtag_counts(df):
-    all_tags = []
-    for t in df["text"].dropna():
-        all_tags.extend(extract_hashtags(t))
-    return Counter(all_tags)
+    return Counter(dict(count_terms(df["text"].dropna(), bigrams=False).most_common("hashtag")))
 
 def get_keyword_counts(df, top_n=20):
-    all_words = []
-    for t in df["text"].dropna():
-        all_words.extend(extract_keywords(t))
-    return Counter(all_words).most_common(top_n)
+    return count_terms(df["text"].dropna(), bigrams=False).most_common("keyword", top_n)
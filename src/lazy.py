@@ -0,0 +1,85 @@
+# src/lazy.py
+
+import threading
+
+# name -> zero-argument loader; results are kept per process
+_loaders = {}
+_loaded = {}
+_lock = threading.RLock()
+
+
+def register(name):
+    """Decorator registering a loader for a heavy resource under `name`."""
+    def decorator(loader):
+        _loaders[name] = loader
+        return loader
+    return decorator
+
+
+def resource(name):
+    """
+    The resource registered under `name`, loaded on first use.
+    Analyzers, lexicons and plotting backends live here so that importing a
+    module never pays for them; only the code path that needs one does.
+    """
+    try:
+        return _loaded[name]
+    except KeyError:
+        pass
+    with _lock:
+        if name not in _loaded:
+            if name not in _loaders:
+                raise KeyError(f"Unknown resource '{name}'. Registered: {', '.join(sorted(_loaders))}")
+            _loaded[name] = _loaders[name]()
+        return _loaded[name]
+
+
+def loaded_resources():
+    return sorted(_loaded)
+
+
+@register("textblob")
+def _textblob():
+    from textblob import TextBlob
+    return TextBlob
+
+
+@register("vader")
+def _vader():
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+@register("nrc_lexicon")
+def _nrc_lexicon():
+    from nrclex import NRCLex
+    return NRCLex.lexicon
+
+
+@register("stopwords")
+def _stopwords():
+    import nltk
+    try:
+        nltk.data.find("corpora/stopwords")
+    except LookupError:
+        nltk.download("stopwords", quiet=True)
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words("english"))
+
+
+@register("plotly_express")
+def _plotly_express():
+    import plotly.express as px
+    return px
+
+
+@register("pyplot")
+def _pyplot():
+    import matplotlib.pyplot as plt
+    return plt
+
+
+@register("wordcloud")
+def _wordcloud():
+    from wordcloud import WordCloud
+    return WordCloud
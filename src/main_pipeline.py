@@ -0,0 +1,394 @@
+# src/main_pipeline.py
+"""
+Headless fetch -> normalize -> score -> persist pipeline.
+
+    python -m src.main_pipeline --url-file urls.txt --scorers textblob,vader,nrc
+    python -m src.main_pipeline --tweetclaw export.jsonl --output scored.csv.gz --no-db
+    python -m src.main_pipeline --db --unscored --scorers vader,nrc
+
+Every stage runs in its own thread(s) and hands DataFrame batches to the
+next through a bounded queue, so fetching, scoring and writing overlap and a
+slow stage holds the faster ones back instead of letting batches pile up in
+memory. A per-stage report (rows, busy/blocked/idle time, rows/s) is printed
+at the end.
+"""
+
+import argparse
+import gzip
+import queue
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from src.cache_utils import LRUCache
+from src.config import PIPELINE_BATCH_ROWS, PIPELINE_FETCH_WORKERS, PIPELINE_QUEUE_SIZE, PIPELINE_SEEN_IDS
+
+_DONE = object()
+
+SCORER_NAMES = ("textblob", "vader", "nrc")
+
+# DB columns written back after insert, per scorer
+SCORE_COLUMNS = {
+    "textblob": ["sentiment", "polarity", "subjectivity"],
+    "vader": ["vader_compound", "vader_positive", "vader_neutral", "vader_negative", "vader_label"],
+    "nrc": ["anger", "anticipation", "disgust", "fear", "joy", "sadness", "surprise", "trust"],
+}
+# score_batch column holding a DB column, where the names differ
+FRAME_COLUMNS = {"polarity": "sentiment_score"}
+TEXT_COLUMNS = {"sentiment", "vader_label"}
+
+
+def _rows(value):
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    if isinstance(value, dict):
+        return value.get("rows", 0)
+    return 0
+
+
+class Stage:
+    """
+    A pipeline step: fn(item) returns None (drop), one output or a list of
+    outputs for the next stage. Errors are recorded per item and the stage
+    carries on with the next one.
+    """
+
+    def __init__(self, name, fn, workers=1):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.errors = []
+        self._lock = threading.Lock()
+        self._stats = {"items": 0, "rows": 0, "errors": 0,
+                       "busy_seconds": 0.0, "blocked_seconds": 0.0, "idle_seconds": 0.0}
+        self._started = None
+        self._finished = None
+
+    def _add(self, **deltas):
+        with self._lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+    def _work(self, inbox, outbox, exited):
+        while True:
+            t0 = time.perf_counter()
+            item = inbox.get()
+            self._add(idle_seconds=time.perf_counter() - t0)
+            if item is _DONE:
+                # let sibling workers see the end too; the last one passes it on
+                inbox.put(_DONE)
+                if exited():
+                    outbox.put(_DONE)
+                return
+            with self._lock:
+                self._started = self._started or time.perf_counter()
+            t1 = time.perf_counter()
+            try:
+                result = self.fn(item)
+            except Exception as e:
+                self._add(items=1, errors=1, busy_seconds=time.perf_counter() - t1)
+                with self._lock:
+                    self.errors.append(f"{type(e).__name__}: {e}")
+                continue
+            outputs = [] if result is None else result if isinstance(result, list) else [result]
+            t2 = time.perf_counter()
+            rows = sum(_rows(out) for out in outputs) if outputs else _rows(item)
+            self._add(items=1, rows=rows, busy_seconds=t2 - t1)
+            for out in outputs:
+                outbox.put(out)
+            self._add(blocked_seconds=time.perf_counter() - t2)
+            with self._lock:
+                self._finished = time.perf_counter()
+
+    def start(self, inbox, outbox):
+        remaining = [self.workers]
+        lock = threading.Lock()
+
+        def exited():
+            with lock:
+                remaining[0] -= 1
+                return remaining[0] == 0
+
+        threads = [
+            threading.Thread(target=self._work, args=(inbox, outbox, exited), name=f"pipeline-{self.name}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in threads:
+            t.start()
+        return threads
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats, stage=self.name, workers=self.workers)
+            wall = (self._finished - self._started) if self._started and self._finished else 0.0
+        out["wall_seconds"] = wall
+        out["rows_per_second"] = out["rows"] / wall if wall > 0 else None
+        return out
+
+
+def run_pipeline(source, stages, queue_size=PIPELINE_QUEUE_SIZE):
+    """
+    Feed `source` (any iterable) through the stages and return
+    (outputs of the last stage, per-stage stats frame). Queues between
+    stages hold at most queue_size items, which bounds memory to roughly
+    queue_size batches per stage however large the input is.
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    source_stats = {"stage": "source", "workers": 1, "items": 0, "rows": 0, "errors": 0,
+                    "busy_seconds": 0.0, "blocked_seconds": 0.0, "idle_seconds": 0.0}
+    source_errors = []
+
+    def feed():
+        start = time.perf_counter()
+        iterator = iter(source)
+        try:
+            while True:
+                t0 = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                t1 = time.perf_counter()
+                source_stats["busy_seconds"] += t1 - t0
+                queues[0].put(item)
+                source_stats["blocked_seconds"] += time.perf_counter() - t1
+                source_stats["items"] += 1
+                source_stats["rows"] += _rows(item)
+        except Exception as e:
+            source_stats["errors"] += 1
+            source_errors.append(f"{type(e).__name__}: {e}")
+        finally:
+            source_stats["wall_seconds"] = time.perf_counter() - start
+            queues[0].put(_DONE)
+
+    threads = [threading.Thread(target=feed, name="pipeline-source", daemon=True)]
+    threads[0].start()
+    for stage, inbox, outbox in zip(stages, queues, queues[1:]):
+        threads.extend(stage.start(inbox, outbox))
+
+    outputs = []
+    while True:
+        item = queues[-1].get()
+        if item is _DONE:
+            break
+        outputs.append(item)
+    for t in threads:
+        t.join()
+
+    wall = source_stats.get("wall_seconds", 0.0)
+    source_stats["rows_per_second"] = source_stats["rows"] / wall if wall > 0 and source_stats["rows"] else None
+    stats = pd.DataFrame([source_stats] + [stage.stats() for stage in stages])
+    stats.attrs["errors"] = {"source": source_errors, **{s.name: list(s.errors) for s in stages}}
+    return outputs, stats
+
+
+# ---------------------------------------------------------
+# Sources
+# ---------------------------------------------------------
+def url_source(urls):
+    from src.fetch_orchestrator import parse_url_list
+    return parse_url_list("\n".join(urls))
+
+
+def tweetclaw_source(paths, chunk_rows=PIPELINE_BATCH_ROWS):
+    from src.data_tweetclaw import iter_tweetclaw_export
+    for path in paths:
+        with open(path, "rb") as f:
+            yield from iter_tweetclaw_export(f, path, chunk_rows=chunk_rows)
+
+
+def db_source(video_ids=None, only_unscored=False, batch_rows=PIPELINE_BATCH_ROWS):
+    from src.db_utils import iter_stored_comments
+    yield from iter_stored_comments(video_ids=video_ids, only_unscored=only_unscored, batch_size=batch_rows)
+
+
+# ---------------------------------------------------------
+# Stages
+# ---------------------------------------------------------
+def fetch_stage(max_comments=300, workers=PIPELINE_FETCH_WORKERS):
+    """URLs become normalized frames; frames from file/DB sources pass through."""
+    from src.fetch_orchestrator import fetch_source, host_semaphores
+    semaphores = host_semaphores()
+    reports = []
+
+    def fetch(item):
+        if isinstance(item, pd.DataFrame):
+            return item
+        entry, frame = fetch_source(item, max_comments, semaphores)
+        reports.append(entry)
+        if entry["status"] in ("error", "unsupported"):
+            raise RuntimeError(f"{item}: {entry['error']}")
+        return frame
+
+    stage = Stage("fetch", fetch, workers=workers)
+    stage.reports = reports
+    return stage
+
+
+def normalize_batch(frame, batch_rows=PIPELINE_BATCH_ROWS, seen=None):
+    """
+    Common columns, parsed timestamps and no repeated comment ids, split
+    into batch_rows pieces. Ids already in `seen` (an LRUCache of ids from
+    earlier batches) are dropped too, and the new ones are added to it.
+    The cache only holds the most recent ids; repeats older than that
+    reach the DB writer, whose ON CONFLICT skips them.
+    """
+    from src.fetch_orchestrator import normalize_comments
+    frame = normalize_comments(frame)
+    frame = frame[frame["comment_id"].notna()].drop_duplicates("comment_id")
+    if seen is not None:
+        ids = frame["comment_id"].astype(str)
+        new = [seen.get(i) is None for i in ids]
+        frame = frame[new]
+        for i in ids[frame.index]:
+            seen.set(i, True)
+    frame["text"] = frame["text"].fillna("").astype(str)
+    frame["published_at"] = pd.to_datetime(frame["published_at"], errors="coerce", utc=True, format="mixed")
+    frame = frame.reset_index(drop=True)
+    return [frame.iloc[i:i + batch_rows] for i in range(0, len(frame), batch_rows)] or None
+
+
+def score_batch(frame, scorers=SCORER_NAMES):
+    """Add the TextBlob / VADER / NRC columns the dashboard shows."""
+    frame = frame.copy()
+    if "textblob" in scorers:
+        from src.parallel_scoring import score_texts
+        results = score_texts(frame["text"].tolist(), "textblob")
+        frame["sentiment_score"] = [r[0] for r in results]
+        frame["subjectivity"] = [r[1] for r in results]
+        frame["sentiment"] = [r[2] for r in results]
+    if "vader" in scorers:
+        from src.data_cleaning_vader import add_vader_to_df
+        frame = add_vader_to_df(frame)
+    if "nrc" in scorers:
+        from src.emotion_analysis import add_emotion_columns
+        frame = add_emotion_columns(frame)
+    return frame
+
+
+class Persister:
+    """
+    Writes scored batches to Postgres (new rows inserted, score columns
+    updated for every row) and/or appends them to a CSV file (gzip when it
+    ends in .gz). Runs with a single worker so file appends stay ordered.
+    """
+
+    def __init__(self, to_db=True, output=None, scorers=SCORER_NAMES):
+        self.to_db = to_db
+        self.output = output
+        self.scorers = scorers
+        self._header = True
+        self._columns = None
+        if output:
+            open(output, "wb").close()
+
+    def _write_db(self, frame):
+        from src import db_utils
+        db_utils.ensure_schema()
+        report = db_utils.insert_comments(frame)
+        columns = [c for s in self.scorers for c in SCORE_COLUMNS.get(s, [])
+                   if FRAME_COLUMNS.get(c, c) in frame.columns]
+        if columns:
+            casts = {c: "text" if c in TEXT_COLUMNS else "real" for c in columns}
+            rows = db_utils.frame_rows(frame, ["comment_id"] + [FRAME_COLUMNS.get(c, c) for c in columns])
+            with db_utils.connection() as conn, conn.cursor() as cur:
+                db_utils.update_comment_columns(cur, columns, rows, casts=casts)
+        return report
+
+    def _write_file(self, frame):
+        # sources differ in extra columns; the first batch fixes the file's header
+        if self._columns is None:
+            self._columns = list(frame.columns)
+        data = frame.reindex(columns=self._columns).to_csv(index=False, header=self._header).encode("utf-8")
+        if self.output.endswith(".gz"):
+            # concatenated gzip members read back as one stream
+            data = gzip.compress(data, mtime=0)
+        with open(self.output, "ab") as f:
+            f.write(data)
+        self._header = False
+
+    def __call__(self, frame):
+        report = {"rows": len(frame), "inserted": 0, "skipped": 0, "failed": 0}
+        if self.to_db:
+            db_report = self._write_db(frame)
+            report.update(inserted=db_report["inserted"], skipped=db_report["skipped"],
+                          failed=db_report["failed"])
+        if self.output:
+            self._write_file(frame)
+        return report
+
+
+def build_pipeline(max_comments=300, scorers=SCORER_NAMES, to_db=True, output=None,
+                   batch_rows=PIPELINE_BATCH_ROWS, fetch_workers=PIPELINE_FETCH_WORKERS):
+    seen = LRUCache(PIPELINE_SEEN_IDS)
+    return [
+        fetch_stage(max_comments, workers=fetch_workers),
+        Stage("normalize", lambda frame: normalize_batch(frame, batch_rows, seen)),
+        Stage("score", lambda frame: score_batch(frame, scorers)),
+        Stage("persist", Persister(to_db=to_db, output=output, scorers=scorers)),
+    ]
+
+
+def format_stats(stats):
+    shown = stats[["stage", "workers", "items", "rows", "errors", "busy_seconds",
+                   "blocked_seconds", "idle_seconds", "wall_seconds", "rows_per_second"]]
+    return shown.round(2).to_string(index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch, score and store comments without the dashboard.")
+    inputs = parser.add_argument_group("inputs (any combination)")
+    inputs.add_argument("--url", action="append", default=[], help="post/video URL (repeatable)")
+    inputs.add_argument("--url-file", help="file with one URL per line")
+    inputs.add_argument("--tweetclaw", action="append", default=[], help="TweetClaw export file (repeatable)")
+    inputs.add_argument("--db", action="store_true", help="re-score comments already stored in the DB")
+    inputs.add_argument("--video-id", action="append", default=[], help="with --db: only these videos/posts")
+    inputs.add_argument("--unscored", action="store_true", help="with --db: only rows without VADER scores")
+    parser.add_argument("--scorers", default=",".join(SCORER_NAMES), help="comma-separated subset of textblob,vader,nrc")
+    parser.add_argument("--max-comments", type=int, default=300, help="per URL")
+    parser.add_argument("--batch-rows", type=int, default=PIPELINE_BATCH_ROWS)
+    parser.add_argument("--queue-size", type=int, default=PIPELINE_QUEUE_SIZE)
+    parser.add_argument("--fetch-workers", type=int, default=PIPELINE_FETCH_WORKERS)
+    parser.add_argument("--output", help="also append scored rows to this CSV (.csv or .csv.gz)")
+    parser.add_argument("--no-db", action="store_true", help="do not write to Postgres")
+    args = parser.parse_args(argv)
+
+    scorers = tuple(s.strip() for s in args.scorers.split(",") if s.strip())
+    unknown = set(scorers) - set(SCORER_NAMES)
+    if unknown:
+        parser.error(f"unknown scorers: {', '.join(sorted(unknown))}")
+    if args.no_db and not args.output:
+        parser.error("--no-db needs --output, otherwise results are discarded")
+
+    urls = list(args.url)
+    if args.url_file:
+        with open(args.url_file, encoding="utf-8") as f:
+            urls.extend(f.read().splitlines())
+    if not (urls or args.tweetclaw or args.db):
+        parser.error("nothing to do: give --url/--url-file, --tweetclaw or --db")
+
+    def source():
+        yield from url_source(urls)
+        yield from tweetclaw_source(args.tweetclaw, chunk_rows=args.batch_rows)
+        if args.db:
+            yield from db_source(args.video_id or None, args.unscored, args.batch_rows)
+
+    stages = build_pipeline(args.max_comments, scorers, to_db=not args.no_db, output=args.output,
+                            batch_rows=args.batch_rows, fetch_workers=args.fetch_workers)
+    reports, stats = run_pipeline(source(), stages, queue_size=args.queue_size)
+
+    print(format_stats(stats))
+    print(f"rows written: {sum(r['rows'] for r in reports)}, "
+          f"inserted: {sum(r['inserted'] for r in reports)}, skipped: {sum(r['skipped'] for r in reports)}")
+    failed = False
+    for stage, errors in stats.attrs["errors"].items():
+        for message in errors:
+            failed = True
+            print(f"[{stage}] {message}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# src/parallel_scoring.py
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from src.config import SCORING_WORKERS, SCORING_CHUNK_SIZE, SCORING_MIN_PARALLEL_ROWS
+from src.score_cache import get_score_cache, normalize_text
+
+
+def _load_textblob():
+    from src.data_cleaning import analyze_textblob
+    return analyze_textblob
+
+
+def _load_vader():
+    from src.data_cleaning_vader import vader_score
+    return vader_score
+
+
+def _load_nrc():
+    from src.emotion_analysis import get_emotions
+    return get_emotions
+
+
+# scorer name -> loader returning a text -> result function
+SCORERS = {
+    "textblob": _load_textblob,
+    "vader": _load_vader,
+    "nrc": _load_nrc,
+}
+
+_loaded = {}
+
+
+def get_scorer(name):
+    """Load a scorer once per process and reuse it for every chunk."""
+    fn = _loaded.get(name)
+    if fn is None:
+        if name not in SCORERS:
+            raise ValueError(f"Unknown scorer '{name}'. Choose from: {', '.join(SCORERS)}")
+        fn = _loaded[name] = SCORERS[name]()
+    return fn
+
+
+def _init_worker(names):
+    for name in names:
+        try:
+            get_scorer(name)
+        except Exception as e:
+            # the chunk that needs it will raise with the real error
+            print(f"Scoring worker could not preload {name}: {e}")
+
+
+def _score_chunk(name, texts):
+    fn = get_scorer(name)
+    return [fn(t) for t in texts]
+
+
+_executor = None
+_executor_workers = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers):
+    """
+    One long-lived pool per process so Streamlit reruns don't respawn workers.
+    Spawned (not forked) children stay safe next to Streamlit's threads.
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(tuple(SCORERS),),
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def shutdown_executor():
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+        _executor = None
+        _executor_workers = None
+
+
+def _run(texts, scorer, workers, chunk_size, min_parallel_rows):
+    if workers <= 1 or len(texts) < max(min_parallel_rows, 2):
+        return _score_chunk(scorer, texts)
+
+    # keep every worker busy even when chunk_size is larger than the input share
+    chunk_size = max(1, min(chunk_size, -(-len(texts) // workers)))
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+
+    results = []
+    for part in _get_executor(workers).map(_score_chunk, [scorer] * len(chunks), chunks):
+        results.extend(part)
+    return results
+
+
+def score_texts(texts, scorer, workers=None, chunk_size=None, min_parallel_rows=None, use_cache=True):
+    """
+    Score a sequence of texts with one of SCORERS, preserving input order.
+    Each distinct text is scored at most once; results already in the
+    score cache are reused. What is left runs serially in this process when
+    it is smaller than min_parallel_rows (or workers <= 1), where pool
+    start-up and pickling would cost more than they save. Larger inputs are
+    split into chunk_size pieces and fanned out across a process pool.
+    """
+    texts = list(texts)
+    workers = workers or SCORING_WORKERS
+    chunk_size = chunk_size or SCORING_CHUNK_SIZE
+    if min_parallel_rows is None:
+        min_parallel_rows = SCORING_MIN_PARALLEL_ROWS
+    if scorer not in SCORERS:
+        raise ValueError(f"Unknown scorer '{scorer}'. Choose from: {', '.join(SCORERS)}")
+
+    keys = [normalize_text(t) if isinstance(t, str) else t for t in texts]
+    # first raw text seen for each normalized form is the one that gets scored
+    unique = {}
+    for key, text in zip(keys, texts):
+        unique.setdefault(key, text)
+
+    cache = get_score_cache() if use_cache else None
+    known = {}
+    if cache is not None:
+        cache.record_duplicates(len(texts) - len(unique))
+        cached = cache.get_many(scorer, unique.values())
+        known = {key: cached[text] for key, text in unique.items() if text in cached}
+
+    missing = [key for key in unique if key not in known]
+    scored = _run([unique[key] for key in missing], scorer, workers, chunk_size, min_parallel_rows)
+    known.update(zip(missing, scored))
+    if cache is not None:
+        cache.set_many(scorer, ((unique[key], value) for key, value in zip(missing, scored)))
+
+    return [known[key] for key in keys]
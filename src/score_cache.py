@@ -0,0 +1,160 @@
+# src/score_cache.py
+
+import hashlib
+import json
+import threading
+from importlib import metadata
+
+from src.cache_utils import LRUCache, SQLiteLRU
+from src.config import (
+    SCORE_CACHE_ENABLED, SCORE_CACHE_PATH, SCORE_CACHE_MAX_MB, SCORE_CACHE_MEMORY_ITEMS
+)
+
+# scorer name -> distribution whose version invalidates cached results
+MODEL_PACKAGES = {
+    "textblob": "textblob",
+    "vader": "vaderSentiment",
+    "nrc": "NRCLex",
+}
+
+
+def model_version(model):
+    package = MODEL_PACKAGES.get(model)
+    if package is None:
+        return "unknown"
+    try:
+        version = metadata.version(package)
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    if model == "nrc":
+        # scores come from our compiled engine, only the lexicon is NRCLex's
+        from src.emotion_analysis import ENGINE_VERSION
+        version = f"{version}+engine{ENGINE_VERSION}"
+    return version
+
+
+def normalize_text(text):
+    # every scorer tokenizes on whitespace, so runs of spaces/newlines don't matter
+    return " ".join(text.split())
+
+
+def text_key(text, model, version):
+    digest = hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model}:{version}:{digest}"
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(blob):
+    value = json.loads(blob)
+    # TextBlob results are tuples; JSON hands them back as lists
+    return tuple(value) if isinstance(value, list) else value
+
+
+class ScoreCache:
+    """
+    Two-tier cache for per-text scores keyed by (text hash, model, model version).
+    The memory tier is an LRU of decoded results; the disk tier is a
+    size-capped SQLite file that survives restarts. Non-string inputs are
+    never cached.
+    """
+
+    def __init__(self, path=None, max_bytes=256 * 1024 * 1024, memory_items=100000):
+        self.memory = LRUCache(memory_items)
+        self.disk = SQLiteLRU(path, max_bytes=max_bytes) if path else None
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "duplicates": 0}
+
+    def _version(self, model):
+        if model not in self._versions:
+            self._versions[model] = model_version(model)
+        return self._versions[model]
+
+    def get_many(self, model, texts):
+        """Return {text: result} for the cached subset of texts."""
+        version = self._version(model)
+        found = {}
+        pending = {}
+        for text in texts:
+            if not isinstance(text, str):
+                continue
+            key = text_key(text, model, version)
+            value = self.memory.get(key)
+            if value is not None:
+                found[text] = value
+            else:
+                pending.setdefault(key, []).append(text)
+
+        disk_hits = 0
+        if pending and self.disk is not None:
+            for key, (blob, _) in self.disk.get_many(pending).items():
+                value = _decode(blob)
+                self.memory.set(key, value)
+                for text in pending.pop(key):
+                    found[text] = value
+                    disk_hits += 1
+
+        with self._lock:
+            self.counters["memory_hits"] += len(found) - disk_hits
+            self.counters["disk_hits"] += disk_hits
+            self.counters["misses"] += sum(len(v) for v in pending.values())
+        return found
+
+    def set_many(self, model, items):
+        """items: iterable of (text, result)."""
+        version = self._version(model)
+        rows = []
+        for text, value in items:
+            if not isinstance(text, str):
+                continue
+            key = text_key(text, model, version)
+            self.memory.set(key, value)
+            rows.append((key, _encode(value)))
+        if self.disk is not None:
+            self.disk.set_many(rows)
+
+    def record_duplicates(self, count):
+        with self._lock:
+            self.counters["duplicates"] += count
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+        lookups = out["memory_hits"] + out["disk_hits"] + out["misses"]
+        out["hit_ratio"] = round((out["memory_hits"] + out["disk_hits"]) / lookups, 4) if lookups else 0.0
+        out["memory_items"] = len(self.memory)
+        if self.disk is not None:
+            out["disk_bytes"] = self.disk.size_bytes()
+            out["disk_evictions"] = self.disk.evictions
+        return out
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_score_cache():
+    """Process-wide cache, or None when SCORE_CACHE_ENABLED is off."""
+    global _cache
+    if not SCORE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ScoreCache(
+                SCORE_CACHE_PATH,
+                max_bytes=SCORE_CACHE_MAX_MB * 1024 * 1024,
+                memory_items=SCORE_CACHE_MEMORY_ITEMS,
+            )
+        return _cache
+
+
+def score_cache_stats():
+    return _cache.stats() if _cache is not None else {}
@@ -0,0 +1,296 @@
+# src/scoring_workers.py
+"""
+Scoring workers that drain unscored youtube_comments rows in parallel.
+
+    python -m src.scoring_workers setup                      # once, before the first worker
+    python -m src.scoring_workers work --task vader          # run until stopped
+    python -m src.scoring_workers work --task nrc --drain    # exit when the backlog is empty
+    python -m src.scoring_workers status
+
+Each batch is claimed with SELECT ... FOR UPDATE SKIP LOCKED, scored and
+written back in the same transaction, so any number of workers on any
+number of hosts take disjoint batches. The claim is a lease: if a worker
+dies its connection drops and Postgres releases the rows, and if it hangs
+idle_in_transaction_session_timeout ends its session after
+SCORING_LEASE_SECONDS and the rows become claimable again.
+
+`setup` owns every schema change (columns, partial indexes, the heartbeat
+table); `work` and `status` only read and write rows, so they never queue
+for the exclusive lock that DDL on youtube_comments takes.
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+import uuid
+
+import pandas as pd
+
+from src.config import SCORING_LEASE_SECONDS, SCORING_WORKER_BATCH, SCORING_WORKER_STALE_SECONDS
+from src.db_utils import connection, create_schema, update_comment_columns
+
+EMOTION_COLUMNS = ["anger", "anticipation", "disgust", "fear", "joy", "sadness", "surprise", "trust"]
+
+
+def _score_vader(texts):
+    from src.data_cleaning_vader import vader_label_from_compound, vader_score
+    rows = []
+    for text in texts:
+        s = vader_score(text or "")
+        rows.append((s["compound"], s["pos"], s["neu"], s["neg"], vader_label_from_compound(s["compound"])))
+    return rows
+
+
+def _score_textblob(texts):
+    from src.data_cleaning import analyze_sentiment, clean_text
+    return [analyze_sentiment(clean_text(text)) for text in texts]
+
+
+def _score_nrc(texts):
+    from src.emotion_analysis import EMOTION_NAMES, get_engine
+    counts = get_engine().score_many([text or "" for text in texts])
+    order = [EMOTION_NAMES.index(name) for name in EMOTION_COLUMNS]
+    return [tuple(float(row[j]) for j in order) for row in counts]
+
+
+# task -> which rows are pending, the columns written and how they are scored
+TASKS = {
+    "vader": {
+        "pending": "vader_label IS NULL",
+        "columns": ["vader_compound", "vader_positive", "vader_neutral", "vader_negative", "vader_label"],
+        "casts": {"vader_label": "text"},
+        "score": _score_vader,
+    },
+    "textblob": {
+        "pending": "sentiment IS NULL",
+        "columns": ["sentiment", "polarity", "subjectivity"],
+        "casts": {"sentiment": "text"},
+        "score": _score_textblob,
+    },
+    "nrc": {
+        "pending": "joy IS NULL",
+        "columns": EMOTION_COLUMNS,
+        "casts": {},
+        "score": _score_nrc,
+    },
+}
+
+
+def _casts(task):
+    spec = TASKS[task]
+    return {c: spec["casts"].get(c, "real") for c in spec["columns"]}
+
+
+def _setup_relations():
+    return ["scoring_workers"] + [f"youtube_comments_pending_{task}" for task in TASKS]
+
+
+def create_worker_tables():
+    """
+    One-time setup (the `setup` command): the comment schema (see
+    db_utils.create_schema), the heartbeat table for the status command and
+    partial indexes over each task's backlog.
+    """
+    create_schema()
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS scoring_workers (
+                worker_id TEXT PRIMARY KEY,
+                task TEXT NOT NULL,
+                host TEXT,
+                pid INT,
+                started_at TIMESTAMP NOT NULL DEFAULT now(),
+                last_seen TIMESTAMP NOT NULL DEFAULT now(),
+                batches BIGINT NOT NULL DEFAULT 0,
+                rows_done BIGINT NOT NULL DEFAULT 0,
+                last_batch_rows INT,
+                last_batch_seconds REAL
+            );
+        """)
+        for task, spec in TASKS.items():
+            # keeps claims and backlog counts proportional to the backlog, not the table
+            cur.execute(f"""
+                CREATE INDEX IF NOT EXISTS youtube_comments_pending_{task}
+                ON youtube_comments (comment_id) WHERE {spec['pending']};
+            """)
+
+
+def missing_setup():
+    """Worker relations `setup` has not created yet; a catalog lookup, so it takes no table locks."""
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT name FROM unnest(%s::text[]) AS name WHERE to_regclass(name) IS NULL",
+            (_setup_relations(),)
+        )
+        return [row[0] for row in cur.fetchall()]
+
+
+def require_setup():
+    """Raise unless `setup` has run."""
+    missing = missing_setup()
+    if missing:
+        raise RuntimeError(f"Missing {', '.join(missing)}; run `python -m src.scoring_workers setup` first")
+
+
+def claim_and_score(task, batch_size=SCORING_WORKER_BATCH, worker_id=None, lease_seconds=SCORING_LEASE_SECONDS):
+    """
+    Claim up to batch_size pending rows for a task, score and store them in
+    one transaction. Returns the number of rows scored (0 when nothing is left
+    that another worker has not already claimed).
+    """
+    spec = TASKS[task]
+    started = time.perf_counter()
+    with connection() as conn, conn.cursor() as cur:
+        # the lease: a stuck transaction is ended by the server and its rows freed
+        cur.execute("SET LOCAL idle_in_transaction_session_timeout = %s", (int(lease_seconds * 1000),))
+        cur.execute(
+            f"SELECT comment_id, text FROM youtube_comments WHERE {spec['pending']} "
+            "ORDER BY comment_id LIMIT %s FOR UPDATE SKIP LOCKED",
+            (batch_size,)
+        )
+        claimed = cur.fetchall()
+        if not claimed:
+            return 0
+        scores = spec["score"]([text for _, text in claimed])
+        rows = [(comment_id,) + tuple(score) for (comment_id, _), score in zip(claimed, scores)]
+        update_comment_columns(cur, spec["columns"], rows, casts=_casts(task))
+        if worker_id is not None:
+            cur.execute("""
+                UPDATE scoring_workers SET last_seen = now(), batches = batches + 1,
+                    rows_done = rows_done + %s, last_batch_rows = %s, last_batch_seconds = %s
+                WHERE worker_id = %s
+            """, (len(rows), len(rows), time.perf_counter() - started, worker_id))
+    return len(rows)
+
+
+def _register(task):
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO scoring_workers (worker_id, task, host, pid) VALUES (%s, %s, %s, %s)",
+            (worker_id, task, socket.gethostname(), os.getpid())
+        )
+    return worker_id
+
+
+def _heartbeat(worker_id):
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("UPDATE scoring_workers SET last_seen = now() WHERE worker_id = %s", (worker_id,))
+
+
+def run_worker(task, batch_size=SCORING_WORKER_BATCH, drain=False, poll_seconds=5.0,
+               max_batches=None, lease_seconds=SCORING_LEASE_SECONDS, max_failures=3):
+    """
+    Score batches of a task until stopped (or, with drain, until nothing is
+    left to claim). A failed batch is rolled back, so its rows are simply
+    claimed again later; after max_failures failures in a row the error is
+    raised. Returns the number of rows this worker scored.
+    """
+    if task not in TASKS:
+        raise ValueError(f"Unknown task '{task}'. Choose from: {', '.join(TASKS)}")
+    require_setup()
+    worker_id = _register(task)
+    print(f"Worker {worker_id} scoring {task} in batches of {batch_size}")
+    done = batches = failures = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            try:
+                scored = claim_and_score(task, batch_size, worker_id, lease_seconds)
+            except Exception as e:
+                failures += 1
+                if failures >= max_failures:
+                    raise
+                print(f"Batch failed, retrying in {poll_seconds}s: {e}")
+                time.sleep(poll_seconds)
+                continue
+            failures = 0
+            if scored:
+                done += scored
+                batches += 1
+                continue
+            if drain:
+                break
+            _heartbeat(worker_id)
+            time.sleep(poll_seconds)
+    except KeyboardInterrupt:
+        pass
+    print(f"Worker {worker_id} scored {done} rows")
+    return done
+
+
+def backlog():
+    """Pending rows per task."""
+    with connection() as conn, conn.cursor() as cur:
+        counts = {}
+        for task, spec in TASKS.items():
+            cur.execute(f"SELECT count(*) FROM youtube_comments WHERE {spec['pending']}")
+            counts[task] = cur.fetchone()[0]
+    return counts
+
+
+def worker_status(stale_seconds=SCORING_WORKER_STALE_SECONDS):
+    """One row per worker: rows scored, overall and last-batch rate, and whether it still reports in."""
+    columns = ["worker_id", "task", "host", "pid", "started_at", "last_seen", "batches",
+               "rows_done", "last_batch_rows", "last_batch_seconds", "seconds_since_seen"]
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT worker_id, task, host, pid, started_at, last_seen, batches, rows_done,
+                   last_batch_rows, last_batch_seconds,
+                   EXTRACT(EPOCH FROM now() - last_seen)
+            FROM scoring_workers ORDER BY task, started_at
+        """)
+        rows = cur.fetchall()
+    df = pd.DataFrame(rows, columns=columns)
+    if df.empty:
+        return df
+    running = (df["last_seen"] - df["started_at"]).dt.total_seconds()
+    df["rows_per_second"] = (df["rows_done"] / running.where(running > 0)).round(1)
+    df["last_batch_rows_per_second"] = (
+        df["last_batch_rows"] / df["last_batch_seconds"].where(df["last_batch_seconds"] > 0)
+    ).round(1)
+    df["state"] = df["seconds_since_seen"].astype(float).map(lambda s: "stale" if s > stale_seconds else "active")
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel scoring workers for stored comments.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("setup", help="create the worker table, score columns and backlog indexes")
+    work = commands.add_parser("work", help="claim and score batches")
+    work.add_argument("--task", choices=list(TASKS), default="vader")
+    work.add_argument("--batch-size", type=int, default=SCORING_WORKER_BATCH)
+    work.add_argument("--drain", action="store_true", help="exit once nothing is left to claim")
+    work.add_argument("--poll-seconds", type=float, default=5.0)
+    work.add_argument("--lease-seconds", type=float, default=SCORING_LEASE_SECONDS)
+    status = commands.add_parser("status", help="backlog size and per-worker rate")
+    status.add_argument("--all", action="store_true", help="include stale workers")
+    args = parser.parse_args(argv)
+
+    if args.command == "setup":
+        create_worker_tables()
+        print("Scoring worker tables and indexes are ready.")
+        return 0
+
+    if args.command == "work":
+        run_worker(args.task, args.batch_size, drain=args.drain,
+                   poll_seconds=args.poll_seconds, lease_seconds=args.lease_seconds)
+        return 0
+
+    require_setup()
+    for task, pending in backlog().items():
+        print(f"{task:>9}: {pending} rows pending")
+    workers = worker_status()
+    if not args.all and not workers.empty:
+        workers = workers[workers["state"] == "active"]
+    if workers.empty:
+        print("No active workers.")
+    else:
+        print(workers[["worker_id", "task", "rows_done", "rows_per_second",
+                       "last_batch_rows_per_second", "seconds_since_seen", "state"]].to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
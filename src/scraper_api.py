@@ -1,9 +1,30 @@
 # scraper_api.py
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-import re, traceback
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio, json, re, zlib
 
-app = FastAPI(title="Scraper API")
+import requests
+
+from src.config import (
+    ANALYZE_MAX_BYTES, ANALYZE_MAX_TEXTS, ANALYZE_MIN_PARALLEL_ROWS, API_GZIP_MIN_BYTES,
+    INSTAGRAM_SESSION_FILE, INSTAGRAM_SESSION_USER, SCRAPER_ACQUIRE_TIMEOUT,
+    SCRAPER_CLIENT_POOL_SIZE, SCRAPER_DEFAULT_LIMIT, SCRAPER_MAX_COMMENTS, SCRAPER_MAX_LIMIT,
+    SCRAPER_MAX_WORKERS
+)
+
+@asynccontextmanager
+async def _lifespan(app):
+    yield
+    # the /analyze scoring processes would otherwise outlive the server
+    from src.parallel_scoring import shutdown_executor
+    shutdown_executor()
+
+app = FastAPI(title="Scraper API", lifespan=_lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,6 +32,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# responses are gzipped for clients that send Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=API_GZIP_MIN_BYTES, compresslevel=6)
 
 try:
     import snscrape.modules.twitter as sntwitter
@@ -22,61 +45,287 @@ try:
 except:
     instaloader = None
 
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-_vader = SentimentIntensityAnalyzer()
+from src.lazy import resource
+from src.scraper_cache import ClientPool, crawl_cache_stats, get_crawl_cache
+
+# blocking crawls run here; at most SCRAPER_MAX_WORKERS at once across all requests
+_executor = ThreadPoolExecutor(max_workers=SCRAPER_MAX_WORKERS, thread_name_prefix="scraper")
+_slots = None
+
+def _get_slots():
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(SCRAPER_MAX_WORKERS)
+    return _slots
+
+def _comment(author, text, likes, time):
+    return {
+        "author": author,
+        "text": text,
+        "likes": likes,
+        "time": str(time),
+        "sentiment": resource("vader").polarity_scores(text or ""),
+    }
 
 def extract_tweet_id(url):
     m = re.search(r"status/(\d+)", url)
     return m.group(1) if m else None
 
-@app.get("/scrape/twitter")
-def scrape_twitter(url: str = Query(...)):
-    if not sntwitter:
-        raise HTTPException(500, "snscrape missing")
-    tid = extract_tweet_id(url)
-    if not tid:
-        raise HTTPException(400, "Invalid tweet URL")
+def _new_twitter_client():
+    # the guest token is what Twitter rate-limits; reusing it skips an activation per crawl
+    tokens = sntwitter.GuestTokenManager() if hasattr(sntwitter, "GuestTokenManager") else None
+    return {"session": requests.Session(), "tokens": tokens}
+
+def _new_instagram_client():
+    L = instaloader.Instaloader(quiet=True)
+    if INSTAGRAM_SESSION_USER:
+        L.load_session_from_file(INSTAGRAM_SESSION_USER, INSTAGRAM_SESSION_FILE)
+    return L
 
-    results = []
-    for i, t in enumerate(sntwitter.TwitterSearchScraper(f"conversation_id:{tid}").get_items()):
-        txt = t.rawContent if hasattr(t, "rawContent") else t.content
-        results.append({
-            "author": t.user.username,
-            "text": txt,
-            "likes": getattr(t, "likeCount", 0),
-            "time": str(getattr(t, "date", "")),
-            "sentiment": _vader.polarity_scores(txt)
-        })
-        if i > 300:
-            break
-    return {"comments": results, "count": len(results)}
+# long-lived clients, so cookies, tokens and keep-alive connections outlive a request
+_clients = {
+    "twitter": ClientPool(_new_twitter_client, SCRAPER_CLIENT_POOL_SIZE),
+    "instagram": ClientPool(_new_instagram_client, SCRAPER_CLIENT_POOL_SIZE),
+}
+
+def iter_twitter_comments(url):
+    """Replies to a tweet, one dict per reply, in snscrape's order (blocking)."""
+    tid = extract_tweet_id(url)
+    with _clients["twitter"].acquire() as client:
+        kwargs = {"guestTokenManager": client["tokens"]} if client["tokens"] is not None else {}
+        scraper = sntwitter.TwitterSearchScraper(f"conversation_id:{tid}", **kwargs)
+        # snscrape (as of 0.7.0.20230622) takes no session argument: Scraper.__init__ makes a
+        # requests.Session as the private `_session` and sends every request through it
+        if hasattr(scraper, "_session"):
+            scraper._session = client["session"]
+        for t in scraper.get_items():
+            txt = t.rawContent if hasattr(t, "rawContent") else t.content
+            yield _comment(t.user.username, txt, getattr(t, "likeCount", 0), getattr(t, "date", ""))
 
 def extract_shortcode(url):
     m = re.search(r"/p/([^/?#]+)", url)
     return m.group(1) if m else None
 
+def iter_instagram_comments(url):
+    """Comments on an Instagram post, one dict per comment (blocking)."""
+    with _clients["instagram"].acquire() as L:
+        post = instaloader.Post.from_shortcode(L.context, extract_shortcode(url))
+        for c in post.get_comments():
+            yield _comment(c.owner.username, c.text, getattr(c, "likes_count", 0), getattr(c, "created_at_utc", ""))
+
+def _decode_cursor(cursor):
+    # the cursor is the position of the next comment in the crawl order
+    if cursor in (None, ""):
+        return 0
+    try:
+        position = int(cursor)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    if position < 0:
+        raise HTTPException(400, "Invalid cursor")
+    if position >= SCRAPER_MAX_COMMENTS:
+        raise HTTPException(400, f"Cursor is past the first {SCRAPER_MAX_COMMENTS} comments of a post")
+    return position
+
+async def _stream(key, crawl, limit, start):
+    """
+    Stream the page [start, start + limit) of a post's comments. Requests
+    for the same post share one crawl (see src.scraper_cache): a running
+    crawl is joined, a fresh finished one is read without crawling, and
+    only otherwise is a crawl started on the executor. Comments go out as
+    soon as the crawl reaches them; the last item is a summary with the
+    cursor of the next page, or an error. Returns the crawl and the lines.
+    """
+    loop = asyncio.get_running_loop()
+    # one extra comment tells whether there is a next page
+    shared, status = get_crawl_cache().join(key, start + limit + 1, crawl)
+    if status == "miss":
+        slots = _get_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=SCRAPER_ACQUIRE_TIMEOUT)
+        except asyncio.TimeoutError:
+            shared.fail("All scraper workers are busy, retry later")
+            raise HTTPException(503, "All scraper workers are busy, retry later")
+        loop.run_in_executor(_executor, shared.run, lambda: loop.call_soon_threadsafe(slots.release))
+
+    async def lines():
+        woken = shared.subscribe(loop)
+        position = start
+        try:
+            while position < SCRAPER_MAX_COMMENTS:
+                if position < len(shared.comments):
+                    if position == start + limit:
+                        break
+                    yield json.dumps(shared.comments[position], default=str) + "\n"
+                    position += 1
+                    continue
+                if shared.finished:
+                    break
+                woken.clear()
+                if position >= len(shared.comments) and not shared.finished:
+                    await woken.wait()
+        finally:
+            shared.unsubscribe(woken)
+        sent = position - start
+        if shared.error is not None and position >= len(shared.comments):
+            summary = {"done": True, "count": sent, "error": shared.error}
+        else:
+            # a crawl that stopped idle (not at the end of the post) can be resumed from here
+            more = position < SCRAPER_MAX_COMMENTS and (position < len(shared.comments) or not shared.exhausted)
+            summary = {"done": True, "count": sent, "next_cursor": str(position) if more else None}
+        summary["cache"] = status
+        yield json.dumps(summary) + "\n"
+
+    return shared, lines()
+
+async def _prepend(first, lines):
+    yield first
+    async for line in lines:
+        yield line
+
+async def _respond(request, key, crawl, limit, cursor):
+    start = _decode_cursor(cursor)
+    shared, lines = await _stream(key, crawl, limit, start)
+    # wait for the first comment, so a crawl that found no free client is still a 503
+    first = await lines.__anext__()
+    if shared.busy:
+        await lines.aclose()
+        raise HTTPException(503, shared.error)
+    lines = _prepend(first, lines)
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+    # everyone else gets the old {"comments", "count"} shape, as before streaming
+    comments, summary = [], {}
+    async for line in lines:
+        item = json.loads(line)
+        if item.get("done"):
+            summary = item
+        else:
+            comments.append(item)
+    if "error" in summary:
+        raise HTTPException(502, summary["error"])
+    return {"comments": comments, "count": len(comments), "next_cursor": summary.get("next_cursor")}
+
+@app.get("/stats")
+def stats():
+    """Crawl cache hit ratio, coalesced and in-flight crawls, and client pool reuse."""
+    return {
+        "crawl_cache": crawl_cache_stats(),
+        "clients": {platform: pool.stats() for platform, pool in _clients.items()},
+    }
+
+@app.get("/scrape/twitter")
+async def scrape_twitter(
+    request: Request,
+    url: str = Query(...),
+    limit: int = Query(SCRAPER_DEFAULT_LIMIT, ge=1, le=SCRAPER_MAX_LIMIT),
+    cursor: str = Query(None),
+):
+    if not sntwitter:
+        raise HTTPException(500, "snscrape missing")
+    if not extract_tweet_id(url):
+        raise HTTPException(400, "Invalid tweet URL")
+    key = ("twitter", extract_tweet_id(url))
+    return await _respond(request, key, lambda: iter_twitter_comments(url), limit, cursor)
+
 @app.get("/scrape/instagram")
-def scrape_instagram(url: str = Query(...)):
+async def scrape_instagram(
+    request: Request,
+    url: str = Query(...),
+    limit: int = Query(SCRAPER_DEFAULT_LIMIT, ge=1, le=SCRAPER_MAX_LIMIT),
+    cursor: str = Query(None),
+):
     if not instaloader:
         raise HTTPException(500, "instaloader missing")
-
-    shortcode = extract_shortcode(url)
-    if not shortcode:
+    if not extract_shortcode(url):
         raise HTTPException(400, "Invalid Instagram URL")
+    key = ("instagram", extract_shortcode(url))
+    return await _respond(request, key, lambda: iter_instagram_comments(url), limit, cursor)
+
+# scorer -> (result columns, converter from a parallel_scoring result to one row)
+ANALYZE_COLUMNS = {
+    "vader": (
+        ["vader_compound", "vader_positive", "vader_neutral", "vader_negative", "vader_label"],
+        lambda s: (s["compound"], s["pos"], s["neu"], s["neg"], _vader_label(s["compound"])),
+    ),
+    "textblob": (
+        ["polarity", "subjectivity", "sentiment"],
+        tuple,
+    ),
+    "nrc": (
+        ["anger", "anticipation", "disgust", "fear", "joy", "sadness", "surprise", "trust"],
+        lambda s: tuple(s.get(e, 0) for e in ANALYZE_COLUMNS["nrc"][0]),
+    ),
+}
+
+def _vader_label(compound):
+    from src.data_cleaning_vader import vader_label_from_compound
+    return vader_label_from_compound(compound)
+
+def score_columns(texts, scorers, min_parallel_rows=ANALYZE_MIN_PARALLEL_ROWS):
+    """
+    Score texts with each scorer and return {column: [value per text]}.
+    Scoring goes through parallel_scoring.score_texts, so repeated texts are
+    scored once, cached scores are reused and large batches are fanned out
+    across its long-lived process pool.
+    """
+    from src.parallel_scoring import score_texts
+    columns = {}
+    for scorer in scorers:
+        names, to_row = ANALYZE_COLUMNS[scorer]
+        rows = [to_row(r) for r in score_texts(texts, scorer, min_parallel_rows=min_parallel_rows)]
+        for j, name in enumerate(names):
+            columns[name] = [row[j] for row in rows]
+    return columns
+
+def _decode_body(raw, encoding):
+    if len(raw) > ANALYZE_MAX_BYTES:
+        raise HTTPException(413, f"Request body is larger than {ANALYZE_MAX_BYTES} bytes")
+    encoding = encoding.strip().lower()
+    if encoding in ("", "identity"):
+        return raw
+    if encoding != "gzip":
+        raise HTTPException(415, f"Unsupported Content-Encoding '{encoding}'")
+    # bounded, so a small gzip bomb can't expand without limit
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        body = d.decompress(raw, ANALYZE_MAX_BYTES + 1)
+    except zlib.error:
+        raise HTTPException(400, "Invalid gzip body")
+    if len(body) > ANALYZE_MAX_BYTES or d.unconsumed_tail:
+        raise HTTPException(413, f"Decompressed body is larger than {ANALYZE_MAX_BYTES} bytes")
+    return body
+
+def _parse_analyze(body):
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(400, "Body must be JSON")
+    if not isinstance(payload, dict) or not isinstance(payload.get("texts"), list):
+        raise HTTPException(400, 'Body must be {"texts": [...], "scorers": [...]}')
+    texts = payload["texts"]
+    if len(texts) > ANALYZE_MAX_TEXTS:
+        raise HTTPException(413, f"At most {ANALYZE_MAX_TEXTS} texts per request")
+    if any(t is not None and not isinstance(t, str) for t in texts):
+        raise HTTPException(400, "Every text must be a string or null")
+    scorers = payload.get("scorers", ["vader"])
+    if isinstance(scorers, str):
+        scorers = [scorers]
+    unknown = [s for s in scorers if s not in ANALYZE_COLUMNS]
+    if unknown or not scorers:
+        raise HTTPException(400, f"Unknown scorers {unknown}. Choose from: {', '.join(ANALYZE_COLUMNS)}")
+    return texts, list(dict.fromkeys(scorers))
 
-    L = instaloader.Instaloader()
-    post = instaloader.Post.from_shortcode(L.context, shortcode)
-
-    out = []
-    for c in post.get_comments():
-        txt = c.text
-        out.append({
-            "author": c.owner.username,
-            "text": txt,
-            "likes": getattr(c, "likes_count", 0),
-            "time": str(getattr(c, "created_at_utc", "")),
-            "sentiment": _vader.polarity_scores(txt)
-        })
-
-    return {"comments": out, "count": len(out)}
+@app.post("/analyze")
+async def analyze(request: Request):
+    """
+    Batch scoring: {"texts": [...], "scorers": ["vader", "textblob", "nrc"]}
+    in, {"count": n, "columns": {column: [value per text]}} out, in input
+    order. Send Content-Encoding: gzip to upload compressed; responses are
+    gzipped for clients that accept it.
+    """
+    body = _decode_body(await request.body(), request.headers.get("content-encoding", ""))
+    texts, scorers = _parse_analyze(body)
+    columns = await run_in_threadpool(score_columns, texts, scorers)
+    # serialized directly: jsonable_encoder walks every value and dominates large batches
+    return Response(json.dumps({"count": len(texts), "columns": columns}), media_type="application/json")
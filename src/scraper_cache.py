@@ -0,0 +1,300 @@
+# src/scraper_cache.py
+
+import asyncio
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from src.cache_utils import LRUCache
+from src.config import (
+    SCRAPER_ACQUIRE_TIMEOUT, SCRAPER_CACHE_ITEMS, SCRAPER_CACHE_TTL, SCRAPER_CRAWL_IDLE_SECONDS,
+    SCRAPER_MAX_COMMENTS, SCRAPER_MAX_PAUSED_CRAWLS
+)
+
+
+class PoolBusy(Exception):
+    """No pooled client came free in time; the API answers 503."""
+
+
+class ClientPool:
+    """
+    Long-lived scraper clients (and their sessions, cookies and tokens),
+    created on first use up to `size` and handed out one crawl at a time.
+    A client whose crawl raised is dropped and replaced by a fresh one.
+    Waiting for a client gives up after `timeout` seconds with PoolBusy.
+    """
+
+    def __init__(self, factory, size, timeout=SCRAPER_ACQUIRE_TIMEOUT):
+        self._factory = factory
+        self.size = size
+        self.timeout = timeout
+        # LIFO: the most recently used (warmest) client goes out first
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.acquired = 0
+        self.discarded = 0
+        self.timeouts = 0
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        client, create = None, False
+        with self._lock:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                create = self.created < self.size
+                if create:
+                    self.created += 1
+        if client is None:
+            if create:
+                try:
+                    client = self._factory()
+                except Exception:
+                    with self._lock:
+                        self.created -= 1
+                    raise
+            else:
+                try:
+                    client = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self.timeouts += 1
+                    raise PoolBusy("All scraper clients are busy, retry later") from None
+        with self._lock:
+            self.acquired += 1
+        broken = False
+        try:
+            yield client
+        except Exception:
+            broken = True
+            with self._lock:
+                self.created -= 1
+                self.discarded += 1
+            raise
+        finally:
+            # a crawl closed early (GeneratorExit) still leaves a usable client
+            if not broken:
+                self._idle.put(client)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self.created,
+                "idle": self._idle.qsize(),
+                "acquired": self.acquired,
+                "reused": self.acquired - self.created - self.discarded,
+                "discarded": self.discarded,
+                "timeouts": self.timeouts,
+            }
+
+
+class SharedCrawl:
+    """
+    One crawl of one post, shared by every request for it.
+    Comments are kept in crawl order. The crawl only runs as far as some
+    request has asked for (`want`, at most SCRAPER_MAX_COMMENTS), then waits up to
+    SCRAPER_CRAWL_IDLE_SECONDS for a request that wants more before it
+    stops. A paused crawl still holds its pooled client, so it only pauses
+    while one of `pause_slots` is free and otherwise stops right away.
+    Async readers subscribe and are woken on each new comment.
+    """
+
+    def __init__(self, iterate, on_finish=None, pause_slots=None):
+        self._iterate = iterate
+        self._on_finish = on_finish
+        self._pause_slots = pause_slots
+        self.comments = []
+        self.exhausted = False  # reached the last comment of the post
+        self.error = None
+        self.busy = False       # ended for want of a worker or client, not by the source
+        self.finished = False   # nothing more will be appended
+        self.finished_at = None
+        self._wanted = 0
+        self._ended = False
+        self._cond = threading.Condition()
+        self._waiters = []
+
+    def want(self, n):
+        """Ask for the first n comments; False if this crawl has stopped short of them."""
+        n = min(n, SCRAPER_MAX_COMMENTS)
+        with self._cond:
+            if self.finished:
+                return self.exhausted or len(self.comments) >= n
+            if n > self._wanted:
+                self._wanted = n
+                self._cond.notify_all()
+            return True
+
+    def subscribe(self, loop):
+        event = asyncio.Event()
+        with self._cond:
+            self._waiters.append((loop, event))
+        return event
+
+    def unsubscribe(self, event):
+        with self._cond:
+            self._waiters = [w for w in self._waiters if w[1] is not event]
+
+    def _wake(self):
+        with self._cond:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # that request's loop is gone
+
+    def _stop(self, error=None):
+        # caller holds self._cond
+        if not self.finished:
+            self.error = error
+            self.finished = True
+            self.finished_at = time.monotonic()
+
+    def _finish(self, error=None):
+        with self._cond:
+            self._stop(error)
+            if self._ended:
+                return
+            self._ended = True
+        self._wake()
+        if self._on_finish is not None:
+            self._on_finish(self)
+
+    def fail(self, error):
+        """End a crawl that never started because no worker was free."""
+        self.busy = True
+        self._finish(error)
+
+    def _pause(self, wanted):
+        # caller holds self._cond; True once more comments are wanted
+        if self._pause_slots is not None and not self._pause_slots.acquire(blocking=False):
+            return False
+        try:
+            return self._cond.wait_for(wanted, timeout=SCRAPER_CRAWL_IDLE_SECONDS)
+        finally:
+            if self._pause_slots is not None:
+                self._pause_slots.release()
+
+    def run(self, on_done=None):
+        """Blocking: drive the crawl on a worker thread."""
+        end = object()
+        error = None
+        iterator = None
+        try:
+            iterator = iter(self._iterate())
+            while True:
+                with self._cond:
+                    wanted = lambda: len(self.comments) < self._wanted
+                    if not wanted() and not self._pause(wanted):
+                        # stop under the lock, so a concurrent want() sees it
+                        self._stop()
+                        break
+                comment = next(iterator, end)
+                if comment is end:
+                    self.exhausted = True
+                    break
+                with self._cond:
+                    self.comments.append(comment)
+                self._wake()
+        except PoolBusy as e:
+            self.busy = True
+            error = str(e)
+        except Exception as e:
+            error = str(e)
+        finally:
+            if iterator is not None and hasattr(iterator, "close"):
+                iterator.close()  # gives a pooled client back
+            self._finish(error)
+            if on_done is not None:
+                on_done()
+
+
+class CrawlCache:
+    """
+    Per-post crawls, kept for SCRAPER_CACHE_TTL seconds after they finish.
+    A request joins a running crawl of the same post instead of starting
+    its own (single flight), reads a fresh finished one without crawling,
+    and only starts a crawl when neither can serve the page it wants.
+    At most max_paused of its crawls wait for demand at once.
+    """
+
+    def __init__(self, ttl=SCRAPER_CACHE_TTL, max_items=SCRAPER_CACHE_ITEMS, max_paused=SCRAPER_MAX_PAUSED_CRAWLS):
+        self.ttl = ttl
+        self._crawls = LRUCache(max_items)
+        self._pause_slots = threading.BoundedSemaphore(max(max_paused, 0))
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.in_flight = 0
+
+    def _fresh(self, crawl):
+        if not crawl.finished:
+            return True
+        return crawl.error is None and time.monotonic() - crawl.finished_at < self.ttl
+
+    def _finished(self, crawl):
+        with self._lock:
+            self.in_flight -= 1
+
+    def join(self, key, need, iterate):
+        """
+        The crawl serving the first `need` comments of `key`, and how it was
+        found: "hit" (finished, cached), "coalesced" (running) or "miss" (new;
+        the caller must start it with crawl.run or end it with crawl.fail).
+        """
+        with self._lock:
+            self.requests += 1
+            crawl = self._crawls.get(key)
+            if crawl is not None and self._fresh(crawl) and crawl.want(need):
+                if crawl.finished:
+                    self.hits += 1
+                    return crawl, "hit"
+                self.coalesced += 1
+                return crawl, "coalesced"
+            self.misses += 1
+            self.in_flight += 1
+            crawl = SharedCrawl(iterate, on_finish=self._finished, pause_slots=self._pause_slots)
+            crawl.want(need)
+            self._crawls.set(key, crawl)
+            return crawl, "miss"
+
+    def clear(self):
+        self._crawls.clear()
+
+    def stats(self):
+        with self._lock:
+            served = self.hits + self.coalesced
+            return {
+                "requests": self.requests,
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / self.requests, 4) if self.requests else 0.0,
+                "shared_ratio": round(served / self.requests, 4) if self.requests else 0.0,
+                "in_flight": self.in_flight,
+                "entries": len(self._crawls),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_crawl_cache():
+    """Process-wide crawl cache shared by every request of the API."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CrawlCache()
+        return _cache
+
+
+def crawl_cache_stats():
+    return _cache.stats() if _cache is not None else {}
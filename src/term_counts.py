@@ -0,0 +1,144 @@
+# src/term_counts.py
+
+import heapq
+import re
+from collections import Counter
+
+KINDS = ("keyword", "bigram", "hashtag")
+
+# keywords are runs of ASCII letters (same as replacing everything else with spaces)
+WORD_PATTERN = re.compile(r"[A-Za-z]+")
+HASHTAG_PATTERN = re.compile(r"#\w+")
+
+
+class SpaceSaving:
+    """
+    Approximate heavy-hitter counter in O(capacity) memory (Metwally et al.).
+    When full, a new term replaces the smallest counter and inherits its
+    count as error, so every reported count overestimates the true count by
+    at most its error, and every error is at most total / capacity.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        # (count, term) entries; stale ones are skipped when popped
+        self._heap = []
+
+    def _push(self, term):
+        heapq.heappush(self._heap, (self.counts[term], term))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, t) for t, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, term = heapq.heappop(self._heap)
+            if self.counts.get(term) == count:
+                return term, count
+
+    def add(self, term, weight=1):
+        self.total += weight
+        if term in self.counts:
+            self.counts[term] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[term] = weight
+            self.errors[term] = 0
+        else:
+            evicted, floor = self._pop_min()
+            del self.counts[evicted], self.errors[evicted]
+            self.counts[term] = floor + weight
+            self.errors[term] = floor
+        self._push(term)
+
+    def update(self, terms):
+        """Like Counter.update: a mapping of weights or an iterable of terms."""
+        items = terms.items() if hasattr(terms, "items") else Counter(terms).items()
+        for term, weight in items:
+            self.add(term, weight)
+
+    def most_common(self, n=None):
+        ranked = sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return ranked if n is None else ranked[:n]
+
+    def error_bound(self):
+        """Upper bound on how far any reported count can be above the truth."""
+        return self.total / self.capacity if len(self.counts) >= self.capacity else 0
+
+    def __len__(self):
+        return len(self.counts)
+
+
+class TermCounter:
+    """
+    Single-pass keyword / bigram / hashtag counts over a stream of texts.
+    Each text is lowercased and matched once per pattern, and the counts are
+    updated in place, so memory follows the number of distinct terms rather
+    than the total number of tokens. With approx_capacity set, each kind is
+    tracked by a SpaceSaving counter of that size instead of a Counter.
+    Bigrams are pairs of adjacent keywords after stopword removal.
+    """
+
+    def __init__(self, stop_words=(), min_length=3, bigrams=True, approx_capacity=None):
+        self.stop_words = frozenset(stop_words)
+        self.min_length = min_length
+        self.bigrams = bigrams
+        self.approx_capacity = approx_capacity
+        self.counters = {
+            kind: SpaceSaving(approx_capacity) if approx_capacity else Counter()
+            for kind in KINDS
+        }
+        self.texts = 0
+
+    def keywords(self, text):
+        words = " ".join(WORD_PATTERN.findall(text)).lower().split()
+        stop, min_length = self.stop_words, self.min_length
+        return [w for w in words if len(w) >= min_length and w not in stop]
+
+    def update(self, text):
+        if not isinstance(text, str):
+            return
+        self.texts += 1
+        words = self.keywords(text)
+        self.counters["keyword"].update(words)
+        if self.bigrams and len(words) > 1:
+            self.counters["bigram"].update(map(" ".join, zip(words, words[1:])))
+        if "#" in text:
+            self.counters["hashtag"].update(HASHTAG_PATTERN.findall(text.lower()))
+
+    def update_many(self, texts):
+        for text in texts:
+            self.update(text)
+        return self
+
+    def most_common(self, kind, n=None):
+        return self.counters[kind].most_common(n)
+
+    def top(self, kind, n=20):
+        """
+        Top n terms of a kind as dicts with count, error and the guaranteed
+        lower bound on the true count (count == guaranteed in exact mode).
+        """
+        counter = self.counters[kind]
+        errors = getattr(counter, "errors", {})
+        return [
+            {"term": term, "count": count, "error": errors.get(term, 0),
+             "guaranteed": count - errors.get(term, 0)}
+            for term, count in counter.most_common(n)
+        ]
+
+    def error_bounds(self):
+        """Per kind: stream total, distinct terms tracked and the max overcount."""
+        out = {}
+        for kind, counter in self.counters.items():
+            if isinstance(counter, SpaceSaving):
+                out[kind] = {"total": counter.total, "tracked": len(counter),
+                             "capacity": counter.capacity, "max_error": counter.error_bound()}
+            else:
+                out[kind] = {"total": sum(counter.values()), "tracked": len(counter),
+                             "capacity": None, "max_error": 0}
+        return out
@@ -1,8 +1,9 @@
+import hashlib
 import io
 import pandas as pd
-import plotly.express as px
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+from src.cache_utils import LRUCache
+from src.config import WORDCLOUD_CACHE_ITEMS, WORDCLOUD_MAX_WORDS
+from src.lazy import resource
 
 CYBER_COLORS = {
     "positive": "#00E1FF",  # cyan
@@ -12,6 +13,7 @@ CYBER_COLORS = {
 
 def plot_sentiment_bar(df):
     counts = df['sentiment'].value_counts().reindex(['positive','neutral','negative']).fillna(0)
+    px = resource("plotly_express")
     fig = px.bar(
         x=counts.index, y=counts.values,
         labels={'x':'Sentiment','y':'Count'},
@@ -23,11 +25,13 @@ def plot_sentiment_bar(df):
 
 def plot_sentiment_pie(df):
     counts = df['sentiment'].value_counts()
+    px = resource("plotly_express")
     fig = px.pie(values=counts.values, names=counts.index, title='Sentiment Distribution (Pie)', template='plotly_dark')
     return fig
 
 def plot_likes_vs_sentiment(df):
     # jitter the x position for categories to show distribution
+    px = resource("plotly_express")
     fig = px.strip(df, x='sentiment', y='like_count', hover_data=['author','text'],
                    title='Likes vs Sentiment (Scatter)', template='plotly_dark')
     return fig
@@ -40,15 +44,18 @@ def timeseries_sentiment(df):
     ts = df.set_index('published_at').resample('D').sentiment_score.mean().dropna()
     if ts.empty:
         return None
+    px = resource("plotly_express")
     fig = px.line(ts, x=ts.index, y=ts.values, labels={'x':'Date','y':'Avg Sentiment Score'}, title='Sentiment Over Time', template='plotly_dark')
     return fig
 
 def make_wordcloud_figure(text, width=800, height=400):
+    plt = resource("pyplot")
     if not isinstance(text, str) or text.strip()=="":
         fig, ax = plt.subplots(figsize=(8,4), facecolor='black')
         ax.text(0.5,0.5,"No text to generate wordcloud", color="white", ha="center")
         ax.axis("off")
         return fig
+    WordCloud = resource("wordcloud")
     wc = WordCloud(width=width, height=height, background_color="black",
                    colormap=None, prefer_horizontal=0.9,
                    regexp=r"\w[\w']+").generate(text)
@@ -57,6 +64,41 @@ def make_wordcloud_figure(text, width=800, height=400):
     ax.axis("off")
     return fig
 
+# rendered PNGs keyed by (frequency fingerprint, width, height)
+_wordcloud_images = LRUCache(WORDCLOUD_CACHE_ITEMS)
+
+def top_frequencies(frequencies, max_words=WORDCLOUD_MAX_WORDS):
+    """The max_words most frequent terms of a mapping or (term, count) pairs, most frequent first."""
+    items = frequencies.items() if hasattr(frequencies, "items") else frequencies
+    ranked = sorted(((str(t), float(c)) for t, c in items if c > 0), key=lambda tc: (-tc[1], tc[0]))
+    return dict(ranked[:max_words])
+
+def frequencies_fingerprint(frequencies):
+    return hashlib.blake2b(repr(sorted(frequencies.items())).encode("utf-8"), digest_size=16).hexdigest()
+
+def render_wordcloud(frequencies, width=800, height=400, max_words=WORDCLOUD_MAX_WORDS):
+    """
+    PNG bytes of a word cloud laid out from precomputed term frequencies
+    (e.g. TermCounter keyword counts), or None when there are none.
+    Only the top max_words terms are placed, so the cost follows the shown
+    vocabulary rather than the corpus; images are cached per fingerprint and size.
+    """
+    top = top_frequencies(frequencies, max_words)
+    if not top:
+        return None
+    key = (frequencies_fingerprint(top), width, height)
+    png = _wordcloud_images.get(key)
+    if png is None:
+        WordCloud = resource("wordcloud")
+        wc = WordCloud(width=width, height=height, background_color="black",
+                       colormap=None, prefer_horizontal=0.9,
+                       max_words=len(top)).generate_from_frequencies(top)
+        buffer = io.BytesIO()
+        wc.to_image().save(buffer, format="PNG")
+        png = buffer.getvalue()
+        _wordcloud_images.set(key, png)
+    return png
+
 
    
 def format_comment_card(row):
@@ -0,0 +1,70 @@
+import pandas as pd
+
+from src import artifacts
+from src.artifacts import ArtifactCache, frame_fingerprint
+
+
+def _frame():
+    return pd.DataFrame({
+        "text": ["great #video", "bad take", None],
+        "like_count": [3, 10, 1],
+        "sentiment_score": [0.8, -0.5, 0.0],
+        "tags": [["a"], [], ["b", "c"]],
+    })
+
+
+def test_fingerprint_follows_content_not_identity():
+    a, b = _frame(), _frame()
+
+    assert frame_fingerprint(a) == frame_fingerprint(b)
+    b.loc[1, "like_count"] = 11
+    assert frame_fingerprint(a) != frame_fingerprint(b)
+    assert frame_fingerprint(a) != frame_fingerprint(a.iloc[::-1])
+    assert frame_fingerprint(a) != frame_fingerprint(a.assign(extra=1))
+
+
+def test_cache_builds_once_per_fingerprint_and_options():
+    calls = []
+    artifacts.artifact("test_echo")(lambda df, n=1: calls.append(n) or len(df) * n)
+    cache = ArtifactCache(max_items=8)
+    df = _frame()
+
+    assert cache.get("test_echo", df) == 3
+    assert cache.get("test_echo", _frame()) == 3
+    assert cache.get("test_echo", df, n=2) == 6
+    assert calls == [1, 2]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+
+
+def test_sorted_view_is_cached_per_sort_mode():
+    df = _frame()
+    cache = ArtifactCache()
+
+    liked = cache.get("sorted_view", df, sort_by="Most liked")
+    assert liked.order.tolist() == [1, 0, 2]
+    assert cache.get("sorted_view", df, sort_by="Most liked") is liked
+    assert cache.get("sorted_view", df, sort_by="Most negative").order.tolist() == [1, 2, 0]
+
+
+def test_cache_evicts_by_estimated_size():
+    artifacts.artifact("test_blob")(lambda df, n=0: b"x" * 400 + bytes([n]))
+    cache = ArtifactCache(max_items=8, max_bytes=1000)
+    df = _frame()
+
+    first = cache.get("test_blob", df, n=1)
+    cache.get("test_blob", df, n=2)
+    assert cache.stats()["entries"] == 2
+    cache.get("test_blob", df, n=3)
+    # a third ~400 byte blob does not fit: the least recently used one goes
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes"] <= 1000
+    assert cache.get("test_blob", df, n=1) == first and cache.stats()["misses"] == 4
+
+
+def test_estimate_size_counts_arrays_and_nested_objects():
+    view = artifacts.get_artifact_cache().get("sorted_view", _frame(), sort_by="Most liked")
+
+    assert artifacts.estimate_size(view) >= view.order.nbytes + view.keys.nbytes
+    shared = b"y" * 1000
+    assert artifacts.estimate_size([shared, shared]) < 2000
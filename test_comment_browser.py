@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from src.comment_browser import SortedView
+
+
+def _frame(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    likes = rng.integers(0, 20, n).astype(float)
+    likes[rng.integers(0, n, 50)] = np.nan
+    return pd.DataFrame({
+        "like_count": likes,
+        "sentiment_score": rng.normal(size=n).round(1),
+        "published_at": pd.Timestamp("2024-01-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 99, n), unit="D"),
+    })
+
+
+def _walk(view, limit):
+    pages, cursor = [], None
+    while True:
+        positions, cursor = view.page(after=cursor, limit=limit)
+        pages.append(positions.tolist())
+        if cursor is None:
+            return pages
+
+
+def test_keyset_pages_cover_the_stable_sort_exactly_once():
+    df = _frame()
+    expected = {
+        "Most liked": df["like_count"].sort_values(ascending=False, kind="stable", na_position="last"),
+        "Most recent": df["published_at"].sort_values(ascending=False, kind="stable"),
+        "Most negative": df["sentiment_score"].sort_values(ascending=True, kind="stable"),
+    }
+    for mode, ordered in expected.items():
+        pages = _walk(SortedView(df, mode), limit=37)
+
+        assert sum(pages, []) == ordered.index.tolist(), mode
+        assert all(len(p) == 37 for p in pages[:-1])
+
+
+def test_missing_sort_column_keeps_frame_order():
+    view = SortedView(pd.DataFrame({"text": list("abc")}), "Most liked")
+
+    positions, cursor = view.page(limit=2)
+    assert positions.tolist() == [0, 1]
+    assert cursor == (0.0, 1)
+    assert view.page(after=cursor, limit=2)[0].tolist() == [2]
@@ -1,4 +1,7 @@
+from contextlib import nullcontext
+
 import pandas as pd
+import pytest
 
 from src.data_cleaning_vader import add_vader_to_df
 
@@ -11,3 +14,94 @@ def test_vader_module_imports_and_scores_text():
     assert result["vader_label"].tolist() == ["positive", "negative"]
     assert result["vader_compound"].iloc[0] > 0
     assert result["vader_compound"].iloc[1] < 0
+
+
+class FakeNamedCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.itersize = None
+
+    def execute(self, sql):
+        self.sql = sql
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.reader = FakeNamedCursor(rows)
+        self.commits = 0
+
+    def cursor(self, name=None, withhold=False):
+        return self.reader if name else FakeNamedCursor([])
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+def test_update_vader_in_db_streams_batches_into_set_based_updates(monkeypatch):
+    import src.data_cleaning_vader as vader_module
+
+    conn = FakeConnection([("a", "great stuff"), ("b", "awful"), ("c", None)])
+    written = []
+    monkeypatch.setattr(vader_module, "connection", lambda: nullcontext(conn))
+    monkeypatch.setattr(
+        vader_module, "update_comment_columns",
+        lambda cur, columns, rows, casts=None: written.append(rows)
+    )
+
+    # a full rescore streams every row; only_null=True goes through the SKIP LOCKED workers
+    processed = vader_module.update_vader_in_db(only_null=False, batch_size=2)
+
+    assert processed == 3
+    assert conn.commits == 2
+    assert [len(rows) for rows in written] == [2, 1]
+    assert [row[-1] for rows in written for row in rows] == ["positive", "negative", "neutral"]
+
+
+def test_update_vader_in_db_streams_the_backlog_before_worker_setup(monkeypatch):
+    import src.data_cleaning_vader as vader_module
+    import src.scoring_workers as scoring_workers
+
+    conn = FakeConnection([("a", "great stuff"), ("b", "awful")])
+    written = []
+    monkeypatch.setattr(vader_module, "connection", lambda: nullcontext(conn))
+    monkeypatch.setattr(
+        vader_module, "update_comment_columns",
+        lambda cur, columns, rows, casts=None: written.append(rows)
+    )
+    monkeypatch.setattr(scoring_workers, "missing_setup", lambda: ["scoring_workers"])
+    monkeypatch.setattr(scoring_workers, "run_worker", lambda *a, **k: pytest.fail("workers are not set up"))
+
+    assert vader_module.update_vader_in_db(only_null=True, batch_size=5) == 2
+    assert conn.reader.sql.endswith("WHERE vader_label IS NULL")
+    assert [row[-1] for rows in written for row in rows] == ["positive", "negative"]
+
+
+def test_update_sentiment_in_db_streams_the_backlog_before_worker_setup(monkeypatch):
+    import src.data_cleaning as data_cleaning
+    import src.scoring_workers as scoring_workers
+
+    conn = FakeConnection([("a", "What a great day"), ("b", None), ("c", "terrible awful thing")])
+    written = []
+    monkeypatch.setattr(data_cleaning, "connection", lambda: nullcontext(conn))
+    monkeypatch.setattr(
+        data_cleaning, "update_comment_columns",
+        lambda cur, columns, rows, casts=None: written.append((columns, rows))
+    )
+    monkeypatch.setattr(scoring_workers, "missing_setup", lambda: ["scoring_workers"])
+    monkeypatch.setattr(scoring_workers, "run_worker", lambda *a, **k: pytest.fail("workers are not set up"))
+
+    assert data_cleaning.update_sentiment_in_db(batch_size=2) == 3
+    assert conn.reader.sql.endswith("WHERE sentiment IS NULL")
+    assert conn.commits == 2
+    assert written[0][0] == ["sentiment", "polarity", "subjectivity"]
+    assert [row[1] for _, rows in written for row in rows] == ["positive", "neutral", "negative"]
@@ -17,3 +17,84 @@ def test_data_extraction_reads_youtube_key_when_needed(monkeypatch):
     module = importlib.import_module("src.data_extraction")
 
     assert module.get_youtube_api_key() == "test-key"
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append(dict(params))
+        return FakeResponse(self.pages.pop(0))
+
+
+def _item(n):
+    return {
+        "id": f"c{n}",
+        "snippet": {"topLevelComment": {"snippet": {
+            "authorDisplayName": "alice", "textDisplay": f"comment {n}",
+            "likeCount": n, "publishedAt": "2024-01-01T00:00:00Z",
+        }}},
+    }
+
+
+def test_comment_pages_stream_with_field_projection(monkeypatch):
+    monkeypatch.setenv("YOUTUBE_API_KEY", "test-key")
+    module = importlib.import_module("src.data_extraction")
+    session = FakeSession([
+        {"items": [_item(1), _item(2)], "nextPageToken": "p2"},
+        {"items": [_item(3), _item(4)], "nextPageToken": "p3"},
+    ])
+
+    pages = list(module.iter_comment_pages(
+        "https://www.youtube.com/watch?v=abc", max_results=3, session=session
+    ))
+
+    assert [[c["comment_id"] for c in page] for page in pages] == [["c1", "c2"], ["c3"]]
+    assert session.calls[0]["fields"] == module.COMMENT_FIELDS
+    assert [call["maxResults"] for call in session.calls] == [3, 1]
+    assert session.calls[1]["pageToken"] == "p2"
+
+
+def test_prefetch_keeps_order_and_reraises():
+    from src.http_utils import prefetch
+
+    def pages():
+        yield 1
+        yield 2
+        raise RuntimeError("boom")
+
+    seen = []
+    with pytest.raises(RuntimeError, match="boom"):
+        for page in prefetch(pages()):
+            seen.append(page)
+    assert seen == [1, 2]
+
+
+def test_comment_pages_stop_at_watermark(monkeypatch):
+    monkeypatch.setenv("YOUTUBE_API_KEY", "test-key")
+    module = importlib.import_module("src.data_extraction")
+    newer = dict(_item(1), id="new")
+    newer["snippet"]["topLevelComment"]["snippet"]["publishedAt"] = "2024-02-01T00:00:00Z"
+    session = FakeSession([
+        {"items": [newer, _item(2)], "nextPageToken": "p2"},
+        {"items": [_item(3)]},
+    ])
+
+    pages = list(module.iter_comment_pages(
+        "https://www.youtube.com/watch?v=abc", session=session,
+        watermark={"published_at": "2024-01-15T00:00:00", "comment_id": "old"},
+    ))
+
+    assert [[c["comment_id"] for c in page] for page in pages] == [["new"]]
+    assert len(session.calls) == 1
+    assert session.calls[0]["order"] == "time"
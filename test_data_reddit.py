@@ -0,0 +1,102 @@
+from src.data_reddit import MORECHILDREN_URL, fetch_reddit_comments, walk_comment_tree
+
+POST_URL = "https://www.reddit.com/r/test/comments/abc/title/"
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append((url, dict(params or {})))
+        return FakeResponse(self.routes[url](params or {}))
+
+
+def _comment(cid, parent, depth, replies=()):
+    return {"kind": "t1", "data": {
+        "id": cid, "parent_id": parent, "depth": depth, "body": f"text {cid}",
+        "author": "bob", "ups": 1, "created_utc": 1700000000, "link_id": "t3_abc",
+        "replies": {"data": {"children": list(replies)}} if replies else "",
+    }}
+
+
+def _more(parent, depth, children):
+    return {"kind": "more", "data": {"parent_id": parent, "depth": depth, "children": children}}
+
+
+def _listing(children):
+    return [
+        {"data": {"children": [{"data": {"name": "t3_abc"}}]}},
+        {"data": {"children": children}},
+    ]
+
+
+def _routes():
+    tree = _listing([
+        _comment("a", "t3_abc", 0, [
+            _comment("b", "t1_a", 1, [_more("t1_b", 2, [])]),
+            _more("t1_a", 1, ["c"]),
+        ]),
+        _more("t3_abc", 0, ["d", "e"]),
+    ])
+
+    def morechildren(params):
+        things = {
+            "c": _comment("c", "t1_a", 1),
+            "d": _comment("d", "t3_abc", 0),
+            "e": _comment("e", "t3_abc", 0),
+        }
+        ids = params["children"].split(",")
+        return {"json": {"data": {"things": [things[i] for i in ids]}}}
+
+    # a "continue this thread" response roots depths at the parent comment
+    continuation = _listing([_comment("b", "t1_a", 0, [_comment("f", "t1_b", 1)])])
+
+    return {
+        POST_URL[:-1] + ".json": lambda params: tree,
+        MORECHILDREN_URL: morechildren,
+        POST_URL[:-1] + "/b.json": lambda params: continuation,
+    }
+
+
+def test_walk_resolves_nested_replies_with_batched_more_calls():
+    session = FakeSession(_routes())
+
+    rows, stats = walk_comment_tree(POST_URL, session=session)
+
+    assert [(r["comment_id"], r["parent_id"], r["depth"]) for r in rows] == [
+        ("a", "t3_abc", 0), ("b", "t1_a", 1), ("c", "t1_a", 1),
+        ("d", "t3_abc", 0), ("e", "t3_abc", 0), ("f", "t1_b", 2),
+    ]
+    # two "more" stubs went out in one morechildren call
+    more_calls = [params for url, params in session.calls if url == MORECHILDREN_URL]
+    assert [p["children"] for p in more_calls] == ["c,d,e"]
+    assert stats["api_calls"] == 3
+    assert stats["calls_saved"] == 1
+    assert stats["continuation_calls"] == 1
+
+
+def test_walk_respects_depth_and_call_budgets(monkeypatch):
+    session = FakeSession(_routes())
+
+    rows, stats = walk_comment_tree(POST_URL, max_depth=0, max_calls=1, session=session)
+
+    assert [r["comment_id"] for r in rows] == ["a"]
+    assert stats["truncated_by_depth"] == 2
+    assert stats["unresolved_ids"] == 2
+    assert len(session.calls) == 1
+
+    import src.http_utils as http_utils
+    monkeypatch.setattr(http_utils, "get_session", lambda: FakeSession(_routes()))
+    df = fetch_reddit_comments(POST_URL, max_comments=4)
+    assert len(df) == 4
+    assert df.attrs["walk_stats"]["comments"] == 4
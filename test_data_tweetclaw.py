@@ -29,3 +29,102 @@ def test_json_normalizes_nested_author():
     result = load_tweetclaw_export(uploaded_file, "tweets.json")
 
     assert result["author"].tolist() == ["alice"]
+
+
+def test_json_array_is_streamed_across_read_blocks(monkeypatch):
+    import json
+
+    import src.data_tweetclaw as tweetclaw
+
+    monkeypatch.setattr(tweetclaw, "_JSON_BLOCK", 7)
+    rows = [{"id": str(i), "text": f"tweet number {i}", "likes": 10 ** i} for i in range(5)]
+    uploaded_file = UploadedFile(json.dumps({"meta": {"n": 5}, "tweets": rows}).encode())
+
+    frames = list(tweetclaw.iter_tweetclaw_export(uploaded_file, "tweets.json", chunk_rows=2))
+
+    assert [len(f) for f in frames] == [2, 2, 1]
+    assert [v for f in frames for v in f["like_count"]] == [1, 10, 100, 1000, 10000]
+
+
+def test_jsonl_chunks_shrink_under_memory_ceiling():
+    from src.data_tweetclaw import iter_tweetclaw_export
+
+    lines = "\n".join('{"id": "%d", "text": "%s"}' % (i, "x" * 2000) for i in range(3000))
+    uploaded_file = UploadedFile(lines.encode())
+
+    frames = list(iter_tweetclaw_export(uploaded_file, "tweets.jsonl", chunk_rows=5000, max_memory_mb=1))
+
+    assert sum(len(f) for f in frames) == 3000
+    # the first chunk is a small probe, later ones grow up to the ~1 MB ceiling
+    assert len(frames[0]) == 32
+    assert max(len(f) for f in frames) <= 200
+    assert all(f.memory_usage(deep=True).sum() * 4 <= 1024 * 1024 for f in frames)
+    assert frames[-1]["comment_id"].iloc[-1] == "2999"
+
+
+def test_csv_columns_are_coalesced_in_field_order():
+    uploaded_file = UploadedFile(
+        b"tweet_id,text,full_text,screen_name,favorite_count\n"
+        b"7,, fallback text ,carol,2.9\n"
+        b",primary,ignored,,x\n"
+    )
+
+    result = load_tweetclaw_export(uploaded_file, "tweets.csv")
+
+    assert result["text"].tolist() == ["fallback text", "primary"]
+    assert result["comment_id"].tolist() == ["7", "tweetclaw-2"]
+    assert result["author"].tolist() == ["carol", ""]
+    assert result["like_count"].tolist() == [2, 0]
+
+
+def test_parquet_and_arrow_exports_load():
+    import io
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.table({
+        "id": pa.array([1, None, 3], pa.int64()),
+        "text": ["a", "b", "c"],
+        "likes": [5, 6, 7],
+        "unrelated": [1.5, 2.5, 3.5],
+    })
+    parquet = io.BytesIO()
+    pq.write_table(table, parquet)
+    arrow = io.BytesIO()
+    with pa.ipc.new_file(arrow, table.schema) as writer:
+        writer.write_table(table)
+
+    for content, filename in [(parquet.getvalue(), "dump.parquet"), (arrow.getvalue(), "dump.arrow")]:
+        result = load_tweetclaw_export(UploadedFile(content), filename)
+        assert result["comment_id"].tolist() == ["1", "tweetclaw-2", "3"]
+        assert result["like_count"].tolist() == [5, 6, 7]
+
+
+def test_parquet_batches_are_sized_from_the_memory_ceiling(monkeypatch):
+    import io
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from src.data_tweetclaw import iter_tweetclaw_export
+
+    table = pa.table({"id": [str(i) for i in range(3000)], "text": [f"{i:04d}" + "x" * 2000 for i in range(3000)]})
+    parquet = io.BytesIO()
+    pq.write_table(table, parquet, row_group_size=1000)
+    sizes = []
+    iter_batches = pq.ParquetFile.iter_batches
+
+    def spy(self, batch_size=65536, **kwargs):
+        sizes.append(batch_size)
+        return iter_batches(self, batch_size=batch_size, **kwargs)
+
+    monkeypatch.setattr(pq.ParquetFile, "iter_batches", spy)
+
+    frames = list(iter_tweetclaw_export(UploadedFile(parquet.getvalue()), "tweets.parquet",
+                                        chunk_rows=5000, max_memory_mb=1))
+
+    assert sum(len(f) for f in frames) == 3000
+    # one read per row group; none is larger than ~2 KB per row, four times over, allows
+    assert len(sizes) == 3 and max(sizes) <= 1024 * 1024 // (2000 * 4)
+    assert all(f.memory_usage(deep=True).sum() * 4 <= 1024 * 1024 for f in frames)
@@ -0,0 +1,274 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import pytest
+
+import src.db_utils as db_utils
+
+
+class FakeCursor:
+    def __init__(self):
+        self.copied = []
+        self.executed = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        if "INSERT INTO youtube_comments" in sql:
+            # pretend the first row of every batch already exists
+            ids = [line.split(",")[0] for line in self.copied[-1].splitlines()]
+            self.returned = [(i,) for i in ids[1:]]
+            self.rowcount = len(self.returned)
+
+    def fetchall(self):
+        return self.returned
+
+    def copy_expert(self, sql, buf):
+        self.copied.append(buf.read())
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cur = FakeCursor()
+        self.closed = 0
+
+    def cursor(self):
+        return self.cur
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+    def get_transaction_status(self):
+        return 0
+
+
+def fake_connection(conn):
+    @contextmanager
+    def connection():
+        yield conn
+    return connection
+
+
+def test_insert_comments_copies_in_batches_and_reports_counts(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(db_utils, "connection", fake_connection(conn))
+    df = pd.DataFrame({
+        "comment_id": ["a", "b", "c", None],
+        "video_id": ["v"] * 4,
+        "author": ["x", "y", "z", "w"],
+        "text": ["hi", "", "yo", "lost"],
+        "published_at": ["2024-01-01T10:30:00Z"] * 4,
+        "like_count": [1.0, None, 3, 4],
+    })
+
+    report = db_utils.insert_comments(df, batch_size=2, index_tokens=False)
+
+    assert len(report["batches"]) == 2
+    assert report["inserted"] == 1
+    assert report["skipped"] == 3
+    assert conn.cur.copied[0].splitlines() == [
+        "a,v,x,hi,2024-01-01 10:30:00,1",
+        'b,v,y,,2024-01-01 10:30:00,\\N',
+    ]
+
+
+class RejectingCursor(FakeCursor):
+    """Rejects any batch containing the id 'bad', like a constraint violation would."""
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        if "INSERT INTO youtube_comments" not in sql:
+            return
+        if params is None:
+            if "bad," in self.copied[-1]:
+                raise ValueError("value too long")
+            self.returned = [(line.split(",")[0],) for line in self.copied[-1].splitlines()]
+        elif params[0] == "bad":
+            raise ValueError("value too long")
+        else:
+            self.returned = [(params[0],)]
+
+
+def test_insert_comments_skips_and_reports_rows_the_database_rejects(monkeypatch):
+    conn = FakeConnection()
+    conn.cur = RejectingCursor()
+    monkeypatch.setattr(db_utils, "connection", fake_connection(conn))
+    df = pd.DataFrame({
+        "comment_id": ["a", "bad", "c", "d"],
+        "video_id": ["v"] * 4,
+        "text": ["hi", "x", "yo", "ok"],
+    })
+
+    report = db_utils.insert_comments(df, batch_size=2, index_tokens=False)
+
+    assert report["inserted"] == 3 and report["failed"] == 1 and report["skipped"] == 1
+    assert [b["failed"] for b in report["batches"]] == [1, 0]
+    statements = [sql.strip().split()[0] + " " + sql.strip().split()[1] for sql, _ in conn.cur.executed]
+    assert "ROLLBACK TO" in statements
+
+
+def test_pool_blocks_until_a_connection_is_returned():
+    pool = db_utils.ConnectionPool(minconn=0, maxconn=1, timeout=5, connect=FakeConnection)
+    first = pool.getconn()
+    got = []
+
+    worker = threading.Thread(target=lambda: got.append(pool.getconn()))
+    worker.start()
+    time.sleep(0.05)
+    assert pool.stats()["waiting"] == 1
+    pool.putconn(first)
+    worker.join(timeout=5)
+
+    stats = pool.stats()
+    assert got == [first]
+    assert stats["checkouts"] == 2
+    assert stats["created"] == 1
+    assert stats["saturation"] == 1.0
+    assert stats["wait_seconds_max"] > 0
+
+
+def test_pool_replaces_closed_connections_and_times_out():
+    pool = db_utils.ConnectionPool(minconn=1, maxconn=1, timeout=0.05, connect=FakeConnection)
+    with pool.connection() as conn:
+        conn.close()
+        try:
+            pool.getconn()
+        except db_utils.PoolTimeout:
+            pass
+        else:
+            raise AssertionError("expected PoolTimeout")
+
+    with pool.connection() as fresh:
+        assert fresh is not conn
+
+    stats = pool.stats()
+    assert stats["discarded"] == 1
+    assert stats["timeouts"] == 1
+
+
+def test_pool_counts_a_connection_being_checked_as_in_use():
+    class SlowPing(FakeConnection):
+        def cursor(self):
+            time.sleep(0.2)
+            return self.cur
+
+    pool = db_utils.ConnectionPool(minconn=1, maxconn=1, timeout=0.05, check_after=0, connect=SlowPing)
+    worker = threading.Thread(target=pool.getconn)
+    worker.start()
+    time.sleep(0.05)
+    try:
+        pool.getconn()
+    except db_utils.PoolTimeout:
+        pass
+    else:
+        raise AssertionError("expected PoolTimeout while the only connection is being pinged")
+    worker.join(timeout=5)
+
+    assert pool.stats()["created"] == 1
+
+
+def test_insert_comments_indexes_tokens_of_inserted_rows_only(monkeypatch):
+    conn = FakeConnection()
+    upserts = []
+    monkeypatch.setattr(db_utils, "connection", fake_connection(conn))
+    monkeypatch.setattr(db_utils, "_stop_words", lambda: {"the"})
+    monkeypatch.setattr(db_utils, "execute_values", lambda cur, sql, rows, **kw: upserts.extend(rows))
+    df = pd.DataFrame({
+        "comment_id": ["dup", "a", "b"],
+        "video_id": ["v", "v", "w"],
+        "text": ["ignored words", "the great #show great show", "great"],
+        "published_at": ["2024-01-01T10:30:00Z", "2024-01-01T10:30:00Z", None],
+        "platform": ["youtube", "youtube", "reddit"],
+    })
+
+    report = db_utils.insert_comments(df)
+
+    assert report["inserted"] == 2
+    counts = {(r[0], r[1], r[2], r[3]): r[5] for r in upserts}
+    assert counts[("great", "keyword", "youtube", "v")] == 2
+    assert counts[("great show", "bigram", "youtube", "v")] == 2
+    assert counts[("#show", "hashtag", "youtube", "v")] == 1
+    assert counts[("great", "keyword", "reddit", "w")] == 1
+    assert not any(r[0] == "ignored" for r in upserts)
+    assert {r[4] for r in upserts if r[3] == "v"} == {pd.Timestamp("2024-01-01").date()}
+
+
+def test_insert_comments_saves_without_token_counts_when_stopwords_are_missing(monkeypatch):
+    conn = FakeConnection()
+    upserts = []
+    monkeypatch.setattr(db_utils, "connection", fake_connection(conn))
+    monkeypatch.setattr(db_utils, "execute_values", lambda cur, sql, rows, **kw: upserts.extend(rows))
+
+    def missing():
+        raise LookupError("Resource 'stopwords' not found.")
+
+    monkeypatch.setattr(db_utils, "_stop_words", missing)
+    df = pd.DataFrame({"comment_id": ["dup", "a"], "video_id": ["v", "v"], "text": ["x", "great show"]})
+
+    report = db_utils.insert_comments(df)
+
+    assert report["inserted"] == 1 and upserts == []
+
+
+def test_page_comments_seeks_past_the_cursor(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(db_utils, "connection", fake_connection(conn))
+    conn.cur.returned = [("c3", -0.5), ("c2", -0.5), ("c1", -0.1)]
+
+    page, cursor = db_utils.page_comments("v", "Most negative", after=(-0.9, "c9"), limit=2,
+                                          columns=["comment_id", "vader_compound"])
+
+    sql, params = conn.cur.executed[-1]
+    assert "(vader_compound, comment_id) > (%s, %s)" in sql
+    assert "ORDER BY vader_compound ASC, comment_id ASC LIMIT %s" in sql
+    assert params == ["v", -0.9, "c9", 3]
+    assert page["comment_id"].tolist() == ["c3", "c2"]
+    assert cursor == (-0.5, "c2")
+
+    conn.cur.returned = [("c1", -0.1)]
+    page, cursor = db_utils.page_comments("v", "Most negative", after=cursor, limit=2,
+                                          columns=["comment_id", "vader_compound"])
+    assert page["comment_id"].tolist() == ["c1"]
+    assert cursor is None
+
+
+def test_ensure_schema_only_reads_the_catalog_of_an_existing_database(monkeypatch):
+    conn = FakeConnection()
+    created = []
+    monkeypatch.setattr(db_utils, "connection", fake_connection(conn))
+    monkeypatch.setattr(db_utils, "create_schema", lambda: created.append("schema"))
+    monkeypatch.setattr(db_utils, "_schema_ready", False)
+
+    conn.cur.returned = [("youtube_comments_browse_vader",), ("youtube_comments.polarity",)]
+    with pytest.raises(RuntimeError, match="youtube_comments_browse_vader.*src.db_utils setup"):
+        db_utils.ensure_schema()
+
+    conn.cur.returned = []
+    db_utils.ensure_schema()
+    db_utils.ensure_schema()
+    assert len(conn.cur.executed) == 2  # checked once per process after it passes
+    assert "to_regclass" in conn.cur.executed[0][0]
+    assert created == []
+
+    # a new database has nothing to lock out, so it gets the whole schema
+    monkeypatch.setattr(db_utils, "_schema_ready", False)
+    conn.cur.returned = [("youtube_comments",), ("youtube_comments.sentiment",)]
+    db_utils.ensure_schema()
+    assert created == ["schema"]
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from src.emotion_analysis import EMOTION_NAMES, add_emotion_columns, get_emotions
+
+SAMPLE_CORPUS = [
+    "I love this song so much, it brings me joy!",
+    "This is a disgusting, horrible betrayal. I'm furious.",
+    "Can't wait for the next episode... the suspense is killing me",
+    "don't abandon hope, my friend - the future looks bright",
+    "wanna cry, this is so sad and lonely",
+    "Who else is afraid of the dark? Scary stuff.",
+    "The teacher's advice was wise and trustworthy.",
+    "well-known liar; total fraud & a thief",
+    "",
+    "LOVE LOVE LOVE",
+]
+
+
+def test_emotion_columns_count_lexicon_hits_per_row():
+    df = pd.DataFrame({"text": ["love and joy", "so afraid of ghosts", None]})
+
+    result = add_emotion_columns(df)
+
+    assert result.loc[0, "joy"] == 2
+    assert result.loc[1, "fear"] == 1
+    assert result.loc[2, EMOTION_NAMES].sum() == 0
+    assert result["dominant_emotion"].tolist() == ["joy", "fear", "anger"]
+
+
+def test_matches_nrclex_on_sample_corpus():
+    nrclex = pytest.importorskip("nrclex")
+    from textblob.exceptions import MissingCorpusError
+
+    try:
+        reference = [nrclex.NRCLex(text).raw_emotion_scores for text in SAMPLE_CORPUS]
+    except (LookupError, MissingCorpusError):
+        pytest.skip("NLTK tokenizer data is not installed")
+
+    assert [get_emotions(text) for text in SAMPLE_CORPUS] == reference
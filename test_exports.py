@@ -0,0 +1,49 @@
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+from src.exports import export_bytes, iter_csv_chunks
+
+
+def _frame():
+    return pd.DataFrame({
+        "comment_id": ["a", "b", "c"],
+        "text": ["hi", None, "x,y"],
+        "like_count": [1, 2, None],
+        "published_at": pd.to_datetime(["2024-01-01", None, "2024-01-03"], utc=True),
+        "tags": [["a"], None, {"k": 1}],
+    })
+
+
+def test_chunked_csv_matches_to_csv_and_gzip_roundtrips():
+    df = _frame()
+
+    assert b"".join(iter_csv_chunks(df, chunk_rows=2)) == df.to_csv(index=False).encode("utf-8")
+    assert gzip.decompress(export_bytes(df, "csv.gz", chunk_rows=1)) == export_bytes(df, "csv")
+
+
+def test_excel_export_writes_every_row():
+    openpyxl = pytest.importorskip("openpyxl")
+    sheet = openpyxl.load_workbook(io.BytesIO(export_bytes(_frame(), "xlsx", chunk_rows=2))).active
+
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0] == ("comment_id", "text", "like_count", "published_at", "tags")
+    assert rows[1][:3] == ("a", "hi", 1)
+    assert rows[2][1] is None and rows[3][2] is None
+    assert rows[3][4] == "{'k': 1}"
+
+
+def test_parquet_export_roundtrips():
+    pytest.importorskip("pyarrow")
+    back = pd.read_parquet(io.BytesIO(export_bytes(_frame(), "parquet")))
+
+    assert back["comment_id"].tolist() == ["a", "b", "c"]
+    assert back["tags"].fillna("").tolist() == ["['a']", "", "{'k': 1}"]
+    assert str(back["published_at"].dtype).startswith("datetime64")
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        export_bytes(_frame(), "json")
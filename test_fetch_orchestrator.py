@@ -0,0 +1,47 @@
+import threading
+import time
+
+import pandas as pd
+
+import src.fetch_orchestrator as orchestrator
+
+
+def test_detect_platform_and_parse_url_list():
+    urls = orchestrator.parse_url_list(
+        "https://www.youtube.com/watch?v=abc\n\nhttps://old.reddit.com/r/x/comments/1/t/\n"
+        "https://x.com/a/status/5\nhttps://www.youtube.com/watch?v=abc\n"
+    )
+
+    assert [orchestrator.detect_platform(u) for u in urls] == ["youtube", "reddit", "twitter"]
+    assert orchestrator.detect_platform("https://example.com/p/1") is None
+
+
+def test_fetch_many_merges_sources_and_respects_host_limits(monkeypatch):
+    lock = threading.Lock()
+    active = {"reddit": 0, "peak": 0}
+
+    def fake_reddit(url, max_comments):
+        with lock:
+            active["reddit"] += 1
+            active["peak"] = max(active["peak"], active["reddit"])
+        time.sleep(0.05)
+        with lock:
+            active["reddit"] -= 1
+        return pd.DataFrame({"comment_id": [url[-1]], "text": ["hi"], "post_id": ["p"], "platform": ["reddit"]})
+
+    def fake_youtube(url, max_comments):
+        raise RuntimeError("quota exceeded")
+
+    monkeypatch.setitem(orchestrator.FETCHERS, "reddit", fake_reddit)
+    monkeypatch.setitem(orchestrator.FETCHERS, "youtube", fake_youtube)
+    urls = [f"https://www.reddit.com/r/x/comments/{i}" for i in range(4)]
+    urls += ["https://youtu.be/zzz", "https://example.com/nope"]
+
+    comments, report = orchestrator.fetch_many(urls, host_limits={"reddit": 2})
+
+    assert active["peak"] == 2
+    assert comments["comment_id"].tolist() == ["0", "1", "2", "3"]
+    assert comments["video_id"].tolist() == ["p"] * 4
+    assert comments["source_url"].tolist() == urls[:4]
+    assert report["status"].tolist() == ["ok"] * 4 + ["error", "unsupported"]
+    assert report.loc[4, "error"] == "quota exceeded"
@@ -0,0 +1,56 @@
+from src.http_utils import HTTPCache, request_key
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200, headers=None):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def test_request_key_ignores_api_key_and_param_order():
+    a = request_key("https://api/x", {"videoId": "v", "key": "secret", "pageToken": None})
+    b = request_key("https://api/x", {"key": "other", "videoId": "v"})
+
+    assert a == b
+    assert a != request_key("https://api/x", {"videoId": "w"})
+
+
+def test_cache_serves_fresh_entries_and_revalidates_stale_ones(tmp_path):
+    cache = HTTPCache(str(tmp_path / "http.sqlite3"), ttls={"youtube": 60, "default": 0})
+    session = FakeSession([
+        FakeResponse({"items": [1]}, headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+        FakeResponse(None, status_code=304),
+        FakeResponse({"error": "quota"}, status_code=403),
+    ])
+    params = {"videoId": "v"}
+
+    assert cache.get_json("https://api/x", params, platform="youtube", session=session) == {"items": [1]}
+    assert cache.get_json("https://api/x", params, platform="youtube", session=session) == {"items": [1]}
+    assert len(session.calls) == 1
+
+    # past its TTL the entry is revalidated; a 304 keeps the stored body
+    assert cache.get_json("https://api/x", params, platform="youtube", session=session, max_age=0) == {"items": [1]}
+    assert session.calls[1] == {
+        "If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"
+    }
+
+    # error responses are returned but never stored
+    assert cache.get_json("https://api/y", {}, session=session) == {"error": "quota"}
+    assert cache.store.get(request_key("https://api/y", {})) == (None, None)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["revalidated"], stats["misses"], stats["stored"]) == (1, 1, 2, 1)
@@ -0,0 +1,113 @@
+import pandas as pd
+
+import src.incremental as incremental
+
+
+def _frame(ids, times):
+    return pd.DataFrame({
+        "comment_id": ids,
+        "text": [f"text {i}" for i in ids],
+        "published_at": times,
+        "like_count": [1] * len(ids),
+    })
+
+
+def test_filter_new_and_merge_history():
+    mark = {"published_at": pd.Timestamp("2024-01-02 00:00:00"), "comment_id": "b"}
+    fetched = _frame(["a", "b", "c", "d"], [
+        "2024-01-01T00:00:00Z", "2024-01-02T00:00:00Z", "2024-01-02T00:00:00Z", "2024-01-03T00:00:00Z",
+    ])
+
+    new = incremental.filter_new(fetched, mark)
+    assert new["comment_id"].tolist() == ["c", "d"]
+    assert incremental.newest(new)[1] == "d"
+
+    history = _frame(["b", "c"], [pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-02")])
+    merged = incremental.merge_history(new, history)
+    assert merged["comment_id"].tolist() == ["d", "c", "b"]
+    assert incremental.filter_new(fetched, None) is fetched
+
+
+def test_incremental_fetch_stores_only_new_rows(monkeypatch):
+    calls = {}
+
+    def fake_insert(df):
+        calls["inserted"] = df
+        return {"inserted": len(df)}
+
+    def fake_history(video_id=None, columns=None, comment_ids=None):
+        calls["history_ids"] = comment_ids
+        stored = _frame(["a", "b"], [pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-02")])
+        stored["video_id"] = ["a", "b"]
+        for column in columns:
+            if column not in stored.columns:
+                stored[column] = 0.5 if column != "vader_label" else "positive"
+        return stored[columns]
+
+    monkeypatch.setattr(incremental.db_utils, "ensure_schema", lambda: None)
+    monkeypatch.setattr(incremental.db_utils, "get_watermark",
+                        lambda source: {"published_at": pd.Timestamp("2024-01-02"), "comment_id": "b"})
+    monkeypatch.setattr(incremental.db_utils, "load_source_comments", fake_history)
+    monkeypatch.setattr(incremental.db_utils, "insert_comments", fake_insert)
+    monkeypatch.setattr(incremental.db_utils, "advance_watermark",
+                        lambda *args: calls.setdefault("watermark", args))
+
+    export = _frame(["a", "b", "c"], ["2024-01-01", "2024-01-02", "2024-01-05 12:00"])
+    export["video_id"] = ["a", "b", "c"]
+    result = incremental.incremental_fetch("tweetclaw", frame=export, name="replies.csv")
+    assert "watermark" not in calls  # fetching stores nothing
+    report = incremental.store_new_comments(result)
+
+    assert result["source"] == "tweetclaw:replies.csv"
+    assert calls["history_ids"] == ["a", "b", "c"]
+    assert result["new"]["comment_id"].tolist() == ["c"]
+    assert result["new"]["video_id"].tolist() == ["c"]  # the tweet's own id is kept
+    assert report["inserted"] == 1
+    source, platform, published, comment_id, rows = calls["watermark"]
+    assert (source, platform, str(published), comment_id, rows) == (
+        "tweetclaw:replies.csv", "tweetclaw", "2024-01-05 12:00:00", "c", 1
+    )
+    # stored scores come back under the app's names
+    assert result["history"]["sentiment_score"].tolist() == [0.5, 0.5]
+    assert result["history"]["dominant_emotion"].tolist() == ["anger", "anger"]
+    merged = incremental.merge_history(result["new"], result["history"])
+    assert merged["comment_id"].tolist() == ["c", "b", "a"]
+
+
+def test_tweetclaw_chunks_look_up_history_in_bounded_batches(monkeypatch):
+    lookups = []
+
+    def fake_history(video_id=None, columns=None, comment_ids=None):
+        lookups.append(list(comment_ids))
+        stored = _frame(comment_ids, [pd.Timestamp("2024-01-01")] * len(comment_ids))
+        return stored.reindex(columns=columns)
+
+    monkeypatch.setattr(incremental.db_utils, "ensure_schema", lambda: None)
+    monkeypatch.setattr(incremental, "HISTORY_LOOKUP_IDS", 2)
+    monkeypatch.setattr(incremental.db_utils, "get_watermark",
+                        lambda source: {"published_at": pd.Timestamp("2024-01-02"), "comment_id": "b"})
+    monkeypatch.setattr(incremental.db_utils, "load_source_comments", fake_history)
+
+    chunks = iter([_frame(["a", "b", "c"], ["2024-01-01", "2024-01-02", "2024-01-03"]),
+                   _frame(["d"], ["2024-01-04"])])
+    result = incremental.incremental_fetch("tweetclaw", frame=chunks, name="big.jsonl")
+
+    assert lookups == [["a", "b"], ["c"], ["d"]]
+    assert result["new"]["comment_id"].tolist() == ["c", "d"]
+    assert len(result["history"]) == 4
+
+
+def test_fill_missing_scores_scores_only_unscored_rows():
+    scored = []
+
+    def score(frame):
+        scored.append(frame["comment_id"].tolist())
+        return frame.assign(vader_compound=0.9)
+
+    df = pd.DataFrame({"comment_id": ["new", "old", "new2"], "vader_compound": [None, -0.3, None]})
+    out = incremental.fill_missing_scores(df, "vader_compound", score)
+
+    assert scored == [["new", "new2"]]
+    assert out["comment_id"].tolist() == ["new", "old", "new2"]
+    assert out["vader_compound"].tolist() == [0.9, -0.3, 0.9]
+    assert incremental.fill_missing_scores(out, "vader_compound", score) is out
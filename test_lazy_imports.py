@@ -0,0 +1,48 @@
+import pathlib
+import subprocess
+import sys
+
+HEAVY = ("streamlit", "plotly", "matplotlib", "wordcloud", "textblob", "vaderSentiment", "nltk", "nrclex")
+
+MODULES = [
+    "src.config", "src.data_extraction", "src.keyword_analysis", "src.data_cleaning",
+    "src.data_cleaning_vader", "src.emotion_analysis", "src.utils_visuals", "src.db_utils",
+]
+
+
+def test_src_modules_do_not_import_heavy_packages():
+    code = (
+        f"import sys\n"
+        f"for m in {MODULES!r}: __import__(m)\n"
+        f"print(sorted({{name.split('.')[0] for name in sys.modules}} & set({HEAVY!r})))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert proc.stdout.strip() == "[]"
+
+
+def test_config_import_is_silent():
+    proc = subprocess.run([sys.executable, "-c", "import src.config"], capture_output=True, text=True, check=True)
+
+    assert proc.stdout == ""
+
+
+def test_dotenv_is_imported_only_for_an_env_file():
+    from src import config
+
+    code = f"import sys\nfor m in {MODULES!r}: __import__(m)\nprint('dotenv' in sys.modules)"
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    has_env_file = any((parent / ".env").is_file() for parent in pathlib.Path(config.__file__).resolve().parents)
+
+    assert proc.stdout.strip() == str(has_env_file)
+
+
+def test_resource_loads_once():
+    from src import lazy
+
+    calls = []
+    lazy.register("test_counter")(lambda: calls.append(1) or len(calls))
+
+    assert lazy.resource("test_counter") == 1
+    assert lazy.resource("test_counter") == 1
+    assert "test_counter" in lazy.loaded_resources()
@@ -0,0 +1,107 @@
+import gzip
+import threading
+import time
+
+import pandas as pd
+
+from src import main_pipeline
+from src.main_pipeline import Stage, run_pipeline
+
+
+def test_stages_run_concurrently_with_bounded_queues():
+    in_flight = []
+    produced = []
+    finished = []
+    lock = threading.Lock()
+
+    def source():
+        for i in range(20):
+            with lock:
+                produced.append(i)
+            yield pd.DataFrame({"n": [i] * 3})
+
+    def slow(frame):
+        time.sleep(0.01)
+        with lock:
+            # items taken from the source but not yet through the slow stage
+            in_flight.append(len(produced) - len(finished))
+            finished.append(1)
+        if frame["n"].iloc[0] == 5:
+            raise ValueError("bad batch")
+        return frame
+
+    stages = [Stage("double", lambda f: f.assign(n=f["n"] * 1), workers=3), Stage("slow", slow)]
+    outputs, stats = run_pipeline(source(), stages, queue_size=2)
+
+    assert sorted(int(f["n"].iloc[0]) for f in outputs) == [i for i in range(20) if i != 5]
+    # the source never ran further ahead than the queues and workers allow:
+    # two queues of 2, three "double" workers, the slow worker and the feeder
+    assert max(in_flight) <= 2 + 3 + 2 + 1 + 1
+    by_stage = stats.set_index("stage")
+    assert by_stage.loc["source", "rows"] == 60
+    assert by_stage.loc["slow", "errors"] == 1
+    assert by_stage.loc["slow", "rows"] == 57
+    assert stats.attrs["errors"]["slow"] == ["ValueError: bad batch"]
+
+
+def test_cli_scores_a_tweetclaw_export_into_a_csv(tmp_path, monkeypatch, capsys):
+    export = tmp_path / "export.jsonl"
+    export.write_text(
+        '{"id": "1", "text": "great", "author": "a", "like_count": 3, "created_at": "2024-01-01T00:00:00Z"}\n'
+        '{"id": "1", "text": "great", "author": "a", "like_count": 3, "created_at": "2024-01-01T00:00:00Z"}\n'
+        '{"id": "2", "text": "awful", "author": "b", "like_count": 1, "created_at": "2024-01-02T00:00:00Z"}\n'
+    )
+    out = tmp_path / "scored.csv.gz"
+    monkeypatch.setattr(main_pipeline, "score_batch", lambda frame, scorers: frame.assign(vader_label="x"))
+
+    code = main_pipeline.main(["--tweetclaw", str(export), "--no-db", "--output", str(out), "--batch-rows", "1"])
+
+    assert code == 0
+    lines = gzip.decompress(out.read_bytes()).decode().splitlines()
+    assert lines[0].startswith("comment_id,")
+    assert lines[0].endswith(",vader_label")
+    # the repeated id in the second batch is dropped
+    assert len(lines) == 3
+    assert "rows written: 2" in capsys.readouterr().out
+
+
+def test_persister_writes_textblob_scores_to_their_db_columns(monkeypatch):
+    from src import db_utils
+
+    class FakeConnection:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def cursor(self):
+            return self
+
+    updates = []
+    monkeypatch.setattr(db_utils, "ensure_schema", lambda: None)
+    monkeypatch.setattr(db_utils, "insert_comments", lambda frame: {"inserted": 1, "skipped": 0, "failed": 0})
+    monkeypatch.setattr(db_utils, "connection", FakeConnection)
+    monkeypatch.setattr(db_utils, "update_comment_columns",
+                        lambda cur, columns, rows, casts: updates.append((columns, rows, casts)))
+    frame = pd.DataFrame({"comment_id": ["c1"], "text": ["great"], "sentiment_score": [0.8],
+                          "subjectivity": [0.75], "sentiment": ["positive"]})
+
+    main_pipeline.Persister(scorers=("textblob",))(frame)
+
+    columns, rows, casts = updates[0]
+    assert columns == ["sentiment", "polarity", "subjectivity"]
+    assert rows == [("c1", "positive", 0.8, 0.75)]
+    assert casts == {"sentiment": "text", "polarity": "real", "subjectivity": "real"}
+
+
+def test_normalize_batch_remembers_a_bounded_number_of_ids():
+    from src.cache_utils import LRUCache
+
+    seen = LRUCache(2)
+    frame = lambda ids: pd.DataFrame({"comment_id": ids, "text": ids})
+
+    assert list(main_pipeline.normalize_batch(frame(["a", "b", "c"]), seen=seen)[0]["comment_id"]) == ["a", "b", "c"]
+    # only the two most recent ids are remembered
+    assert len(seen) == 2
+    assert list(main_pipeline.normalize_batch(frame(["a", "c"]), seen=seen)[0]["comment_id"]) == ["a"]
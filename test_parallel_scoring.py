@@ -0,0 +1,32 @@
+import pytest
+
+from src.parallel_scoring import score_texts, shutdown_executor
+
+
+@pytest.fixture(autouse=True)
+def _shutdown_pool():
+    yield
+    shutdown_executor()
+
+
+def test_parallel_scores_match_serial_and_keep_order():
+    texts = ["I love this", "This is terrible", "", "meh", "Best video ever!"] * 7
+
+    serial = score_texts(texts, "vader", workers=1)
+    parallel = score_texts(texts, "vader", workers=2, chunk_size=4, min_parallel_rows=0, use_cache=False)
+
+    assert parallel == serial
+    assert serial[0]["compound"] > 0 > serial[1]["compound"]
+
+
+def test_small_inputs_stay_serial(monkeypatch):
+    import src.parallel_scoring as parallel_scoring
+
+    monkeypatch.setattr(parallel_scoring, "_get_executor", lambda workers: pytest.fail("pool used"))
+
+    assert score_texts(["good"], "textblob", workers=8, min_parallel_rows=100) == [(0.7, 0.6, "positive")]
+
+
+def test_unknown_scorer_is_rejected():
+    with pytest.raises(ValueError, match="Unknown scorer"):
+        score_texts(["x"], "bert", workers=1)
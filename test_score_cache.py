@@ -0,0 +1,52 @@
+import src.parallel_scoring as parallel_scoring
+from src.cache_utils import SQLiteLRU
+from src.score_cache import ScoreCache
+
+
+def test_unique_texts_are_scored_once_and_reused_from_disk(tmp_path, monkeypatch):
+    path = str(tmp_path / "scores.sqlite3")
+    cache = ScoreCache(path)
+    monkeypatch.setattr(parallel_scoring, "get_score_cache", lambda: cache)
+    calls = []
+    monkeypatch.setattr(
+        parallel_scoring, "_run",
+        lambda texts, scorer, *args: calls.append(list(texts)) or [len(t) for t in texts]
+    )
+
+    first = parallel_scoring.score_texts(["spam", "spam", "ham", "spam  "], "vader", workers=1)
+    assert first == [4, 4, 3, 4]
+    # "spam  " normalizes to "spam", so it rides along with the first copy
+    assert calls == [["spam", "ham"]]
+    assert cache.stats()["duplicates"] == 2
+
+    fresh = ScoreCache(path)
+    monkeypatch.setattr(parallel_scoring, "get_score_cache", lambda: fresh)
+    assert parallel_scoring.score_texts(["ham", "eggs"], "vader", workers=1) == [3, 4]
+    assert calls[-1] == ["eggs"]
+    assert fresh.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    store = SQLiteLRU(str(tmp_path / "lru.sqlite3"), max_bytes=30)
+    store.set("a", b"x" * 10)
+    store.set("b", b"x" * 10)
+    store.get("a")
+    store.set("c", b"x" * 15)
+
+    assert store.get("b") == (None, None)
+    assert store.get("a")[0] == b"x" * 10
+    assert store.size_bytes() <= 30
+
+
+def test_disk_tier_cap_holds_across_processes_sharing_the_file(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    first = SQLiteLRU(path, max_bytes=30)
+    second = SQLiteLRU(path, max_bytes=30, sync_seconds=0)
+    first.set("a", b"x" * 12)
+    first.set("b", b"x" * 12)
+    # second's own estimate is only what it wrote; its resync sums the file
+    second.set("c", b"x" * 12)
+
+    assert second.size_bytes() <= 30
+    assert first.get("a") == (None, None)
+    assert second.get("c")[0] == b"x" * 12
@@ -0,0 +1,103 @@
+from contextlib import contextmanager
+
+import pytest
+
+from src import scoring_workers
+
+
+class FakeCursor:
+    def __init__(self, pending):
+        self.pending = pending
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((" ".join(sql.split()), params))
+        if "FOR UPDATE SKIP LOCKED" in sql:
+            # another worker holds the first row
+            self.result = self.pending[1:1 + params[0]]
+        elif "to_regclass" in sql:
+            self.result = [(name,) for name in params[0] if name not in self.pending]
+
+    def fetchall(self):
+        return self.result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cur):
+        self.cur = cur
+
+    def cursor(self):
+        return self.cur
+
+
+def test_claim_scores_only_unlocked_rows_in_one_transaction(monkeypatch):
+    cur = FakeCursor([("a", "locked"), ("b", "great"), ("c", "awful")])
+    written = []
+
+    @contextmanager
+    def connection():
+        yield FakeConnection(cur)
+
+    monkeypatch.setattr(scoring_workers, "connection", connection)
+    monkeypatch.setattr(scoring_workers, "update_comment_columns",
+                        lambda c, columns, rows, casts: written.append((columns, rows, casts)))
+    monkeypatch.setitem(scoring_workers.TASKS["vader"], "score", lambda texts: [(len(t), 0, 0, 0, "x") for t in texts])
+
+    assert scoring_workers.claim_and_score("vader", batch_size=5, worker_id="w1", lease_seconds=2) == 2
+
+    statements = [sql for sql, _ in cur.executed]
+    assert statements[0] == "SET LOCAL idle_in_transaction_session_timeout = %s"
+    assert cur.executed[0][1] == (2000,)
+    assert "WHERE vader_label IS NULL ORDER BY comment_id LIMIT %s FOR UPDATE SKIP LOCKED" in statements[1]
+    columns, rows, casts = written[0]
+    assert rows == [("b", 5, 0, 0, 0, "x"), ("c", 5, 0, 0, 0, "x")]
+    assert casts["vader_label"] == "text" and casts["vader_compound"] == "real"
+    assert cur.executed[-1][1][:2] == (2, 2)
+
+
+def test_worker_drains_and_gives_up_after_repeated_failures(monkeypatch):
+    monkeypatch.setattr(scoring_workers, "require_setup", lambda: None)
+    monkeypatch.setattr(scoring_workers, "_register", lambda task: "w1")
+    batches = iter([3, 2, 0])
+    monkeypatch.setattr(scoring_workers, "claim_and_score", lambda *a: next(batches))
+
+    assert scoring_workers.run_worker("nrc", drain=True) == 5
+
+    def broken(*args):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(scoring_workers, "claim_and_score", broken)
+    with pytest.raises(RuntimeError):
+        scoring_workers.run_worker("nrc", drain=True, poll_seconds=0, max_failures=2)
+
+
+def test_work_and_status_do_not_change_the_schema(monkeypatch):
+    cur = FakeCursor(["scoring_workers"])
+
+    @contextmanager
+    def connection():
+        yield FakeConnection(cur)
+
+    monkeypatch.setattr(scoring_workers, "connection", connection)
+    monkeypatch.setattr(scoring_workers, "create_worker_tables", lambda: pytest.fail("DDL outside setup"))
+    monkeypatch.setattr(scoring_workers, "create_schema", lambda: pytest.fail("DDL outside setup"))
+
+    with pytest.raises(RuntimeError, match="youtube_comments_pending_vader.*setup"):
+        scoring_workers.run_worker("vader", drain=True)
+    with pytest.raises(RuntimeError, match="setup"):
+        scoring_workers.main(["status"])
+    assert not any(sql.startswith(("CREATE", "ALTER")) for sql, _ in cur.executed)
+
+
+def test_setup_command_creates_the_tables(monkeypatch):
+    calls = []
+    monkeypatch.setattr(scoring_workers, "create_worker_tables", lambda: calls.append("setup"))
+
+    assert scoring_workers.main(["setup"]) == 0
+    assert calls == ["setup"]
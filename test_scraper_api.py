@@ -0,0 +1,212 @@
+import gzip
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import scraper_api, scraper_cache
+from src.scraper_cache import ClientPool, CrawlCache
+
+URL = "https://x.com/someone/status/123"
+NDJSON = {"accept": "application/x-ndjson"}
+
+
+def _fake_crawl(n, fail_at=None, delay=0.0, calls=None):
+    def crawl(url):
+        if calls is not None:
+            calls.append(url)
+        for i in range(n):
+            if i == fail_at:
+                raise RuntimeError("rate limited")
+            time.sleep(delay)
+            yield {"author": f"u{i}", "text": f"reply {i}", "likes": i, "time": "", "sentiment": {}}
+    return crawl
+
+
+def _client(monkeypatch, crawl):
+    monkeypatch.setattr(scraper_api, "sntwitter", object())
+    monkeypatch.setattr(scraper_api, "iter_twitter_comments", crawl)
+    monkeypatch.setattr(scraper_api, "_slots", None)
+    monkeypatch.setattr(scraper_cache, "_cache", None)
+    monkeypatch.setattr(scraper_cache, "SCRAPER_CRAWL_IDLE_SECONDS", 0.2)
+    return TestClient(scraper_api.app)
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_streams_ndjson_pages_with_cursor(monkeypatch):
+    client = _client(monkeypatch, _fake_crawl(7))
+    first = client.get("/scrape/twitter", params={"url": URL, "limit": 3}, headers=NDJSON)
+    assert first.headers["content-type"].startswith("application/x-ndjson")
+    lines = _lines(first)
+    assert [c["author"] for c in lines[:-1]] == ["u0", "u1", "u2"]
+    assert lines[-1] == {"done": True, "count": 3, "next_cursor": "3", "cache": "miss"}
+
+    rest = _lines(client.get("/scrape/twitter", params={"url": URL, "limit": 10, "cursor": "3"}, headers=NDJSON))
+    assert [c["author"] for c in rest[:-1]] == ["u3", "u4", "u5", "u6"]
+    assert rest[-1]["next_cursor"] is None
+
+
+def test_json_by_default_and_errors(monkeypatch):
+    client = _client(monkeypatch, _fake_crawl(4))
+    response = client.get("/scrape/twitter", params={"url": URL, "limit": 2})
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert body["count"] == 2 and body["next_cursor"] == "2"
+    assert [c["author"] for c in body["comments"]] == ["u0", "u1"]
+    assert client.get("/scrape/twitter", params={"url": URL, "cursor": "x"}).status_code == 400
+    assert client.get("/scrape/twitter", params={"url": URL, "limit": 0}).status_code == 422
+
+    client = _client(monkeypatch, _fake_crawl(4, fail_at=2))
+    lines = _lines(client.get("/scrape/twitter", params={"url": URL}, headers=NDJSON))
+    assert len(lines) == 3 and lines[-1]["error"] == "rate limited"
+    assert client.get("/scrape/twitter", params={"url": URL}).status_code == 502
+
+
+def test_cursor_and_crawl_stop_at_the_comment_cap(monkeypatch):
+    pulled = []
+
+    def crawl(url):
+        for comment in _fake_crawl(20)(url):
+            pulled.append(comment)
+            yield comment
+
+    client = _client(monkeypatch, crawl)
+    monkeypatch.setattr(scraper_api, "SCRAPER_MAX_COMMENTS", 5)
+    monkeypatch.setattr(scraper_cache, "SCRAPER_MAX_COMMENTS", 5)
+
+    lines = _lines(client.get("/scrape/twitter", params={"url": URL, "limit": 10}, headers=NDJSON))
+    assert [c["author"] for c in lines[:-1]] == ["u0", "u1", "u2", "u3", "u4"]
+    assert lines[-1]["next_cursor"] is None
+    assert len(pulled) == 5
+    response = client.get("/scrape/twitter", params={"url": URL, "cursor": "5"})
+    assert response.status_code == 400 and "first 5 comments" in response.json()["detail"]
+
+
+def test_analyze_returns_columns_in_input_order():
+    client = TestClient(scraper_api.app)
+    texts = ["I love this, it is great", "This is awful and sad", None, "I love this, it is great"]
+    response = client.post("/analyze", json={"texts": texts, "scorers": ["vader", "textblob", "nrc"]})
+    body = response.json()
+    assert body["count"] == 4
+    columns = body["columns"]
+    assert columns["vader_label"] == ["positive", "negative", "neutral", "positive"]
+    assert columns["sentiment"][0] == "positive" and columns["polarity"][1] < 0
+    assert columns["joy"][0] > 0 and columns["sadness"][1] > 0 and columns["anger"][2] == 0
+    assert all(len(values) == 4 for values in columns.values())
+
+
+def test_analyze_gzip_bodies_and_limits(monkeypatch):
+    client = TestClient(scraper_api.app)
+    payload = gzip.compress(json.dumps({"texts": ["good day"] * 200}).encode())
+    response = client.post("/analyze", content=payload,
+                           headers={"content-encoding": "gzip", "accept-encoding": "gzip",
+                                    "content-type": "application/json"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["columns"]["vader_label"] == ["positive"] * 200
+
+    assert client.post("/analyze", content=b"not gzip", headers={"content-encoding": "gzip"}).status_code == 400
+    assert client.post("/analyze", json={"texts": ["a"], "scorers": ["bert"]}).status_code == 400
+    assert client.post("/analyze", json={"texts": [1]}).status_code == 400
+    monkeypatch.setattr(scraper_api, "ANALYZE_MAX_BYTES", 1000)
+    bomb = gzip.compress(json.dumps({"texts": ["x" * 5000]}).encode())
+    assert client.post("/analyze", content=bomb, headers={"content-encoding": "gzip"}).status_code == 413
+
+
+def test_server_shutdown_stops_the_scoring_pool(monkeypatch):
+    from src import parallel_scoring
+
+    calls = []
+    monkeypatch.setattr(parallel_scoring, "shutdown_executor", lambda: calls.append(1))
+    with TestClient(scraper_api.app):
+        assert calls == []
+    assert calls == [1]
+
+
+def test_requests_for_one_post_share_a_crawl(monkeypatch):
+    calls = []
+    client = _client(monkeypatch, _fake_crawl(30, delay=0.01, calls=calls))
+    results = []
+
+    def fetch():
+        results.append(_lines(client.get("/scrape/twitter", params={"url": URL, "limit": 20}, headers=NDJSON)))
+
+    threads = [threading.Thread(target=fetch) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert all([c["author"] for c in r[:-1]] == [f"u{i}" for i in range(20)] for r in results)
+    assert sorted(r[-1]["cache"] for r in results) == ["coalesced"] * 3 + ["miss"]
+
+    time.sleep(0.5)  # the crawl stops once nobody wants more
+    again = _lines(client.get("/scrape/twitter", params={"url": URL, "limit": 5}, headers=NDJSON))
+    assert again[-1]["cache"] == "hit" and len(calls) == 1
+    # a page past where the crawl stopped needs a new one
+    deeper = _lines(client.get("/scrape/twitter", params={"url": URL, "limit": 5, "cursor": "25"}, headers=NDJSON))
+    assert [c["author"] for c in deeper[:-1]] == [f"u{i}" for i in range(25, 30)]
+    assert deeper[-1]["next_cursor"] is None and len(calls) == 2
+
+    cache = client.get("/stats").json()["crawl_cache"]
+    assert cache["requests"] == 6 and cache["hits"] == 1 and cache["coalesced"] == 3
+    assert cache["misses"] == 2 and cache["hit_ratio"] == round(1 / 6, 4)
+
+
+def test_client_pool_reuses_and_replaces_clients():
+    made = []
+    pool = ClientPool(lambda: made.append(object()) or made[-1], size=2)
+    with pool.acquire() as a:
+        with pool.acquire() as b:
+            assert a is not b
+    with pool.acquire() as c:
+        assert c is a  # the most recently returned client
+    with pytest.raises(RuntimeError):
+        with pool.acquire():
+            raise RuntimeError("banned")
+    with pool.acquire() as d, pool.acquire() as e:
+        assert len(made) == 3 and {d, e} == {b, made[-1]}
+    assert pool.stats() == {"size": 2, "created": 2, "idle": 2, "acquired": 6, "reused": 3, "discarded": 1,
+                            "timeouts": 0}
+
+
+def test_no_free_client_is_a_503(monkeypatch):
+    pool = ClientPool(object, size=1, timeout=0.05)
+
+    def crawl(url):
+        with pool.acquire():
+            yield {"author": "u0", "text": "reply", "likes": 0, "time": "", "sentiment": {}}
+
+    client = _client(monkeypatch, crawl)
+    with pool.acquire():
+        assert client.get("/scrape/twitter", params={"url": URL}).status_code == 503
+        assert client.get("/scrape/twitter", params={"url": URL}, headers=NDJSON).status_code == 503
+    assert pool.stats()["timeouts"] == 2
+    assert client.get("/scrape/twitter", params={"url": URL}).json()["count"] == 1
+
+
+def test_crawls_past_the_pause_cap_stop_instead_of_holding_a_client(monkeypatch):
+    monkeypatch.setattr(scraper_cache, "SCRAPER_CRAWL_IDLE_SECONDS", 0.3)
+    cache = CrawlCache(max_paused=1)
+    released = []
+
+    def iterate():
+        try:
+            yield from range(100)
+        finally:
+            released.append(time.monotonic())
+
+    crawls = [cache.join(key, 2, iterate)[0] for key in ("a", "b")]
+    started = time.monotonic()
+    threads = [threading.Thread(target=crawl.run) for crawl in crawls]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(crawl.finished and crawl.comments == [0, 1] for crawl in crawls)
+    # one crawl waited for more demand, the other gave its client back at once
+    assert sorted(r - started < 0.2 for r in released) == [False, True]
@@ -0,0 +1,41 @@
+import random
+import re
+from collections import Counter
+
+from src.term_counts import SpaceSaving, TermCounter
+
+STOP = {"the", "and", "this"}
+
+
+def test_exact_counts_match_per_text_extraction():
+    texts = ["The #Python tutorial and the #python docs!", "Great tutorial, great docs", None, "ok"]
+
+    terms = TermCounter(STOP).update_many(texts)
+
+    expected = Counter()
+    for t in texts[:2] + texts[3:]:
+        words = re.sub(r"[^a-zA-Z\s]", " ", t).lower().split()
+        expected.update(w for w in words if w not in STOP and len(w) > 2)
+    assert dict(terms.most_common("keyword")) == dict(expected)
+    assert terms.most_common("hashtag") == [("#python", 2)]
+    assert ("great tutorial", 1) in terms.most_common("bigram")
+    assert terms.error_bounds()["keyword"]["max_error"] == 0
+
+
+def test_space_saving_finds_heavy_hitters_within_error_bound():
+    rng = random.Random(7)
+    stream = [f"w{int(rng.paretovariate(1.1))}" for _ in range(20000)]
+    truth = Counter(stream)
+    sketch = SpaceSaving(50)
+    for term in stream:
+        sketch.add(term)
+
+    assert len(sketch) == 50
+    bound = sketch.error_bound()
+    assert bound == len(stream) / 50
+    for term, count in sketch.most_common(10):
+        error = sketch.errors[term]
+        assert count - error <= truth[term] <= count
+        assert error <= bound
+    # anything truly above the bound must be tracked
+    assert {t for t, c in truth.items() if c > bound} <= set(sketch.counts)
@@ -0,0 +1,33 @@
+from src import utils_visuals
+from src.utils_visuals import render_wordcloud, top_frequencies
+
+
+def test_top_frequencies_keeps_the_most_frequent_terms():
+    assert top_frequencies([("b", 2), ("a", 2), ("c", 5), ("d", 0)], max_words=2) == {"c": 5.0, "a": 2.0}
+
+
+def test_wordcloud_is_rendered_once_per_frequencies_and_size(monkeypatch):
+    renders = []
+
+    class FakeWordCloud:
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+
+        def generate_from_frequencies(self, frequencies):
+            renders.append((dict(frequencies), self.kwargs["width"]))
+            return self
+
+        def to_image(self):
+            class Image:
+                def save(self, buffer, format):
+                    buffer.write(b"png")
+            return Image()
+
+    monkeypatch.setattr(utils_visuals, "resource", lambda name: FakeWordCloud)
+    monkeypatch.setattr(utils_visuals, "_wordcloud_images", utils_visuals.LRUCache(4))
+
+    assert render_wordcloud({"great": 3, "video": 1}, width=300) == b"png"
+    assert render_wordcloud([("video", 1), ("great", 3)], width=300) == b"png"
+    assert render_wordcloud({"great": 3, "video": 1}, width=600) == b"png"
+    assert render_wordcloud({}) is None
+    assert renders == [({"great": 3.0, "video": 1.0}, 300), ({"great": 3.0, "video": 1.0}, 600)]